@@ -0,0 +1,253 @@
+# Agregacion_Gastos.py
+# Agregación de gastos por categoría en una sola pasada, compartida por todos los gráficos.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import numpy as np  # para calcular sumas, extremos y cuantiles de forma vectorizada
+
+from Rollups_Gastos import periodos_vacios, periodos_sumar, periodos_combinar, copiar_periodos, periodos_columnas  # totales por día/semana/mes
+from Cuantiles_Gastos import cuantiles_vacios, cuantiles_sumar, cuantiles_combinar, cuantiles_de_frecuencias, cuantiles_extremos, clave_cuantil  # cubetas para cuantiles
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+CUANTILES = (0.25, 0.5, 0.75)  # cuartiles que se calculan por categoría (Q1, mediana, Q3)
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def registros(gastos):  # devuelve un iterable de gastos, sea un dict id->gasto, un almacén o una lista
+    """
+    Permite recorrer los gastos sin importar si vienen como diccionario de diccionarios
+    (programa de consola), como AlmacenGastos o como lista de diccionarios.
+    """
+    return gastos.values() if hasattr(gastos, "values") else gastos  # dict/almacén -> sus valores, lista -> tal cual
+
+
+# ------------------------------
+# Agregación por categoría
+# ------------------------------
+def agregar_por_categoria(gastos):  # recorre los gastos una única vez y resume cada categoría
+    """
+    Agrupa los montos por categoría en un solo recorrido y luego calcula, con NumPy,
+    cantidad, suma, mínimo, máximo, media y cuartiles de cada grupo.
+    Devuelve un diccionario categoria -> estadísticas (incluye la lista 'montos' para el boxplot).
+    Con un AlmacenGastos todo el cálculo se hace sobre sus columnas, sin recorrer gasto por gasto.
+    """
+    if hasattr(gastos, "columnas"):  # almacén columnar
+        codigos, montos, _ = gastos.columnas()  # columnas de los gastos vivos
+        return agregar_columnas(codigos, montos, gastos.categorias)  # camino vectorizado
+    montos_por_cat = {}  # categoria -> lista de montos
+    for g in registros(gastos):  # único recorrido sobre todos los gastos
+        lista = montos_por_cat.get(g["categoria"])  # busca la lista de la categoría
+        if lista is None:  # primera vez que aparece la categoría
+            lista = montos_por_cat[g["categoria"]] = []  # crea la lista vacía
+        lista.append(g["monto"])  # acumula el monto
+    resumen = {}  # categoria -> estadísticas
+    for cat, montos in montos_por_cat.items():  # recorre categorías (no gastos)
+        arr = np.asarray(montos, dtype=np.float64)  # convierte a arreglo para operar vectorizado
+        q1, mediana, q3 = np.quantile(arr, CUANTILES)  # cuartiles en una sola llamada
+        resumen[cat] = {
+            "cantidad": int(arr.size),  # número de gastos
+            "suma": float(arr.sum()),  # monto total
+            "minimo": float(arr.min()),  # monto mínimo
+            "maximo": float(arr.max()),  # monto máximo
+            "media": float(arr.mean()),  # promedio
+            "q1": float(q1),  # primer cuartil
+            "mediana": float(mediana),  # segundo cuartil
+            "q3": float(q3),  # tercer cuartil
+            "montos": montos,  # montos crudos (los usa el boxplot)
+        }
+    return resumen  # devuelve el resumen completo
+
+
+def agregar_columnas(codigos, montos, nombres):  # agregación vectorizada sobre columnas de códigos y montos
+    """
+    Igual que agregar_por_categoria pero partiendo de arreglos: códigos de categoría,
+    montos y la tabla código -> nombre. Ordena una sola vez por (categoría, monto) y
+    corta los grupos, así mínimo, máximo y montos de cada categoría salen del orden.
+    """
+    resumen = {}  # categoria -> estadísticas
+    if montos.size == 0:  # sin gastos
+        return resumen
+    orden = np.lexsort((montos, codigos))  # ordena por categoría y, dentro de ella, por monto
+    codigos_ord = codigos[orden]  # códigos ordenados
+    montos_ord = montos[orden]  # montos ordenados
+    cortes = np.flatnonzero(np.diff(codigos_ord)) + 1  # posiciones donde cambia la categoría
+    for inicio, grupo in zip(np.concatenate(([0], cortes)), np.split(montos_ord, cortes)):  # un grupo por categoría
+        q1, mediana, q3 = np.quantile(grupo, CUANTILES)  # cuartiles del grupo
+        resumen[nombres[codigos_ord[inicio]]] = {
+            "cantidad": int(grupo.size),  # número de gastos
+            "suma": float(grupo.sum()),  # monto total
+            "minimo": float(grupo[0]),  # el grupo está ordenado: primero es el mínimo
+            "maximo": float(grupo[-1]),  # y el último es el máximo
+            "media": float(grupo.mean()),  # promedio
+            "q1": float(q1),  # primer cuartil
+            "mediana": float(mediana),  # segundo cuartil
+            "q3": float(q3),  # tercer cuartil
+            "montos": grupo,  # montos de la categoría (arreglo)
+        }
+    return resumen  # devuelve el resumen completo
+
+
+def serie(resumen, campo):  # extrae un campo del resumen como dict categoria -> valor
+    """
+    Devuelve un diccionario categoria -> valor del campo pedido ('cantidad', 'suma', 'media', ...),
+    listo para pasar a plt.bar o plt.pie.
+    """
+    return {cat: datos[campo] for cat, datos in resumen.items()}  # un valor por categoría
+
+
+def todos_los_montos(resumen):  # junta los montos de todas las categorías en un solo arreglo
+    """
+    Devuelve un arreglo NumPy con todos los montos, reutilizando las listas ya agrupadas
+    (evita volver a recorrer los gastos para el histograma o el boxplot general).
+    """
+    if not resumen:  # sin categorías no hay montos
+        return np.empty(0, dtype=np.float64)  # arreglo vacío
+    return np.concatenate([np.asarray(d["montos"], dtype=np.float64) for d in resumen.values()])  # concatena por categoría
+
+
+# ------------------------------
+# Estadísticas incrementales (se actualizan en cada alta, edición o baja)
+# ------------------------------
+def crear_estadisticas(gastos=()):  # construye las estadísticas acumuladas a partir de los gastos actuales
+    """
+    Crea el diccionario de estadísticas acumuladas por categoría:
+    cantidad, suma, suma de cuadrados, mínimo, máximo, los totales por período y las
+    cubetas de cuantiles (ver Cuantiles_Gastos), que también acotan mínimo y máximo
+    cuando se elimina un extremo. El tamaño no depende de cuántos montos distintos haya.
+    """
+    if hasattr(gastos, "estadisticas"):  # base SQLite: se agrupa en la base
+        return gastos.estadisticas()
+    estadisticas = {}  # categoria -> acumuladores
+    for g in registros(gastos):  # recorre una sola vez los gastos existentes
+        estadistica_agregar(estadisticas, g)  # suma cada gasto a su categoría
+    return estadisticas  # devuelve la estructura lista para mantenerse al día
+
+
+def estadisticas_columnas(codigos, montos, nombres, fechas=None):  # igual que crear_estadisticas, pero desde columnas
+    """
+    Construye las estadísticas acumuladas a partir de arreglos de códigos de categoría,
+    montos y fechas (por ejemplo, AlmacenGastos.columnas()), ordenando una sola vez por
+    (categoría, monto) en lugar de sumar gasto por gasto. Sin `fechas`, los totales por
+    período quedan vacíos.
+    """
+    estadisticas = {}  # categoria -> acumuladores
+    if montos.size == 0:  # sin gastos
+        return estadisticas
+    periodos = periodos_columnas(codigos, montos, fechas, len(nombres)) if fechas is not None else None  # por código
+    orden = np.lexsort((montos, codigos))  # ordena por categoría y monto
+    codigos_ord = codigos[orden]  # códigos ordenados
+    montos_ord = montos[orden]  # montos ordenados
+    cortes = np.flatnonzero(np.diff(codigos_ord)) + 1  # posiciones donde cambia la categoría
+    for inicio, grupo in zip(np.concatenate(([0], cortes)), np.split(montos_ord, cortes)):  # un grupo por categoría
+        valores, cuentas = np.unique(grupo, return_counts=True)  # frecuencia de cada monto
+        estadisticas[nombres[codigos_ord[inicio]]] = {
+            "cantidad": int(grupo.size),  # número de gastos
+            "suma": float(grupo.sum()),  # monto total
+            "suma_cuadrados": float(np.dot(grupo, grupo)),  # suma de cuadrados (para el desvío)
+            "minimo": float(grupo[0]),  # el grupo está ordenado
+            "maximo": float(grupo[-1]),
+            "cuantiles": cuantiles_de_frecuencias(valores, cuentas),  # cubetas para boxplot e histograma
+            "periodos": periodos[codigos_ord[inicio]] if periodos is not None else periodos_vacios(),  # totales por día/semana/mes
+        }
+    return estadisticas
+
+
+def estadistica_agregar(estadisticas, gasto):  # suma un gasto a los acumuladores de su categoría
+    """
+    Registra un gasto nuevo en las estadísticas. Costo O(1).
+    """
+    monto = float(gasto["monto"])  # monto como número
+    acum = estadisticas.get(gasto["categoria"])  # acumuladores de la categoría
+    if acum is None:  # categoría nueva
+        acum = estadisticas[gasto["categoria"]] = {
+            "cantidad": 0, "suma": 0.0, "suma_cuadrados": 0.0,  # contadores en cero
+            "minimo": monto, "maximo": monto,  # extremos inician con el primer monto
+            "periodos": periodos_vacios(),  # totales por día/semana/mes
+            "cuantiles": cuantiles_vacios(),  # cubetas para boxplot e histograma
+        }
+    acum["cantidad"] += 1  # un gasto más
+    acum["suma"] += monto  # acumula el monto
+    acum["suma_cuadrados"] += monto * monto  # acumula el cuadrado (para el desvío)
+    periodos_sumar(acum["periodos"], gasto.get("fecha"), 1, monto)  # suma a su día, semana y mes
+    cuantiles_sumar(acum["cuantiles"], monto)  # y a su cubeta
+    if monto < acum["minimo"]:  # nuevo mínimo
+        acum["minimo"] = monto
+    if monto > acum["maximo"]:  # nuevo máximo
+        acum["maximo"] = monto
+
+
+def estadistica_quitar(estadisticas, gasto):  # resta un gasto de los acumuladores de su categoría
+    """
+    Quita un gasto de las estadísticas. Costo O(1), salvo cuando se elimina el mínimo o
+    el máximo y su cubeta queda vacía: ahí se acota con las cubetas (O(cubetas)).
+    """
+    acum = estadisticas.get(gasto["categoria"])  # acumuladores de la categoría
+    if acum is None:  # la categoría no está registrada
+        return  # nada que quitar
+    monto = float(gasto["monto"])  # monto como número
+    if clave_cuantil(monto) not in acum["cuantiles"]:  # el monto no estaba registrado
+        return  # nada que quitar
+    if acum["cantidad"] == 1:  # era el único gasto de la categoría
+        del estadisticas[gasto["categoria"]]  # la categoría desaparece del resumen
+        return
+    acum["cantidad"] -= 1  # un gasto menos
+    acum["suma"] -= monto  # descuenta el monto
+    acum["suma_cuadrados"] -= monto * monto  # descuenta el cuadrado
+    periodos_sumar(acum["periodos"], gasto.get("fecha"), -1, -monto)  # lo saca de su día, semana y mes
+    cuantiles_sumar(acum["cuantiles"], monto, -1)  # y de su cubeta
+    acum["minimo"], acum["maximo"] = cuantiles_extremos(acum["cuantiles"], monto, acum["minimo"], acum["maximo"])  # si se fue un extremo
+
+
+def estadistica_reemplazar(estadisticas, anterior, nuevo):  # refleja la edición de un gasto
+    """
+    Actualiza las estadísticas cuando un gasto cambia: quita los valores anteriores
+    y suma los nuevos (sirve aunque haya cambiado la categoría).
+    """
+    estadistica_quitar(estadisticas, anterior)  # saca la versión anterior
+    estadistica_agregar(estadisticas, nuevo)  # suma la versión nueva
+
+
+def estadisticas_combinar(destino, origen):  # suma a `destino` las estadísticas de otro conjunto de gastos
+    """
+    Incorpora en `destino` los acumuladores de `origen` (por ejemplo, los de un archivo
+    importado en segundo plano). Costo O(cubetas y períodos de origen), no O(gastos).
+    """
+    for cat, acum in origen.items():  # recorre categorías del origen
+        actual = destino.get(cat)  # acumuladores de la categoría en el destino
+        if actual is None:  # categoría nueva: se copia entera
+            destino[cat] = dict(acum, periodos=copiar_periodos(acum["periodos"]), cuantiles=dict(acum["cuantiles"]))
+            continue
+        actual["cantidad"] += acum["cantidad"]  # suma contadores
+        actual["suma"] += acum["suma"]
+        actual["suma_cuadrados"] += acum["suma_cuadrados"]
+        actual["minimo"] = min(actual["minimo"], acum["minimo"])  # extremos combinados
+        actual["maximo"] = max(actual["maximo"], acum["maximo"])
+        periodos_combinar(actual["periodos"], acum["periodos"])  # suma los totales por período
+        cuantiles_combinar(actual["cuantiles"], acum["cuantiles"])  # y las cubetas
+
+
+def resumen_incremental(estadisticas):  # arma el resumen por categoría sin recorrer los gastos
+    """
+    Devuelve un diccionario categoria -> cantidad, suma, mínimo, máximo, media y desvío,
+    calculado a partir de los acumuladores. Costo O(categorías), no O(gastos).
+    """
+    resumen = {}  # categoria -> estadísticas
+    for cat, acum in estadisticas.items():  # recorre categorías
+        n = acum["cantidad"]  # cantidad de gastos
+        media = acum["suma"] / n  # promedio
+        varianza = max(acum["suma_cuadrados"] / n - media * media, 0.0)  # varianza (evita negativos por redondeo)
+        resumen[cat] = {
+            "cantidad": n,  # número de gastos
+            "suma": acum["suma"],  # monto total
+            "minimo": acum["minimo"],  # monto mínimo
+            "maximo": acum["maximo"],  # monto máximo
+            "media": media,  # promedio
+            "desvio": varianza ** 0.5,  # desvío estándar
+        }
+    return resumen  # devuelve el resumen
@@ -0,0 +1,106 @@
+# Agregacion_Paralela.py
+# Estadísticas de ledgers muy grandes en varios núcleos: el libro binario mapeado (ver
+# Formato_Binario) se divide en fragmentos de filas, cada proceso del grupo calcula los
+# acumuladores parciales de sus fragmentos (cantidad, suma, suma de cuadrados, mínimo, máximo,
+# frecuencia de cada monto y totales por período) y el proceso principal los combina con
+# estadisticas_combinar. El resultado es el mismo que el de crear_estadisticas.
+# Desde la línea de comandos: python CLI_Gastos.py resumir gastos.gbin --procesos 8
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # cantidad de procesadores y archivo temporal
+import tempfile  # libro binario temporal para los procesos
+import multiprocessing  # grupo de procesos
+
+from Fechas_Gastos import FORMATO_FECHA  # formato de las fechas del libro
+from Agregacion_Gastos import estadisticas_columnas, estadisticas_combinar  # parciales y combinación
+from Formato_Binario import LibroBinario, escribir_binario, es_libro_binario  # ledger compartido entre procesos
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+MINIMO_FILAS_FRAGMENTO = 1 << 20  # filas por fragmento como mínimo (menos no compensa el envío del resultado)
+FRAGMENTOS_POR_PROCESO = 4  # fragmentos por proceso (reparte mejor si algún núcleo va más lento)
+
+
+# ------------------------------
+# Fragmentos
+# ------------------------------
+def fragmentos(cantidad, procesos, minimo=MINIMO_FILAS_FRAGMENTO):  # rangos (inicio, fin) de filas
+    """
+    Divide `cantidad` filas en rangos contiguos parecidos: unos FRAGMENTOS_POR_PROCESO por
+    proceso, pero nunca de menos de `minimo` filas (salvo el único fragmento de un libro chico).
+    """
+    partes = max(1, min(procesos * FRAGMENTOS_POR_PROCESO, cantidad // max(minimo, 1)))
+    cortes = [cantidad * i // partes for i in range(partes + 1)]
+    return [(inicio, fin) for inicio, fin in zip(cortes, cortes[1:]) if fin > inicio]
+
+
+def estadisticas_fragmento(libro, inicio, fin):  # acumuladores parciales de las filas [inicio, fin)
+    codigos, montos, fechas = libro.columnas()
+    return estadisticas_columnas(codigos[inicio:fin], montos[inicio:fin], libro.categorias, fechas[inicio:fin])
+
+
+# ------------------------------
+# Procesos
+# ------------------------------
+_libro = None  # libro binario abierto en cada proceso del grupo
+
+
+def _iniciar_proceso(ruta_libro, formato_fecha):  # mapea el libro una vez por proceso (no se copia)
+    global _libro
+    _libro = LibroBinario(ruta_libro, formato_fecha)
+
+
+def _trabajo_fragmento(rango):  # cuerpo de cada trabajo: estadísticas de un fragmento
+    return estadisticas_fragmento(_libro, *rango)
+
+
+# ------------------------------
+# Agregación
+# ------------------------------
+def estadisticas_paralelas(gastos, procesos=None, formato_fecha=FORMATO_FECHA, minimo=MINIMO_FILAS_FRAGMENTO):  # estadísticas en varios núcleos
+    """
+    Calcula las estadísticas por categoría (las de crear_estadisticas) repartiendo las filas
+    en `procesos` procesos (por defecto, uno por procesador). `gastos` es la ruta de un libro
+    binario, un LibroBinario o cualquier almacén; en este último caso se escribe primero un
+    libro temporal para que los procesos lo mapeen. Con un solo proceso o un solo fragmento
+    se calcula acá mismo, sin grupo.
+    """
+    temporal = None
+    if isinstance(gastos, str) and es_libro_binario(gastos):
+        ruta_libro = gastos
+    elif isinstance(gastos, LibroBinario):
+        ruta_libro = gastos.ruta
+    else:
+        descriptor, temporal = tempfile.mkstemp(suffix=".gbin")
+        os.close(descriptor)
+        escribir_binario(gastos, temporal)
+        ruta_libro = temporal
+    libro = None
+    try:
+        libro = gastos if isinstance(gastos, LibroBinario) else LibroBinario(ruta_libro, formato_fecha)
+        procesos = max(1, procesos or os.cpu_count() or 1)
+        rangos = fragmentos(len(libro), procesos, minimo)
+        if procesos == 1 or len(rangos) <= 1:  # no vale la pena levantar procesos
+            parciales = (estadisticas_fragmento(libro, inicio, fin) for inicio, fin in rangos)
+            return _combinar(parciales)
+        contexto = multiprocessing.get_context("spawn")  # procesos limpios, igual que Reportes_Gastos
+        with contexto.Pool(min(procesos, len(rangos)), initializer=_iniciar_proceso,
+                           initargs=(ruta_libro, formato_fecha)) as grupo:
+            return _combinar(grupo.imap_unordered(_trabajo_fragmento, rangos))  # se combinan a medida que llegan
+    finally:
+        if libro is not None and libro is not gastos:  # el que se abrió acá, antes de borrar el archivo
+            libro.cerrar()
+        if temporal is not None:
+            os.remove(temporal)
+
+
+def _combinar(parciales):  # suma los acumuladores parciales (el orden no importa)
+    estadisticas = {}
+    for parcial in parciales:
+        estadisticas_combinar(estadisticas, parcial)
+    return estadisticas
+
@@ -0,0 +1,81 @@
+# Almacen_Diferido.py
+# Apertura diferida: el almacén se entrega al instante con la cantidad de gastos y el próximo
+# id leídos de la cabecera, y los gastos se cargan en un hilo. Lo que necesita los datos
+# (recorrerlos, buscar uno, guardar, graficar) espera a que la carga termine.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import threading  # para cargar los gastos sin frenar el menú
+
+from Agregacion_Gastos import estadisticas_columnas  # estadísticas de lo cargado
+
+
+# ------------------------------
+# Almacén con carga diferida
+# ------------------------------
+class AlmacenDiferido:
+    """
+    Envuelve un AlmacenGastos que todavía se está cargando. len() y proximo_id salen de
+    la cabecera sin esperar; cualquier otro acceso (incluido `if not gastos`) espera la
+    carga y se delega en el almacén real. crear_estadisticas() devuelve de inmediato el
+    diccionario que el hilo completa antes de terminar.
+    """
+
+    def __init__(self, cargar, cantidad, proximo_id):  # `cargar()` devuelve el almacén completo
+        self._cantidad = cantidad  # gastos según la cabecera
+        self._proximo_id = proximo_id  # próximo id según la cabecera
+        self._estadisticas = {}  # se completa en el hilo de carga
+        self._almacen = None  # almacén real (cuando termina la carga)
+        self._error = None  # excepción de la carga, si falló
+        self._hilo = threading.Thread(target=self._cargar, args=(cargar,), daemon=True)  # hilo de carga
+        self._hilo.start()
+
+    def _cargar(self, cargar):  # cuerpo del hilo
+        try:
+            almacen = cargar()
+            codigos, montos, fechas = almacen.columnas()
+            self._estadisticas.update(estadisticas_columnas(codigos, montos, almacen.categorias, fechas))  # mismo dict ya entregado
+            self._almacen = almacen
+        except Exception as e:  # se relanza al pedir los datos
+            self._error = e
+
+    def cargado(self):  # True si los gastos ya están en memoria (no espera)
+        return not self._hilo.is_alive()
+
+    def almacen(self):  # espera la carga y devuelve el almacén real
+        self._hilo.join()
+        if self._error is not None:
+            raise self._error
+        return self._almacen
+
+    def estadisticas(self):  # estadísticas por categoría (se completan al terminar la carga)
+        return self._estadisticas
+
+    @property
+    def proximo_id(self):  # próximo id libre, sin esperar la carga
+        return self._proximo_id if self._almacen is None else self._almacen.proximo_id
+
+    def __len__(self):  # cantidad de gastos, sin esperar la carga
+        return self._cantidad if self._almacen is None else len(self._almacen)
+
+    def __bool__(self):  # los menús preguntan esto antes de usar los gastos: espera la carga
+        return bool(self.almacen())
+
+    def __getattr__(self, nombre):  # el resto de la interfaz del almacén
+        return getattr(self.almacen(), nombre)
+
+    def __getitem__(self, id_gasto):
+        return self.almacen()[id_gasto]
+
+    def __setitem__(self, id_gasto, gasto):
+        self.almacen()[id_gasto] = gasto
+
+    def __delitem__(self, id_gasto):
+        del self.almacen()[id_gasto]
+
+    def __contains__(self, id_gasto):
+        return id_gasto in self.almacen()
+
+    def __iter__(self):
+        return iter(self.almacen())
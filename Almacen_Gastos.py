@@ -0,0 +1,445 @@
+# Almacen_Gastos.py
+# Almacén de gastos por columnas: cada campo se guarda en un arreglo NumPy en lugar
+# de un diccionario por gasto, lo que reduce mucho la memoria con ledgers grandes.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import sys  # para sys.intern (una sola copia de cada texto repetido)
+import numpy as np  # arreglos tipados para cada columna
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, fecha_a_ordinal, ordinal_a_fecha  # fechas como números de día
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+CAPACIDAD_INICIAL = 1024  # filas reservadas al crear un almacén vacío
+CAMPOS = ("categoria", "monto", "fecha", "descripcion")  # campos de cada gasto
+PROPORCION_COMPACTAR = 0.25  # se compacta cuando las filas borradas superan este porcentaje
+MINIMO_COMPACTAR = 1024  # y además son al menos esta cantidad (evita compactar almacenes chicos)
+MAXIMO_EDICIONES = 1 << 16  # filas editadas que se recuerdan para los índices de consultas (después se rehacen)
+COLUMNAS = ("_ids", "_monto", "_fecha", "_categoria", "_descripcion", "_activo")  # atributos con las columnas
+
+
+# ------------------------------
+# Almacén columnar
+# ------------------------------
+class AlmacenGastos:
+    """
+    Guarda los gastos en columnas:
+      - monto: float64
+      - fecha: int32 con el número de día (ordinal)
+      - categoria: código uint16 que apunta a la tabla de categorías
+      - descripcion: código uint32 que apunta a la tabla de descripciones (textos internados)
+    Se usa como un diccionario id -> gasto: gastos[id], gastos[id] = gasto, del gastos[id],
+    id in gastos, len(gastos), keys(), values() e items(), igual que el diccionario de la consola.
+    Los gastos se devuelven como diccionarios nuevos; para modificar uno hay que volver a asignarlo.
+    Buscar por id es O(1) gracias al índice id -> fila. Borrar solo marca la fila (O(1));
+    cuando las filas borradas son muchas se compactan todas juntas conservando el orden de alta.
+    """
+
+    def __init__(self, formato_fecha=FORMATO_FECHA, capacidad=CAPACIDAD_INICIAL):  # crea un almacén vacío
+        self.formato_fecha = formato_fecha  # formato con el que se devuelven las fechas
+        self._ids = np.zeros(capacidad, dtype=np.int64)  # id de cada fila
+        self._monto = np.zeros(capacidad, dtype=np.float64)  # columna de montos
+        self._fecha = np.zeros(capacidad, dtype=np.int32)  # columna de fechas (ordinales)
+        self._categoria = np.zeros(capacidad, dtype=np.uint16)  # columna de códigos de categoría
+        self._descripcion = np.zeros(capacidad, dtype=np.uint32)  # columna de códigos de descripción
+        self._activo = np.zeros(capacidad, dtype=bool)  # False = fila borrada
+        self._filas = 0  # filas ocupadas (incluye borradas)
+        self._vivos = 0  # gastos no borrados
+        self._fila_por_id = {}  # índice id -> fila
+        self.categorias = []  # código -> nombre de categoría
+        self._codigo_categoria = {}  # nombre de categoría -> código
+        self._descripciones = []  # código -> texto de descripción
+        self._codigo_descripcion = {}  # texto de descripción -> código
+        self._fechas_texto = {}  # fila -> texto original de fechas que no se pudieron interpretar
+        self.proximo_id = 1  # próximo id libre
+        self.version = 0  # aumenta con cada cambio (sirve para invalidar cachés de búsquedas o gráficos)
+        self.generacion = 0  # aumenta cuando las filas cambian de posición (los índices ordenados se rehacen)
+        self._filas_editadas = []  # filas reescritas en su lugar desde la última compactación
+        self._pendientes = None  # ids cambiados desde el último guardado (None = no se registran)
+
+    # ---------- construcción ----------
+    @classmethod
+    def desde_registros(cls, datos, formato_fecha=FORMATO_FECHA):  # crea un almacén desde un dict id->gasto o una lista
+        """
+        Construye un almacén a partir de un diccionario id -> gasto (formato de la consola)
+        o de una lista de gastos (formato de la interfaz); en la lista los ids se asignan en orden.
+        """
+        almacen = cls(formato_fecha=formato_fecha, capacidad=max(len(datos), CAPACIDAD_INICIAL))  # reserva lugar para todo
+        if isinstance(datos, dict):  # dict id -> gasto
+            for id_gasto, gasto in datos.items():
+                almacen.agregar(gasto, id_gasto)  # respeta el id original
+        else:  # lista de gastos
+            for gasto in datos:
+                almacen.agregar(gasto)  # asigna ids consecutivos
+        return almacen  # devuelve el almacén cargado
+
+    # ---------- utilidades internas ----------
+    @staticmethod
+    def _id(clave):  # normaliza la clave a entero ("7" y 7 son el mismo gasto)
+        try:
+            return int(clave)  # convierte a entero
+        except (TypeError, ValueError):
+            return None  # clave que no puede ser un id
+
+    def _asegurar_capacidad(self, necesarias):  # agranda las columnas si no hay lugar
+        capacidad = self._ids.shape[0]  # capacidad actual
+        if necesarias <= capacidad:  # hay lugar suficiente
+            return
+        nueva = max(necesarias, capacidad * 2)  # duplica (costo amortizado O(1) por alta)
+        for nombre in COLUMNAS:
+            vieja = getattr(self, nombre)  # columna actual
+            columna = np.zeros(nueva, dtype=vieja.dtype)  # columna más grande
+            columna[:self._filas] = vieja[:self._filas]  # copia lo ocupado
+            setattr(self, nombre, columna)  # reemplaza la columna
+
+    def _codificar_categoria(self, categoria):  # devuelve el código de la categoría (la registra si es nueva)
+        codigo = self._codigo_categoria.get(categoria)  # busca el código
+        if codigo is None:  # categoría nueva
+            codigo = len(self.categorias)  # siguiente código libre
+            if codigo > np.iinfo(np.uint16).max:  # no entra en uint16
+                raise ValueError("Demasiadas categorías distintas.")
+            self.categorias.append(categoria)  # registra el nombre
+            self._codigo_categoria[categoria] = codigo  # registra el código
+        return codigo
+
+    def _codificar_descripcion(self, descripcion):  # devuelve el código de la descripción (internada)
+        codigo = self._codigo_descripcion.get(descripcion)  # busca el código
+        if codigo is None:  # descripción nueva
+            codigo = len(self._descripciones)  # siguiente código libre
+            texto = sys.intern(descripcion)  # una sola copia del texto
+            self._descripciones.append(texto)  # registra el texto
+            self._codigo_descripcion[texto] = codigo  # registra el código
+        return codigo
+
+    def _escribir_fila(self, fila, gasto):  # guarda los campos del gasto en la fila indicada
+        fecha_texto = str(gasto.get("fecha", ""))  # fecha como texto
+        ordinal = fecha_a_ordinal(fecha_texto)  # fecha como número de día
+        if ordinal == SIN_FECHA:  # fecha libre que no se pudo interpretar
+            self._fechas_texto[fila] = fecha_texto  # conserva el texto original
+        else:
+            self._fechas_texto.pop(fila, None)  # la fila ya no necesita el texto original
+        self._fecha[fila] = ordinal  # columna fecha
+        self._monto[fila] = float(gasto.get("monto", 0))  # columna monto
+        self._categoria[fila] = self._codificar_categoria(str(gasto.get("categoria", "Otros")))  # columna categoría
+        self._descripcion[fila] = self._codificar_descripcion(str(gasto.get("descripcion", "")))  # columna descripción
+
+    def _leer_fila(self, fila):  # arma el diccionario del gasto guardado en la fila
+        ordinal = self._fecha[fila]  # número de día
+        return {
+            "categoria": self.categorias[self._categoria[fila]],  # decodifica la categoría
+            "monto": float(self._monto[fila]),  # monto como float de Python
+            "fecha": self._fechas_texto[fila] if ordinal == SIN_FECHA else ordinal_a_fecha(ordinal, self.formato_fecha),  # texto de la fecha
+            "descripcion": self._descripciones[self._descripcion[fila]],  # decodifica la descripción
+        }
+
+    def _filas_vivas(self):  # índices de las filas no borradas, en orden de alta
+        return np.flatnonzero(self._activo[:self._filas])  # posiciones activas
+
+    # ---------- CRUD ----------
+    def agregar(self, gasto, id_gasto=None):  # agrega un gasto y devuelve su id
+        """
+        Agrega un gasto (diccionario con categoria, monto, fecha y descripcion).
+        Si no se indica id, usa el próximo libre. Devuelve el id asignado.
+        """
+        id_gasto = self.proximo_id if id_gasto is None else self._id(id_gasto)  # id a usar
+        if id_gasto is None:  # la clave no es un número
+            raise KeyError("El id del gasto debe ser un número entero.")
+        if id_gasto in self._fila_por_id:  # el id ya existe: se reemplaza
+            self.actualizar(id_gasto, gasto)
+            return id_gasto
+        self._asegurar_capacidad(self._filas + 1)  # garantiza lugar
+        fila = self._filas  # siguiente fila libre
+        self._escribir_fila(fila, gasto)  # escribe los campos
+        self.version += 1  # los datos cambiaron
+        self._ids[fila] = id_gasto  # guarda el id
+        self._activo[fila] = True  # marca la fila como viva
+        self._fila_por_id[id_gasto] = fila  # indexa el id
+        self._marcar_cambio(id_gasto)  # alta pendiente de guardar
+        self._filas += 1  # una fila más ocupada
+        self._vivos += 1  # un gasto más
+        self.proximo_id = max(self.proximo_id, id_gasto + 1)  # avanza el próximo id libre
+        return id_gasto
+
+    def extender(self, lista):  # agrega varios gastos y devuelve sus ids
+        """
+        Agrega todos los gastos de la lista, reservando lugar una sola vez.
+        """
+        self._asegurar_capacidad(self._filas + len(lista))  # una sola ampliación
+        return [self.agregar(gasto) for gasto in lista]  # ids asignados
+
+    def _anexar_columnas(self, montos, fechas, codigos_categoria, codigos_descripcion):  # agrega filas nuevas desde arreglos
+        n = montos.shape[0]  # cantidad de filas nuevas
+        self._asegurar_capacidad(self._filas + n)  # una sola ampliación
+        inicio, fin = self._filas, self._filas + n  # rango de filas nuevas
+        ids = np.arange(self.proximo_id, self.proximo_id + n, dtype=np.int64)  # ids nuevos consecutivos
+        self._ids[inicio:fin] = ids
+        self._monto[inicio:fin] = montos  # copia vectorizada de cada columna
+        self._fecha[inicio:fin] = fechas
+        self._categoria[inicio:fin] = codigos_categoria
+        self._descripcion[inicio:fin] = codigos_descripcion
+        self._activo[inicio:fin] = True
+        self._fila_por_id.update(zip(ids.tolist(), range(inicio, fin)))  # indexa los ids nuevos
+        if self._pendientes is not None:
+            self._pendientes.update(ids.tolist())  # altas pendientes de guardar
+        self._filas, self._vivos = fin, self._vivos + n  # filas ocupadas y gastos vivos
+        self.proximo_id += n  # avanza el próximo id libre
+        self.version += 1  # los datos cambiaron
+        return inicio, ids.tolist()  # primera fila nueva e ids asignados
+
+    def extender_columnas(self, montos, fechas, categorias, codigos_categoria, descripciones, codigos_descripcion):  # alta masiva desde columnas
+        """
+        Agrega muchos gastos a partir de columnas ya separadas: montos (float), fechas
+        (ordinales válidos) y, para categoría y descripción, la lista de textos distintos
+        junto con el código de cada fila dentro de esa lista. Devuelve los ids asignados.
+        Solo se registra en Python cada texto distinto; el resto es copia de arreglos.
+        """
+        if len(montos) == 0:  # nada que agregar
+            return []
+        mapa_cat = np.array([self._codificar_categoria(str(c)) for c in categorias], dtype=np.uint16)  # código de la lista -> código propio
+        mapa_desc = np.array([self._codificar_descripcion(str(d)) for d in descripciones], dtype=np.uint32)
+        _, ids = self._anexar_columnas(np.asarray(montos, dtype=np.float64), np.asarray(fechas, dtype=np.int32),
+                                       mapa_cat[codigos_categoria], mapa_desc[codigos_descripcion])
+        return ids
+
+    def absorber(self, otro, posiciones=None):  # agrega de una vez los gastos de otro almacén y devuelve sus ids
+        """
+        Copia al final de este almacén los gastos vivos de `otro`, con ids nuevos consecutivos.
+        Con `posiciones` (índices crecientes dentro de los gastos vivos, en el orden de
+        columnas()) se copian solo esos. Las columnas se copian vectorizadas y los códigos de
+        categoría y descripción se traducen con una tabla por texto distinto, así el costo en
+        Python es O(textos distintos).
+        """
+        filas = otro._filas_vivas()  # filas vivas del otro almacén
+        if posiciones is not None:  # solo algunos
+            filas = filas[posiciones]
+        if filas.size == 0:  # nada que agregar
+            return []
+        mapa_cat = np.array([self._codificar_categoria(c) for c in otro.categorias], dtype=np.uint16)  # código del otro -> código propio
+        mapa_desc = np.array([self._codificar_descripcion(d) for d in otro._descripciones], dtype=np.uint32)
+        inicio, ids = self._anexar_columnas(otro._monto[filas], otro._fecha[filas],
+                                            mapa_cat[otro._categoria[filas]], mapa_desc[otro._descripcion[filas]])
+        for vieja, texto in otro._fechas_texto.items():  # fechas libres (son pocas)
+            posicion = int(np.searchsorted(filas, vieja))
+            if posicion < filas.size and filas[posicion] == vieja:  # la fila se copió
+                self._fechas_texto[inicio + posicion] = texto
+        return ids
+
+    def instantanea(self):  # copia de solo lectura para recorrer los gastos desde otro hilo
+        """
+        Devuelve una copia de las columnas en el estado actual, para exportar en segundo plano
+        mientras la interfaz sigue modificando el almacén. No copia el índice id -> fila,
+        así que sirve para len(), keys(), values(), items() y columnas(), no para buscar por id.
+        Las tablas de textos se comparten: solo crecen, nunca cambian lo ya registrado.
+        """
+        copia = AlmacenGastos.__new__(AlmacenGastos)  # sin reservar columnas nuevas
+        copia.__dict__.update(self.__dict__)  # mismos atributos
+        for nombre in COLUMNAS:  # columnas copiadas (solo lo ocupado)
+            setattr(copia, nombre, getattr(self, nombre)[:self._filas].copy())
+        copia._fechas_texto = dict(self._fechas_texto)  # textos de fechas del momento
+        copia._fila_por_id = {}  # sin índice
+        copia._pendientes = None  # la copia no registra cambios
+        copia._filas_editadas = list(self._filas_editadas)  # no comparte la lista con el original
+        return copia
+
+    def obtener(self, id_gasto):  # devuelve el gasto como diccionario (o None si no existe)
+        fila = self._fila_por_id.get(self._id(id_gasto))  # busca la fila por id
+        return None if fila is None else self._leer_fila(fila)  # materializa el gasto
+
+    def actualizar(self, id_gasto, cambios):  # modifica los campos indicados de un gasto
+        """
+        Actualiza un gasto existente con los campos presentes en `cambios`.
+        Lanza KeyError si el id no existe.
+        """
+        fila = self._fila_por_id.get(self._id(id_gasto))  # busca la fila
+        if fila is None:  # id inexistente
+            raise KeyError(id_gasto)
+        gasto = self._leer_fila(fila)  # valores actuales
+        gasto.update({k: v for k, v in cambios.items() if k in CAMPOS})  # aplica solo campos conocidos
+        self._escribir_fila(fila, gasto)  # reescribe la fila
+        self.version += 1  # los datos cambiaron
+        self._anotar_edicion(fila)  # los índices de consultas la revisan aparte
+        self._marcar_cambio(self._id(id_gasto))  # cambio pendiente de guardar
+
+    def eliminar(self, id_gasto):  # borra un gasto y devuelve sus datos
+        """
+        Marca la fila del gasto como borrada y lo quita del índice. Devuelve el gasto eliminado.
+        Lanza KeyError si el id no existe.
+        """
+        fila = self._fila_por_id.pop(self._id(id_gasto), None)  # saca el id del índice
+        if fila is None:  # id inexistente
+            raise KeyError(id_gasto)
+        gasto = self._leer_fila(fila)  # copia de los datos a devolver
+        self._activo[fila] = False  # marca la fila como borrada
+        self.version += 1  # los datos cambiaron
+        self._fechas_texto.pop(fila, None)  # libera el texto de fecha si lo tenía
+        self._vivos -= 1  # un gasto menos
+        self._marcar_cambio(self._id(id_gasto))  # baja pendiente de guardar
+        self._compactar_si_conviene()  # limpia filas borradas si ya son demasiadas
+        return gasto
+
+    # ---------- cambios pendientes de guardar ----------
+    def seguir_cambios(self):  # empieza a registrar qué ids cambian (para guardar solo eso)
+        self._pendientes = set()
+
+    def registrando_cambios(self):  # True si se está llevando la cuenta de los cambios
+        return self._pendientes is not None
+
+    def _marcar_cambio(self, id_gasto):  # anota un id cambiado, si se están registrando
+        if self._pendientes is not None:
+            self._pendientes.add(id_gasto)
+
+    def tomar_cambios(self):  # devuelve los ids cambiados desde la última vez y vuelve a empezar
+        """
+        Devuelve el conjunto de ids dados de alta, modificados o borrados desde la llamada
+        anterior (o desde seguir_cambios). Con ese conjunto se guarda solo lo que cambió.
+        """
+        cambios = self._pendientes or set()  # ids cambiados
+        if self._pendientes is not None:
+            self._pendientes = set()  # vuelve a empezar
+        return cambios
+
+    def devolver_cambios(self, cambios):  # vuelve a anotar ids tomados (un guardado que falló)
+        if self._pendientes is not None:
+            self._pendientes |= cambios
+
+    # ---------- compactación de filas borradas ----------
+    def _compactar_si_conviene(self):  # compacta solo si las filas borradas superan el umbral
+        borradas = self._filas - self._vivos  # filas marcadas como borradas
+        if borradas >= MINIMO_COMPACTAR and borradas > self._filas * PROPORCION_COMPACTAR:
+            self.compactar()  # costo O(n), pero repartido entre muchas bajas
+
+    def compactar(self):  # elimina físicamente las filas borradas
+        """
+        Mueve las filas vivas al principio de las columnas, en el mismo orden de alta,
+        y reconstruye el índice id -> fila. Los ids no cambian.
+        """
+        filas = self._filas_vivas()  # posiciones vivas, en orden
+        vivos = filas.size  # cantidad de filas que quedan
+        for nombre in COLUMNAS:  # mueve cada columna
+            columna = getattr(self, nombre)
+            columna[:vivos] = columna[filas]  # copia vectorizada de las filas vivas
+        self._activo[vivos:self._filas] = False  # el resto queda libre
+        self._fechas_texto = {  # reubica los textos de fechas libres (son pocos)
+            int(np.searchsorted(filas, vieja)): texto for vieja, texto in self._fechas_texto.items()
+        }
+        self._fila_por_id = dict(zip(self._ids[:vivos].tolist(), range(vivos)))  # índice nuevo
+        self._filas = vivos  # filas ocupadas = vivas
+        self.version += 1  # las posiciones de las filas cambiaron
+        self.generacion += 1  # los índices por posición quedaron viejos
+        self._filas_editadas = []
+
+    # ---------- interfaz tipo diccionario ----------
+    def __getitem__(self, id_gasto):  # gastos[id]
+        gasto = self.obtener(id_gasto)  # materializa el gasto
+        if gasto is None:  # no existe
+            raise KeyError(id_gasto)
+        return gasto
+
+    def __setitem__(self, id_gasto, gasto):  # gastos[id] = gasto (alta o reemplazo)
+        self.agregar(gasto, id_gasto)
+
+    def __delitem__(self, id_gasto):  # del gastos[id]
+        self.eliminar(id_gasto)
+
+    def __contains__(self, id_gasto):  # id in gastos
+        return self._id(id_gasto) in self._fila_por_id
+
+    def __len__(self):  # len(gastos)
+        return self._vivos
+
+    def __iter__(self):  # recorre los ids en orden de alta
+        return iter(self.keys())
+
+    def keys(self):  # lista de ids vivos en orden de alta
+        return self._ids[self._filas_vivas()].tolist()
+
+    def values(self):  # recorre los gastos vivos como diccionarios
+        for fila in self._filas_vivas().tolist():
+            yield self._leer_fila(fila)
+
+    def items(self):  # recorre pares (id, gasto) de los gastos vivos
+        for fila in self._filas_vivas().tolist():
+            yield int(self._ids[fila]), self._leer_fila(fila)
+
+    # ---------- exportación ----------
+    def a_diccionario(self):  # dict id (texto) -> gasto, como el JSON de la consola
+        return {str(id_gasto): gasto for id_gasto, gasto in self.items()}
+
+    def a_lista(self):  # lista de gastos con su id, como el JSON de la interfaz
+        return [dict(gasto, id=id_gasto) for id_gasto, gasto in self.items()]
+
+    # ---------- acceso por columnas (agregaciones vectorizadas) ----------
+    def columnas(self):  # devuelve las columnas de los gastos vivos
+        """
+        Devuelve (codigos_categoria, montos, fechas) de los gastos vivos como arreglos NumPy,
+        para que las agregaciones trabajen sin crear un diccionario por gasto.
+        Los códigos se traducen con self.categorias.
+        """
+        filas = self._filas_vivas()  # posiciones vivas
+        return self._categoria[filas], self._monto[filas], self._fecha[filas]  # copias compactas
+
+    def columnas_registro(self):  # todas las columnas de los gastos vivos (para el libro binario)
+        """
+        Devuelve (ids, montos, fechas, codigos_categoria, codigos_descripcion, fechas_libres)
+        de los gastos vivos; fechas_libres es un dict posición -> texto con las fechas que no
+        se pudieron interpretar. Los códigos se traducen con self.categorias y tabla_descripciones().
+        """
+        filas = self._filas_vivas()  # posiciones vivas
+        libres = {int(np.searchsorted(filas, fila)): texto for fila, texto in self._fechas_texto.items()}  # son pocas
+        return (self._ids[filas], self._monto[filas], self._fecha[filas],
+                self._categoria[filas], self._descripcion[filas], libres)
+
+    def tabla_descripciones(self):  # textos de descripción, indexados por su código
+        return self._descripciones
+
+    def filas_con_codigos(self, categorias, descripciones, filas=None):  # filtra filas por códigos de categoría o descripción
+        """
+        Devuelve las posiciones de las filas vivas (o de `filas`, si se indica) cuya categoría
+        está en `categorias` o cuya descripción está en `descripciones` (listas de códigos).
+        Usa tablas de marcas por código, así el filtro es una lectura vectorizada de las columnas.
+        """
+        if filas is None:  # sin filas previas: todas las vivas
+            filas = self._filas_vivas()
+        marca_cat = np.zeros(len(self.categorias) + 1, dtype=bool)  # True en los códigos de categoría buscados
+        marca_cat[list(categorias)] = True
+        marca_desc = np.zeros(len(self._descripciones) + 1, dtype=bool)  # True en los códigos de descripción buscados
+        marca_desc[list(descripciones)] = True
+        coinciden = marca_cat[self._categoria[filas]] | marca_desc[self._descripcion[filas]]  # máscara de coincidencias
+        return filas[coinciden]  # posiciones que coinciden, en orden
+
+    def ids_de_filas(self, filas):  # traduce posiciones de filas a ids
+        return self._ids[filas].tolist()
+
+    # ---------- índices ordenados externos (ver Consultas_Gastos) ----------
+    def _anotar_edicion(self, fila):  # recuerda una fila reescrita en su lugar
+        if len(self._filas_editadas) >= MAXIMO_EDICIONES:  # demasiadas: conviene rehacer los índices
+            self.generacion += 1
+            self._filas_editadas = []
+        else:
+            self._filas_editadas.append(fila)
+
+    def filas_y_columnas(self):  # (filas vivas, codigos_categoria, montos, fechas) para armar un índice
+        filas = self._filas_vivas()
+        return filas, self._categoria[filas], self._monto[filas], self._fecha[filas]
+
+    def valores_de_filas(self, filas):  # (activas, codigos_categoria, montos, fechas) de esas filas
+        return self._activo[filas], self._categoria[filas], self._monto[filas], self._fecha[filas]
+
+    def marca_indices(self):  # punto de referencia para pedir después las filas cambiadas
+        return self.generacion, self._filas, len(self._filas_editadas)
+
+    def filas_cambiadas(self, marca):  # filas nuevas o editadas desde `marca` (None si las posiciones cambiaron)
+        """
+        Devuelve las filas agregadas o reescritas desde que se tomó `marca` con
+        marca_indices(). Las bajas no se informan: la fila queda marcada como borrada.
+        Devuelve None si desde entonces se compactó (hay que rehacer el índice).
+        """
+        generacion, filas, ediciones = marca
+        if generacion != self.generacion:
+            return None
+        return np.concatenate((np.arange(filas, self._filas, dtype=np.int64),
+                               np.array(self._filas_editadas[ediciones:], dtype=np.int64)))
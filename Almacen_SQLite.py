@@ -0,0 +1,435 @@
+# Almacen_SQLite.py
+# Almacén de gastos sobre una base SQLite: los gastos quedan en disco y solo se leen los que
+# se piden, así se pueden abrir bases con decenas de millones de gastos sin cargarlas enteras.
+# Tiene la misma interfaz tipo diccionario que AlmacenGastos, más agregaciones con GROUP BY.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # para reconocer la extensión
+import json  # textos que coinciden con una búsqueda, como parámetro
+import sqlite3  # motor de base de datos incluido en Python
+import numpy as np  # columnas para los gráficos
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, fecha_a_ordinal, ordinal_a_fecha  # fechas como números de día
+from Busqueda_Gastos import normalizar  # búsqueda sin tildes ni mayúsculas
+from Rollups_Gastos import periodos_vacios, periodos_sumar  # totales por día/semana/mes
+from Cuantiles_Gastos import cuantiles_vacios, cuantiles_sumar  # cubetas para cuantiles
+from Consultas_Gastos import IndiceConsultas, condicion_sql  # filtros por rango
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")  # extensiones que se abren como base SQLite
+FILAS_POR_LOTE = 1 << 16  # filas que se traen de la base por vez al armar columnas (acota la memoria)
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS gastos (
+    id INTEGER PRIMARY KEY,        -- id del gasto (alias del rowid)
+    fecha INTEGER NOT NULL,        -- número de día (ordinal); 0 si no se pudo interpretar
+    fecha_texto TEXT,              -- texto original de las fechas que no se pudieron interpretar
+    categoria TEXT NOT NULL,
+    descripcion TEXT NOT NULL,
+    monto REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS gastos_fecha ON gastos (fecha);
+CREATE INDEX IF NOT EXISTS gastos_categoria ON gastos (categoria, monto);  -- cubre GROUP BY categoria, monto
+CREATE INDEX IF NOT EXISTS gastos_monto ON gastos (monto);
+CREATE INDEX IF NOT EXISTS gastos_descripcion ON gastos (descripcion);  -- descripciones distintas sin recorrer la tabla
+"""
+# Sentencias fijas: sqlite3 guarda cada una ya preparada y la reutiliza en cada llamada
+SQL_INSERTAR = "INSERT INTO gastos (id, fecha, fecha_texto, categoria, descripcion, monto) VALUES (?, ?, ?, ?, ?, ?)"
+SQL_MODIFICAR = "UPDATE gastos SET fecha = ?, fecha_texto = ?, categoria = ?, descripcion = ?, monto = ? WHERE id = ?"
+SQL_OBTENER = "SELECT fecha, fecha_texto, categoria, descripcion, monto FROM gastos WHERE id = ?"
+SQL_ELIMINAR = "DELETE FROM gastos WHERE id = ?"
+SQL_RECORRER = "SELECT id, fecha, fecha_texto, categoria, descripcion, monto FROM gastos ORDER BY id"
+SQL_RECORRER_TRAMO = "SELECT id, fecha, fecha_texto, categoria, descripcion, monto FROM gastos WHERE id >= ? AND id < ?"
+# Instantánea: la tabla confirmada más los gastos que cambiaron después, con una vista temporal
+# llamada `gastos` (las tablas temporales tapan a las de la base con el mismo nombre)
+ESQUEMA_INSTANTANEA = (  # sentencias sueltas: executescript confirmaría la lectura en curso
+    "CREATE TEMP TABLE cambiados (id INTEGER PRIMARY KEY)",
+    "CREATE TEMP TABLE pendientes (id INTEGER PRIMARY KEY, fecha, fecha_texto, categoria, descripcion, monto)",
+    "CREATE TEMP VIEW gastos AS SELECT * FROM main.gastos WHERE id NOT IN cambiados UNION ALL SELECT * FROM pendientes",
+)
+SQL_FRECUENCIAS = "SELECT categoria, monto, COUNT(*) FROM gastos GROUP BY categoria, monto ORDER BY categoria, monto"
+SQL_CATEGORIAS = "SELECT DISTINCT categoria FROM gastos ORDER BY categoria"
+SQL_DESCRIPCIONES = "SELECT DISTINCT descripcion FROM gastos"
+SQL_MONTOS_CATEGORIA = "SELECT monto, fecha FROM gastos WHERE categoria = ?"
+SQL_DIAS = "SELECT categoria, fecha, COUNT(*), SUM(monto) FROM gastos WHERE fecha <> ? GROUP BY categoria, fecha"
+
+
+def es_base_sqlite(ruta):  # True si la ruta tiene extensión de base SQLite
+    return os.path.splitext(ruta)[1].lower() in EXTENSIONES_SQLITE
+
+
+# ------------------------------
+# Resultados de búsqueda paginados
+# ------------------------------
+class IdsConsulta:
+    """
+    Secuencia de ids (en orden) que coinciden con una condición, resuelta con SQL de a
+    páginas: len() hace un COUNT y cada slice trae solo esas filas. Si los slices se piden
+    seguidos (como hace la tabla al desplazarse) se continúa desde el último id leído,
+    sin OFFSET. append() suma ids dados de alta después de la búsqueda.
+    """
+
+    def __init__(self, con, condicion="", parametros=()):  # ids de `gastos WHERE condicion`
+        self._con = con  # conexión
+        self._condicion = condicion  # condición SQL (vacía = todos)
+        self._parametros = tuple(parametros)  # parámetros de la condición
+        self._largo = None  # cantidad en la base (se cuenta una vez)
+        self._extra = []  # ids agregados con append
+        self._posicion, self._ultimo_id = 0, None  # hasta dónde se leyó en orden
+
+    def _donde(self, *extra):  # arma el WHERE con la condición y un filtro adicional
+        partes = [p for p in (self._condicion,) + extra if p]
+        return " WHERE " + " AND ".join(f"({p})" for p in partes) if partes else ""
+
+    def __len__(self):  # cantidad de ids
+        if self._largo is None:
+            self._largo = self._con.execute("SELECT COUNT(*) FROM gastos" + self._donde(), self._parametros).fetchone()[0]
+        return self._largo + len(self._extra)
+
+    def __getitem__(self, rebanada):  # solo slices: ids[desde:hasta]
+        inicio, fin, _ = rebanada.indices(len(self))  # límites normalizados
+        en_base = max(0, min(fin, self._largo) - inicio)  # cuántos salen de la base
+        ids = []
+        if en_base:
+            if inicio == self._posicion and self._ultimo_id is not None:  # continúa donde quedó
+                sql = "SELECT id FROM gastos" + self._donde("id > ?") + " ORDER BY id LIMIT ?"
+                parametros = self._parametros + (self._ultimo_id, en_base)
+            else:  # salto: usa OFFSET
+                sql = "SELECT id FROM gastos" + self._donde() + " ORDER BY id LIMIT ? OFFSET ?"
+                parametros = self._parametros + (en_base, inicio)
+            ids = [fila[0] for fila in self._con.execute(sql, parametros)]
+            if ids:
+                self._posicion, self._ultimo_id = inicio + en_base, ids[-1]  # recuerda hasta dónde leyó
+        return ids + self._extra[max(inicio - self._largo, 0):max(fin - self._largo, 0)]
+
+    def append(self, id_gasto):  # agrega un id dado de alta después de la búsqueda
+        self._extra.append(id_gasto)
+
+
+# ------------------------------
+# Almacén SQLite
+# ------------------------------
+class AlmacenSQLite:
+    """
+    Guarda los gastos en una tabla SQLite con índices por fecha, categoría y monto.
+    Se usa igual que AlmacenGastos (gastos[id], del gastos[id], len, items(), columnas()...).
+    Los cambios quedan en una transacción hasta confirmar(), como los cambios en memoria
+    quedan hasta guardar; cerrar sin confirmar los descarta.
+    """
+
+    def __init__(self, ruta, formato_fecha=FORMATO_FECHA, solo_lectura=False, conexion=None):  # abre (o crea) la base
+        self.ruta = ruta  # archivo de la base
+        self.formato_fecha = formato_fecha  # formato con el que se devuelven las fechas
+        # la de solo lectura se usa desde otro hilo; una instantánea trae su conexión ya preparada
+        self._con = conexion or sqlite3.connect(ruta, check_same_thread=not solo_lectura)
+        if not solo_lectura:
+            self._con.execute("PRAGMA journal_mode=WAL")  # lectores (exportar en segundo plano) no bloquean
+            self._con.executescript(ESQUEMA)  # crea tabla e índices si faltan
+        if conexion is None:  # (una instantánea los recibe de su almacén, sin contar)
+            self._contar()  # cantidad y próximo id, que se mantienen en cada cambio
+        self._categorias = None  # caché de la lista de categorías (se arma al pedirla)
+        self._textos = None  # caché (versión, textos normalizados) para buscar
+        self.version = 0  # aumenta con cada cambio, como en AlmacenGastos
+        self._tramos = []  # [desde, hasta) de ids cambiados desde el último confirmar (para la instantánea)
+
+    # ---------- utilidades internas ----------
+    @staticmethod
+    def _id(clave):  # normaliza la clave a entero ("7" y 7 son el mismo gasto)
+        try:
+            return int(clave)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _valores(gasto):  # (fecha, fecha_texto, categoria, descripcion, monto) para la base
+        fecha_texto = str(gasto.get("fecha", ""))  # fecha como texto
+        ordinal = fecha_a_ordinal(fecha_texto)  # fecha como número de día
+        return (ordinal, fecha_texto if ordinal == SIN_FECHA else None, str(gasto.get("categoria", "Otros")),
+                str(gasto.get("descripcion", "")), float(gasto.get("monto", 0)))
+
+    def _gasto(self, fecha, fecha_texto, categoria, descripcion, monto):  # arma el diccionario del gasto
+        return {
+            "categoria": categoria,
+            "monto": monto,
+            "fecha": fecha_texto if fecha == SIN_FECHA else ordinal_a_fecha(fecha, self.formato_fecha),
+            "descripcion": descripcion,
+        }
+
+    def _cambio(self, desde=None, hasta=None):  # registra que los datos (los ids [desde, hasta)) cambiaron
+        if desde is not None and desde < hasta:
+            if self._tramos and self._tramos[-1][0] <= desde <= self._tramos[-1][1]:  # sigue al último tramo
+                self._tramos[-1][1] = max(self._tramos[-1][1], hasta)
+            else:
+                self._tramos.append([desde, hasta])
+        self.version += 1
+        self._categorias = None  # puede haber categorías nuevas o sin gastos
+
+    def _contar(self):  # lee de la base la cantidad de gastos y el próximo id libre
+        self._cantidad, self.proximo_id = self._con.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) + 1 FROM gastos").fetchone()
+
+    @property
+    def categorias(self):  # lista de categorías (código = posición), la misma que usa columnas()
+        if self._categorias is None:
+            self._categorias = [fila[0] for fila in self._con.execute(SQL_CATEGORIAS)]  # recorre el índice
+        return self._categorias
+
+    # ---------- CRUD ----------
+    def agregar(self, gasto, id_gasto=None):  # agrega un gasto y devuelve su id
+        if id_gasto is not None:
+            id_gasto = self._id(id_gasto)
+            if id_gasto is None:
+                raise KeyError("El id del gasto debe ser un número entero.")
+            if id_gasto in self:  # el id ya existe: se reemplaza
+                self.actualizar(id_gasto, gasto)
+                return id_gasto
+        else:
+            id_gasto = self.proximo_id  # sin id: el próximo libre (no se reutilizan ids borrados)
+        self._con.execute(SQL_INSERTAR, (id_gasto,) + self._valores(gasto))
+        self._cantidad += 1
+        self.proximo_id = max(self.proximo_id, id_gasto + 1)
+        self._cambio(id_gasto, id_gasto + 1)
+        return id_gasto
+
+    def extender(self, lista):  # agrega varios gastos en una sola sentencia y devuelve sus ids
+        primero = self.proximo_id  # los ids se asignan seguidos desde acá
+        cursor = self._con.executemany(SQL_INSERTAR, ((primero + i,) + self._valores(g) for i, g in enumerate(lista)))
+        self._cantidad += cursor.rowcount
+        self.proximo_id += cursor.rowcount
+        self._cambio(primero, self.proximo_id)
+        return list(range(primero, self.proximo_id))
+
+    def absorber(self, otro):  # agrega todos los gastos de otro almacén con ids nuevos
+        return self.extender(otro.values())
+
+    def cargar_registros(self, pares):  # agrega pares (id, gasto) respetando los ids (base nueva)
+        extremos = []  # menor y mayor id cargados
+
+        def filas():  # filas a insertar, anotando los extremos
+            for i, g in pares:
+                id_gasto = self._id(i)
+                extremos[:] = [min(extremos[0], id_gasto), max(extremos[1], id_gasto)] if extremos else [id_gasto, id_gasto]
+                yield (id_gasto,) + self._valores(g)
+
+        self._con.executemany(SQL_INSERTAR, filas())
+        self._contar()
+        if extremos:
+            self._cambio(extremos[0], extremos[1] + 1)
+
+    def obtener(self, id_gasto):  # devuelve el gasto como diccionario (o None si no existe)
+        fila = self._con.execute(SQL_OBTENER, (self._id(id_gasto),)).fetchone()  # búsqueda por clave primaria
+        return None if fila is None else self._gasto(*fila)
+
+    def actualizar(self, id_gasto, cambios):  # modifica los campos indicados de un gasto
+        gasto = self.obtener(id_gasto)  # valores actuales
+        if gasto is None:
+            raise KeyError(id_gasto)
+        gasto.update({k: v for k, v in cambios.items() if k in gasto})  # aplica solo campos conocidos
+        self._con.execute(SQL_MODIFICAR, self._valores(gasto) + (self._id(id_gasto),))
+        self._cambio(self._id(id_gasto), self._id(id_gasto) + 1)
+
+    def eliminar(self, id_gasto):  # borra un gasto y devuelve sus datos
+        gasto = self.obtener(id_gasto)
+        if gasto is None:
+            raise KeyError(id_gasto)
+        self._con.execute(SQL_ELIMINAR, (self._id(id_gasto),))
+        self._cantidad -= 1
+        self._cambio(self._id(id_gasto), self._id(id_gasto) + 1)
+        return gasto
+
+    # ---------- transacción ----------
+    def confirmar(self):  # guarda en la base los cambios pendientes
+        self._con.commit()
+        self._tramos = []
+
+    def descartar(self):  # deshace los cambios pendientes
+        self._con.rollback()
+        self._tramos = []
+        self._contar()
+        self._cambio()
+
+    def cerrar(self):  # cierra la conexión (lo no confirmado se descarta)
+        self._con.close()
+
+    def instantanea(self):  # vista de solo lectura para leer desde otro hilo
+        """
+        Devuelve otro AlmacenSQLite de solo lectura con los gastos de este momento, cambios
+        sin confirmar incluidos, sin confirmarlos. Abre una conexión aparte con una lectura
+        que queda fija en lo último confirmado (con WAL, lo que se confirme después no se ve)
+        y le copia solo los gastos que cambiaron desde entonces: el costo depende de los
+        cambios pendientes, no del tamaño de la base. Una vista temporal `gastos` junta las
+        dos partes. Hay que cerrarla con cerrar() al terminar.
+        """
+        con = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)  # transacciones a mano
+        try:
+            con.execute("BEGIN")
+            con.execute("SELECT id FROM main.gastos LIMIT 1").fetchone()  # empieza la lectura: queda fija acá
+            for sentencia in ESQUEMA_INSTANTANEA:
+                con.execute(sentencia)
+            tramos = []  # tramos ordenados y sin superponerse
+            for desde, hasta in sorted(self._tramos):
+                if tramos and desde <= tramos[-1][1]:
+                    tramos[-1][1] = max(tramos[-1][1], hasta)
+                else:
+                    tramos.append([desde, hasta])
+            con.executemany("INSERT INTO cambiados VALUES (?)",
+                            ((i,) for desde, hasta in tramos for i in range(desde, hasta)))
+            for desde, hasta in tramos:  # su estado actual, leído por esta conexión (ve lo no confirmado)
+                con.executemany("INSERT INTO pendientes VALUES (?, ?, ?, ?, ?, ?)",
+                                self._con.execute(SQL_RECORRER_TRAMO, (desde, hasta)))
+        except BaseException:
+            con.close()
+            raise
+        copia = AlmacenSQLite(self.ruta, self.formato_fecha, solo_lectura=True, conexion=con)
+        copia._cantidad, copia.proximo_id = self._cantidad, self.proximo_id
+        return copia
+
+    # ---------- interfaz tipo diccionario ----------
+    def __getitem__(self, id_gasto):  # gastos[id]
+        gasto = self.obtener(id_gasto)
+        if gasto is None:
+            raise KeyError(id_gasto)
+        return gasto
+
+    def __setitem__(self, id_gasto, gasto):  # gastos[id] = gasto
+        self.agregar(gasto, id_gasto)
+
+    def __delitem__(self, id_gasto):  # del gastos[id]
+        self.eliminar(id_gasto)
+
+    def __contains__(self, id_gasto):  # id in gastos
+        return self._con.execute("SELECT 1 FROM gastos WHERE id = ?", (self._id(id_gasto),)).fetchone() is not None
+
+    def __len__(self):  # len(gastos), sin COUNT en cada llamada
+        return self._cantidad
+
+    def __iter__(self):  # recorre los ids en orden
+        return (fila[0] for fila in self._con.execute("SELECT id FROM gastos ORDER BY id"))
+
+    def keys(self):  # lista de ids en orden
+        return list(self)
+
+    def values(self):  # recorre los gastos como diccionarios, leyendo de a poco
+        for fila in self._con.execute(SQL_RECORRER):
+            yield self._gasto(*fila[1:])
+
+    def items(self):  # recorre pares (id, gasto)
+        for fila in self._con.execute(SQL_RECORRER):
+            yield fila[0], self._gasto(*fila[1:])
+
+    # ---------- exportación ----------
+    def a_diccionario(self):  # dict id (texto) -> gasto, como el JSON de la consola
+        return {str(id_gasto): gasto for id_gasto, gasto in self.items()}
+
+    def a_lista(self):  # lista de gastos con su id, como el JSON de la interfaz
+        return [dict(gasto, id=id_gasto) for id_gasto, gasto in self.items()]
+
+    # ---------- agregaciones en la base ----------
+    @staticmethod
+    def _columnas_vacias(cantidad):  # (codigos_categoria, montos, fechas) sin llenar, para `cantidad` filas
+        return np.empty(cantidad, dtype=np.uint16), np.empty(cantidad, dtype=np.float64), np.empty(cantidad, dtype=np.int32)
+
+    @staticmethod
+    def _llenar(columnas, posicion, cursor, codigo):  # copia las filas del cursor de a lotes; devuelve la posición final
+        """
+        `cursor` da (monto, fecha) si `codigo` es un entero fijo, o (categoria, monto, fecha) si
+        es un dict categoría -> código. Nunca hay más de FILAS_POR_LOTE filas como tuplas a la vez.
+        """
+        codigos, montos, fechas = columnas
+        while True:
+            filas = cursor.fetchmany(FILAS_POR_LOTE)
+            if not filas:
+                return posicion
+            fin = posicion + len(filas)
+            if fin > montos.shape[0]:  # la base cambió desde que se contó
+                raise RuntimeError("La base cambió mientras se leían sus columnas.")
+            if isinstance(codigo, dict):
+                codigos[posicion:fin] = np.fromiter((codigo[f[0]] for f in filas), dtype=np.uint16, count=len(filas))
+                filas = [f[1:] for f in filas]
+            else:
+                codigos[posicion:fin] = codigo
+            montos[posicion:fin] = np.fromiter((f[0] for f in filas), dtype=np.float64, count=len(filas))
+            fechas[posicion:fin] = np.fromiter((f[1] for f in filas), dtype=np.int32, count=len(filas))
+            posicion = fin
+
+    def columnas(self):  # (codigos_categoria, montos, fechas) como AlmacenGastos.columnas()
+        """
+        Lee solo montos y fechas, categoría por categoría usando el índice (categoria, monto),
+        de a FILAS_POR_LOTE filas directo a los arreglos (no se arma una tupla por gasto).
+        Los códigos se traducen con self.categorias.
+        """
+        self._categorias = None  # lista fresca para que los códigos coincidan
+        columnas = self._columnas_vacias(self._cantidad)  # la cantidad se mantiene en cada cambio
+        posicion = 0
+        for codigo, categoria in enumerate(self.categorias):
+            posicion = self._llenar(columnas, posicion, self._con.execute(SQL_MONTOS_CATEGORIA, (categoria,)), codigo)
+        return tuple(c[:posicion] for c in columnas)
+
+    def estadisticas(self):  # acumuladores de crear_estadisticas calculados con GROUP BY
+        """
+        Devuelve las mismas estadísticas que Agregacion_Gastos.crear_estadisticas, pero
+        agrupando en la base por (categoría, monto) y por (categoría, día): Python solo ve
+        los pares distintos.
+        """
+        estadisticas = {}
+        for categoria, monto, veces in self._con.execute(SQL_FRECUENCIAS):  # ordenado por categoría y monto
+            acum = estadisticas.get(categoria)
+            if acum is None:  # primer monto (el menor) de la categoría
+                acum = estadisticas[categoria] = {"cantidad": 0, "suma": 0.0, "suma_cuadrados": 0.0,
+                                                  "minimo": monto, "maximo": monto,
+                                                  "periodos": periodos_vacios(), "cuantiles": cuantiles_vacios()}
+            acum["cantidad"] += veces
+            acum["suma"] += monto * veces
+            acum["suma_cuadrados"] += monto * monto * veces
+            acum["maximo"] = monto  # el último es el mayor
+            cuantiles_sumar(acum["cuantiles"], monto, veces)
+        for categoria, dia, veces, suma in self._con.execute(SQL_DIAS, (SIN_FECHA,)):  # totales por día
+            periodos_sumar(estadisticas[categoria]["periodos"], dia, veces, suma)  # día, su semana y su mes
+        return estadisticas
+
+    # ---------- búsqueda ----------
+    def buscar(self, texto, condicion="", parametros=()):  # ids cuya categoría o descripción contiene el texto (IdsConsulta)
+        """
+        Normaliza los textos distintos de categoría y descripción (se recorren por índice y se
+        recuerdan hasta el próximo cambio), elige los que contienen la consulta y filtra la
+        tabla con ellos. Devuelve una IdsConsulta que trae los ids de a páginas.
+        `condicion` (SQL con sus `parametros`) restringe además el resultado, por ejemplo a
+        un rango de fechas (ver Consultas_Gastos.condicion_sql).
+        """
+        consulta = normalizar(texto.strip())
+        if not consulta:  # sin filtro
+            return self.consultar(condicion, parametros)
+        if self._textos is None or self._textos[0] != self.version:  # textos distintos normalizados
+            distintos = set(self.categorias) | {fila[0] for fila in self._con.execute(SQL_DESCRIPCIONES)}
+            self._textos = (self.version, [(t, normalizar(t)) for t in distintos])
+        # los textos van en los parámetros de la consulta (lista JSON): cada resultado queda con los suyos
+        coinciden = json.dumps([t for t, normal in self._textos[1] if consulta in normal])
+        coincidencia = "(categoria IN (SELECT value FROM json_each(?)) OR descripcion IN (SELECT value FROM json_each(?)))"
+        return IdsConsulta(self._con, f"{coincidencia} AND ({condicion})" if condicion else coincidencia,
+                           (coinciden, coinciden) + tuple(parametros))
+
+    def consultar(self, condicion="", parametros=()):  # ids de los gastos que cumplen la condición SQL (IdsConsulta)
+        return IdsConsulta(self._con, condicion, parametros)  # usa los índices por fecha, monto y categoría
+
+    def columnas_donde(self, condicion="", parametros=()):  # (codigos_categoria, montos, fechas) de los que cumplen la condición
+        codigo = {c: i for i, c in enumerate(self.categorias)}  # categoría -> posición en self.categorias
+        donde = f" WHERE {condicion}" if condicion else ""
+        cantidad = self._con.execute("SELECT COUNT(*) FROM gastos" + donde, parametros).fetchone()[0]  # usa los índices
+        columnas = self._columnas_vacias(cantidad)
+        posicion = self._llenar(columnas, 0, self._con.execute("SELECT categoria, monto, fecha FROM gastos" + donde, parametros),
+                                codigo)
+        return tuple(c[:posicion] for c in columnas)
+
+
+class BusquedaSQLite:
+    """Mismo uso que IndiceBusqueda (buscar(texto, filtro) -> ids), resuelto por la base."""
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self.consultas = IndiceConsultas(almacen)  # filtros por fecha, monto y categoría (en SQL)
+
+    def buscar(self, texto, filtro=None):
+        return self.almacen.buscar(texto, *condicion_sql(filtro))
@@ -0,0 +1,298 @@
+# Benchmark_Gastos.py
+# Mediciones de rendimiento: genera ledgers de distintos tamaños con Generador_Gastos y mide
+# carga y guardado (consola), exportación e importación en cada formato (interfaz), búsqueda
+# por id, altas/ediciones/bajas, el filtro de la tabla y los gráficos (backend Agg, sin ventana).
+# Informa p50/p99 y operaciones por segundo de cada caso, el pico de memoria de cada tamaño,
+# y compara con una línea de base.
+#
+# Uso:
+#   python Benchmark_Gastos.py                                   # 1k, 100k, 1M y 10M gastos
+#   python Benchmark_Gastos.py --tamanos 1000 100000 --guardar-base
+#   python Benchmark_Gastos.py --tamanos 1000 100000             # compara con benchmark_base.json
+# Termina con código 1 si algún caso quedó más lento que la base más allá de la tolerancia.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # rutas y variables de entorno
+os.environ.setdefault("MPLBACKEND", "Agg")  # gráficos sin ventana (antes de importar matplotlib)
+import sys  # código de salida
+import json  # línea de base
+import time  # cronómetro
+import random  # ids al azar para las consultas
+import argparse  # opciones de línea de comandos
+import tempfile  # carpeta para los archivos de cada tamaño
+import multiprocessing  # un proceso por tamaño (el pico de memoria es de ese tamaño)
+try:
+    import resource  # pico de memoria (no existe en Windows)
+except ImportError:
+    resource = None
+import numpy as np  # percentiles
+
+from Generador_Gastos import generar_almacen  # ledgers de prueba
+from Persistencia_Gastos import abrir_gastos, guardar_gastos_en  # cargar_gastos / guardar_gastos de la consola
+from Exportacion_Gastos import exportar_gastos  # guardar_en_ruta de la interfaz
+from Importacion_Gastos import importar_a_almacen  # importación de la interfaz
+from Almacen_SQLite import AlmacenSQLite  # abrir una base
+from Agregacion_Gastos import agregar_por_categoria, crear_estadisticas, resumen_incremental, serie  # agregaciones de los gráficos
+from Agregacion_Gastos import estadistica_agregar, estadistica_quitar, estadistica_reemplazar  # estadísticas en cada cambio
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA  # formato de la consola
+from Graficos_Gastos import TIPOS as TIPOS_GRAFICO  # gráficos de la interfaz
+from Consultas_Gastos import IndiceConsultas, crear_filtro  # consultas por rango con índices ordenados
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+TAMANOS = (1_000, 100_000, 1_000_000, 10_000_000)  # gastos por ledger
+FORMATOS = (".json", ".csv", ".txt", ".gbin", ".db")  # formatos de exportación/importación
+REPETICIONES = 3  # veces que se repite cada operación sobre todo el ledger
+CONSULTAS = 1000  # operaciones sueltas por caso de latencia (búsqueda por id, altas, etc.)
+BUSQUEDAS = ("comida", "alquiler", "regalo de", "zzz")  # textos del filtro de la tabla
+SEMILLA = 1234  # mismos datos en cada corrida
+BASE = "benchmark_base.json"  # archivo de la línea de base
+TOLERANCIA = 0.25  # cuánto más lento que la base se acepta (25 %)
+MINIMO_REGRESION = 0.005  # diferencias menores a 5 ms se consideran ruido
+
+
+# ------------------------------
+# Medición
+# ------------------------------
+def _rss_mb():  # pico de memoria del proceso en MB (None si no se puede medir)
+    """
+    Es el máximo de todo el proceso hasta ahora, no el de un caso: por eso se toma una
+    sola vez al terminar un tamaño (cada tamaño corre en un proceso propio).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB en Linux, bytes en macOS
+    return round(pico / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _cronometrar(funcion, veces):  # ejecuta `funcion` `veces` veces y devuelve los tiempos en segundos
+    tiempos = []
+    for _ in range(veces):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def _resultado(tiempos, elementos):  # p50, p99 y elementos por segundo
+    p50, p99 = np.percentile(tiempos, [50, 99])
+    return {"p50": float(p50), "p99": float(p99), "por_segundo": float(elementos / p50) if p50 > 0 else None}
+
+
+class _TablaSinVentana:
+    """Reemplaza al Treeview para correr refrescar_tabla sin abrir una ventana."""
+
+    def __init__(self):
+        self.filas = {}
+
+    def get_children(self):
+        return list(self.filas)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.filas[iid]
+
+    def exists(self, iid):
+        return iid in self.filas
+
+    def insert(self, padre, posicion, iid, values):
+        self.filas[iid] = values
+
+
+# ------------------------------
+# Casos
+# ------------------------------
+def medir_tamano(cantidad, repeticiones=REPETICIONES, formatos=FORMATOS, carpeta=None):  # mide todos los casos para un tamaño
+    """
+    Corre todos los casos con un ledger de `cantidad` gastos y devuelve un dict
+    caso -> resultado. Pensada para correr en un proceso propio (ver medir).
+    """
+    resultados = {}
+    carpeta = carpeta or tempfile.mkdtemp(prefix="benchmark_gastos_")
+
+    def caso(nombre, funcion, elementos, veces=repeticiones):  # mide y anota un caso
+        resultados[nombre] = _resultado(_cronometrar(funcion, veces), elementos)
+        print(f"  {cantidad:>10} {nombre:<32} {resultados[nombre]['p50'] * 1000:>10.2f} ms", flush=True)
+
+    almacen = None
+
+    def generar():
+        nonlocal almacen
+        almacen, _ = generar_almacen(cantidad, FORMATO_FECHA_CONSOLA, semilla=SEMILLA)
+    caso("generar", generar, cantidad)
+    estadisticas = crear_estadisticas(almacen)
+
+    # --- consola: guardar_gastos / cargar_gastos (JSON con diario) ---
+    rutas = iter(os.path.join(carpeta, f"consola_{i}.json") for i in range(repeticiones + 1))
+    caso("guardar_gastos (completo)", lambda: guardar_gastos_en(almacen, next(rutas)), cantidad)
+    ruta_consola = os.path.join(carpeta, f"consola_{repeticiones}.json")
+    guardar_gastos_en(almacen, ruta_consola)  # deja la cabecera para la apertura diferida
+    caso("cargar_gastos (menú disponible)", lambda: abrir_gastos(ruta_consola, FORMATO_FECHA_CONSOLA), cantidad)
+    caso("cargar_gastos (completo)", lambda: len(list(abrir_gastos(ruta_consola, FORMATO_FECHA_CONSOLA).keys())), cantidad)
+    cargado = abrir_gastos(ruta_consola, FORMATO_FECHA_CONSOLA)
+    ids = cargado.keys()
+
+    def guardar_cambios():  # 100 ediciones y un guardado (agrega al diario)
+        for id_gasto in random.sample(ids, min(100, len(ids))):
+            cargado[id_gasto] = dict(cargado[id_gasto], monto=1.0)
+        guardar_gastos_en(cargado, ruta_consola)
+    caso("guardar_gastos (100 cambios)", guardar_cambios, 100)
+
+    # --- interfaz: guardar_en_ruta / importar por formato ---
+    for ext in formatos:
+        ruta = os.path.join(carpeta, "interfaz" + ext)
+        caso(f"exportar {ext}", lambda: exportar_gastos(almacen, ruta), cantidad)
+        if ext == ".db":  # las bases se abren, no se importan
+            caso(f"abrir {ext}", lambda: crear_estadisticas(AlmacenSQLite(ruta, FORMATO_FECHA_CONSOLA)), cantidad)
+        else:
+            caso(f"importar {ext}", lambda: importar_a_almacen(ruta, FORMATO_FECHA_CONSOLA), cantidad)
+
+    # --- búsqueda por id y altas/ediciones/bajas (latencia por operación) ---
+    ids = almacen.keys()
+    muestra = [random.choice(ids) for _ in range(CONSULTAS)]
+    consultas = iter(muestra)
+
+    def busqueda():  # como seleccionar_gasto_por_iid: verifica el id y trae el gasto
+        id_gasto = next(consultas)
+        return almacen.obtener(id_gasto) if id_gasto in almacen else None
+    caso("buscar por id", busqueda, 1, CONSULTAS)
+    nuevo = {"fecha": "01-01-2024", "categoria": "Comida", "descripcion": "Benchmark", "monto": 12.5}
+    altas = []
+
+    def alta():
+        altas.append(almacen.agregar(nuevo))
+        estadistica_agregar(estadisticas, nuevo)
+    caso("agregar gasto", alta, 1, CONSULTAS)
+    editar = iter(muestra)
+
+    def edicion():
+        id_gasto = next(editar)
+        anterior = almacen[id_gasto]
+        actual = dict(anterior, monto=anterior["monto"] + 1)
+        almacen[id_gasto] = actual
+        estadistica_reemplazar(estadisticas, anterior, actual)
+    caso("editar gasto", edicion, 1, CONSULTAS)
+    bajas = iter(altas)
+
+    def baja():
+        estadistica_quitar(estadisticas, almacen.eliminar(next(bajas)))
+    caso("eliminar gasto", baja, 1, CONSULTAS)
+
+    # --- gráficos: agregaciones de la consola ---
+    caso("agregar_por_categoria", lambda: agregar_por_categoria(almacen), cantidad)
+    caso("crear_estadisticas", lambda: crear_estadisticas(almacen), cantidad)
+    caso("resumen_incremental", lambda: serie(resumen_incremental(estadisticas), "suma"), 1, CONSULTAS)
+
+    # --- consultas por rango (índices ordenados) ---
+    _, _, fechas = almacen.columnas()
+    primera = int(fechas.min())  # primer día con gastos
+    filtros = {"entre fechas (7 días)": crear_filtro(primera, primera + 6), "monto mayor a 990": crear_filtro(monto_minimo=990),
+               "categoria en mes": crear_filtro(categorias=almacen.categorias[0], desde=primera, hasta=primera + 29)}
+    caso("indices de consultas (armado)", lambda: [IndiceConsultas(almacen).filas(f) for f in filtros.values()], cantidad)
+    indice = IndiceConsultas(almacen)
+    for nombre, filtro in filtros.items():
+        caso(f"consulta {nombre}", lambda: indice.ids(filtro), 1)
+
+    # --- interfaz: filtro de la tabla y figuras (si Tkinter está disponible) ---
+    try:
+        import Interfaz_CRUD_ControlGastos as interfaz
+    except ImportError as e:
+        print(f"  (sin casos de la interfaz: {e})")
+        return resultados
+    from Busqueda_Gastos import IndiceBusqueda
+    interfaz.gastos, interfaz.estadisticas, interfaz.tree = almacen, estadisticas, _TablaSinVentana()
+    interfaz.indice_busqueda = IndiceBusqueda(almacen)
+    for texto in BUSQUEDAS:
+        caso(f"refrescar_tabla '{texto}'", lambda: interfaz.refrescar_tabla(texto), cantidad)
+    caso("refrescar_tabla (tecleo)", lambda: [interfaz.refrescar_tabla("alquiler"[:i]) for i in range(1, 9)], cantidad)
+    for tipo in TIPOS_GRAFICO:
+        def figura():
+            fig = interfaz.crear_figura(tipo)
+            fig.canvas.draw()  # dibuja en memoria (Agg)
+            interfaz.plt.close(fig)
+        caso(f"grafico {tipo}", figura, cantidad)
+    return resultados
+
+
+def _medir_en_proceso(cantidad, repeticiones, formatos):  # cuerpo del proceso de cada tamaño: (resultados, pico MB)
+    random.seed(SEMILLA)
+    with tempfile.TemporaryDirectory(prefix="benchmark_gastos_") as carpeta:
+        resultados = medir_tamano(cantidad, repeticiones, formatos, carpeta)
+    return resultados, _rss_mb()
+
+
+def medir(tamanos=TAMANOS, repeticiones=REPETICIONES, formatos=FORMATOS):  # mide cada tamaño en un proceso nuevo
+    """
+    Devuelve (resultados, picos): "cantidad/caso" -> resultado y cantidad -> pico de
+    memoria en MB del proceso de ese tamaño.
+    """
+    resultados, picos = {}, {}
+    contexto = multiprocessing.get_context("spawn")  # proceso limpio: el pico de memoria es solo de ese tamaño
+    for cantidad in tamanos:
+        with contexto.Pool(1) as pool:
+            casos, picos[cantidad] = pool.apply(_medir_en_proceso, (cantidad, repeticiones, formatos))
+        for nombre, r in casos.items():
+            resultados[f"{cantidad}/{nombre}"] = r
+    return resultados, picos
+
+
+# ------------------------------
+# Línea de base
+# ------------------------------
+def comparar(resultados, base, tolerancia=TOLERANCIA):  # devuelve las claves que empeoraron respecto de la base
+    regresiones = []
+    for clave, r in resultados.items():
+        anterior = base.get(clave)
+        if anterior is None:
+            continue
+        if r["p50"] > anterior["p50"] * (1 + tolerancia) and r["p50"] - anterior["p50"] > MINIMO_REGRESION:
+            regresiones.append(clave)
+    return regresiones
+
+
+def informe(resultados, base, picos=None):  # tabla con cada caso y su diferencia con la base, y la memoria por tamaño
+    print(f"\n{'caso':<45} {'p50 ms':>10} {'p99 ms':>10} {'por seg.':>12} {'vs base':>9}")
+    for clave, r in resultados.items():
+        anterior = base.get(clave)
+        cambio = f"{(r['p50'] / anterior['p50'] - 1) * 100:+.0f}%" if anterior and anterior["p50"] > 0 else "-"
+        por_segundo = f"{r['por_segundo']:.0f}" if r["por_segundo"] else "-"
+        print(f"{clave:<45} {r['p50'] * 1000:>10.2f} {r['p99'] * 1000:>10.2f} {por_segundo:>12} {cambio:>9}")
+    if picos:
+        print(f"\n{'gastos':>10} {'pico RSS MB':>12}")
+        for cantidad, pico in picos.items():
+            print(f"{cantidad:>10} {pico if pico is not None else '-':>12}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga, guardado, búsqueda y gráficos de gastos.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS), help="cantidades de gastos a medir")
+    parser.add_argument("--formatos", nargs="+", default=list(FORMATOS), help="extensiones a exportar e importar")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES, help="repeticiones de cada operación completa")
+    parser.add_argument("--base", default=BASE, help="archivo JSON con la línea de base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="empeoramiento aceptado (0.25 = 25 %%)")
+    parser.add_argument("--guardar-base", action="store_true", help="guarda estos resultados como nueva línea de base")
+    opciones = parser.parse_args(argumentos)
+
+    resultados, picos = medir(opciones.tamanos, opciones.repeticiones, opciones.formatos)
+    base = {}
+    if os.path.exists(opciones.base):
+        with open(opciones.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+    informe(resultados, base, picos)
+    if opciones.guardar_base:
+        with open(opciones.base, "w", encoding="utf-8") as f:
+            json.dump(dict(base, **resultados), f, indent=4)
+        print(f"\nLínea de base guardada en {opciones.base}")
+        return 0
+    regresiones = comparar(resultados, base, opciones.tolerancia)
+    for clave in regresiones:
+        print(f"REGRESIÓN: {clave} ({resultados[clave]['p50'] * 1000:.2f} ms, base {base[clave]['p50'] * 1000:.2f} ms)")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# Busqueda_Gastos.py
+# Búsqueda por texto en categoría y descripción usando un índice de trigramas
+# sobre los textos distintos del almacén (no sobre cada gasto).
+
+# ------------------------------
+# Imports
+# ------------------------------
+import unicodedata  # para quitar tildes al normalizar
+
+from Consultas_Gastos import IndiceConsultas, clave_filtro  # filtros por fecha, monto y categoría
+
+
+# ------------------------------
+# Normalización
+# ------------------------------
+def normalizar(texto):  # pasa a minúsculas y quita tildes ("Médica" -> "medica")
+    """
+    Devuelve el texto en minúsculas y sin tildes, para que la búsqueda no dependa de ellas.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())  # separa letras de sus tildes
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))  # descarta las tildes
+
+
+def trigramas(texto):  # conjunto de fragmentos de 3 letras del texto
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}  # vacío si el texto tiene menos de 3 letras
+
+
+# ------------------------------
+# Índice de una tabla de textos
+# ------------------------------
+class IndiceTextos:
+    """
+    Índice de trigramas sobre una tabla de textos que solo crece (categorías o descripciones
+    del almacén, donde el código de cada texto es su posición en la tabla).
+    """
+
+    def __init__(self):  # índice vacío
+        self.textos = []  # código -> texto normalizado
+        self.trigramas = {}  # trigrama -> lista de códigos que lo contienen
+
+    def sincronizar(self, tabla):  # indexa los textos que se agregaron a la tabla desde la última vez
+        for codigo in range(len(self.textos), len(tabla)):  # solo los nuevos
+            texto = normalizar(tabla[codigo])  # texto normalizado
+            self.textos.append(texto)  # lo guarda
+            for t in trigramas(texto):  # registra cada trigrama
+                self.trigramas.setdefault(t, []).append(codigo)
+
+    def buscar(self, consulta, candidatos=None):  # códigos de los textos que contienen la consulta
+        """
+        Devuelve la lista de códigos cuyo texto contiene `consulta` (ya normalizada).
+        Si se pasan candidatos, solo se revisan esos (sirve para refinar una búsqueda anterior).
+        """
+        if candidatos is None:  # búsqueda desde cero
+            grupos = [self.trigramas.get(t, ()) for t in trigramas(consulta)]  # códigos por trigrama
+            if grupos:  # la consulta tiene 3 letras o más
+                grupos.sort(key=len)  # empieza por el trigrama menos frecuente
+                candidatos = set(grupos[0])  # códigos que tienen el primer trigrama
+                for grupo in grupos[1:]:  # y que además tienen los demás
+                    candidatos.intersection_update(grupo)
+                candidatos = sorted(candidatos)  # en orden de código
+            else:  # consultas cortas: se revisan todos los textos distintos
+                candidatos = range(len(self.textos))
+        return [c for c in candidatos if consulta in self.textos[c]]  # confirma la coincidencia
+
+
+# ------------------------------
+# Búsqueda sobre el almacén
+# ------------------------------
+class IndiceBusqueda:
+    """
+    Busca gastos cuya categoría o descripción contenga un texto.
+    Primero encuentra los textos distintos que coinciden (con el índice de trigramas) y
+    después marca las filas del almacén con esos códigos, en forma vectorizada.
+    Si la consulta nueva contiene a la anterior (el usuario siguió escribiendo) y los datos
+    no cambiaron, refina el resultado anterior en lugar de empezar de cero.
+    Con un filtro (ver Consultas_Gastos.crear_filtro) se parte de las filas que lo cumplen,
+    que se obtienen de los índices ordenados por fecha y monto.
+    """
+
+    def __init__(self, almacen):  # crea el índice para un AlmacenGastos
+        self.almacen = almacen  # almacén sobre el que se busca
+        self.categorias = IndiceTextos()  # índice de categorías
+        self.descripciones = IndiceTextos()  # índice de descripciones
+        self._consulta = None  # última consulta resuelta
+        self._version = None  # versión del almacén en esa consulta
+        self._cats = None  # códigos de categoría que coincidían
+        self._descs = None  # códigos de descripción que coincidían
+        self._filas = None  # filas que coincidían
+        self._filtro = None  # clave del filtro de esa consulta
+        self.consultas = IndiceConsultas(almacen)  # índices ordenados por fecha, monto y categoría
+
+    def buscar(self, texto, filtro=None):  # devuelve los ids de los gastos que coinciden, en orden de alta
+        """
+        Devuelve la lista de ids cuya categoría o descripción contiene `texto`
+        (sin distinguir mayúsculas ni tildes) y que cumplen `filtro`.
+        Texto vacío y sin filtro devuelve todos los ids.
+        """
+        consulta = normalizar(texto.strip())  # consulta normalizada
+        if not consulta:  # sin filtro de texto
+            self._consulta = None  # no hay nada que refinar después
+            if filtro is None:
+                return self.almacen.keys()  # todos los gastos
+            return self.consultas.ids(filtro)  # solo el filtro por rango
+        self.categorias.sincronizar(self.almacen.categorias)  # indexa categorías nuevas
+        self.descripciones.sincronizar(self.almacen.tabla_descripciones())  # indexa descripciones nuevas
+        refinar = (self._consulta is not None and self._consulta in consulta  # la consulta creció
+                   and self._version == self.almacen.version  # los datos son los mismos
+                   and self._filtro == clave_filtro(filtro))  # y el filtro también
+        if refinar:  # revisa solo lo que ya coincidía
+            cats = self.categorias.buscar(consulta, self._cats)
+            descs = self.descripciones.buscar(consulta, self._descs)
+            filas = self.almacen.filas_con_codigos(cats, descs, self._filas)
+        else:  # búsqueda completa
+            cats = self.categorias.buscar(consulta)
+            descs = self.descripciones.buscar(consulta)
+            filas = self.almacen.filas_con_codigos(cats, descs, None if filtro is None else self.consultas.filas(filtro))
+        self._consulta, self._version, self._filtro = consulta, self.almacen.version, clave_filtro(filtro)  # recuerda la consulta
+        self._cats, self._descs, self._filas = cats, descs, filas  # y su resultado
+        return self.almacen.ids_de_filas(filas)  # ids de los gastos que coinciden
@@ -0,0 +1,297 @@
+# CLI_Gastos.py
+# Línea de comandos sin interacción para operaciones masivas sobre un ledger de gastos: importar,
+# exportar, agregar un lote, eliminar por filtro, resumir y dibujar gráficos. Usa las mismas
+# funciones de lectura, escritura y agregación que los programas de consola, pero sin menús, sin
+# esperar Enter y sin limpiar la pantalla, así se puede usar desde cron o en una tubería.
+#
+# Uso:
+#   python CLI_Gastos.py importar gastos.json enero.csv febrero.csv   (omite los gastos que ya están)
+#   python CLI_Gastos.py exportar gastos.json gastos.gbin
+#   cat nuevos.jsonl | python CLI_Gastos.py agregar gastos.json
+#   python CLI_Gastos.py eliminar gastos.db --hasta 31-12-2023 --categorias Otros
+#   python CLI_Gastos.py resumir gastos.json --mes 03/2024 --periodo semana --json
+#   python CLI_Gastos.py resumir gastos.gbin --procesos 8
+#   python CLI_Gastos.py graficos gastos.json graficos/ --tipos barras mensual --formato svg
+# El ledger que se modifica (importar, agregar, eliminar) es un .json (con diario) o una base
+# .db; para leer también se aceptan .csv, .txt y .gbin. Termina con código 1 si hubo un error.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # extensiones
+import sys  # entrada, salida y código de salida
+import csv  # lotes en CSV por la entrada estándar
+import json  # lotes en líneas JSON y resumen en JSON
+import argparse  # opciones de línea de comandos
+import itertools  # vuelve a poner la primera línea leída
+
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA  # formato de la consola
+from Almacen_Gastos import AlmacenGastos  # ledger nuevo
+from Almacen_SQLite import es_base_sqlite  # bases SQLite
+from Formato_Binario import LibroBinario, es_libro_binario  # libro binario mapeado (solo lectura)
+from Persistencia_Gastos import abrir_gastos, busqueda_de, guardar_gastos_en  # JSON con diario y bases, igual que la consola
+from Importacion_Gastos import TAMANO_LOTE, importar_a_almacen, importar_en_lotes, validar_registro  # lectura de archivos
+from Exportacion_Gastos import exportar_gastos  # escritura según la extensión
+from Fusion_Gastos import fusionar_archivos, texto_informe  # importación sin duplicados
+from Agregacion_Gastos import resumen_incremental  # resumen por categoría desde las estadísticas
+from Agregacion_Paralela import estadisticas_paralelas  # estadísticas de ledgers grandes en varios procesos
+from Rollups_Gastos import PERIODOS, serie_temporal, etiqueta_periodo  # totales por período
+from Consultas_Gastos import IndiceConsultas, crear_filtro  # filtros por fecha, monto y categoría
+from Graficos_Gastos import TIPOS, FORMATOS, DPI, ServicioGraficos  # gráficos sin ventana
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+EXTENSIONES_LEDGER = (".json",)  # ledgers en memoria que se pueden modificar (además de las bases)
+
+
+# ------------------------------
+# Apertura del ledger
+# ------------------------------
+def abrir_ledger(ruta, formato_fecha=FORMATO_FECHA_CONSOLA, modificar=False):  # almacén del archivo
+    """
+    Con `modificar`, el ledger tiene que ser un .json o una base; si el JSON no existe se
+    empieza uno vacío. Para leer se acepta además cualquier formato importable y el libro
+    binario, que se mapea sin cargarlo. Un JSON con cabecera se espera a que termine de
+    cargarse (acá no hay menú que mostrar mientras tanto).
+    """
+    if es_base_sqlite(ruta) or os.path.splitext(ruta)[1].lower() in EXTENSIONES_LEDGER:
+        try:
+            almacen = abrir_gastos(ruta, formato_fecha)
+        except FileNotFoundError:
+            if not modificar:
+                raise
+            return AlmacenGastos(formato_fecha)  # ledger nuevo: se crea al guardar
+        return almacen.almacen() if hasattr(almacen, "cargado") else almacen  # espera la carga diferida
+    if modificar:
+        raise ValueError(f"Solo se pueden modificar ledgers .json o bases .db: {ruta}")
+    if es_libro_binario(ruta):
+        return LibroBinario(ruta, formato_fecha)
+    return importar_a_almacen(ruta, formato_fecha)[0]  # CSV y TXT
+
+
+def _registros_entrada(archivo):  # registros de la entrada estándar: líneas JSON o CSV con encabezado
+    primera = archivo.readline()
+    while primera and not primera.strip():  # saltea líneas vacías iniciales
+        primera = archivo.readline()
+    lineas = itertools.chain([primera], archivo)  # la entrada no se puede rebobinar
+    if primera.lstrip().startswith("{"):  # un gasto por línea
+        for linea in lineas:
+            if linea.strip():
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    yield None  # línea inválida (se cuenta como descartada)
+    elif primera:
+        yield from csv.DictReader(lineas)
+
+
+def lotes_entrada(archivo, formato_fecha=FORMATO_FECHA_CONSOLA, tamano_lote=TAMANO_LOTE):  # lotes de gastos válidos
+    """
+    Lee gastos de `archivo` (la entrada estándar, por ejemplo) y entrega tuplas
+    (lote, descartados) con hasta `tamano_lote` gastos válidos y la cantidad de registros
+    inválidos encontrados en ese tramo. Se validan igual que al importar.
+    """
+    lote, descartados = [], 0
+    for item in _registros_entrada(archivo):
+        gasto = validar_registro(item, formato_fecha) if isinstance(item, dict) else None
+        if gasto is None:
+            descartados += 1
+            continue
+        lote.append(gasto)
+        if len(lote) >= tamano_lote:
+            yield lote, descartados
+            lote, descartados = [], 0
+    if lote or descartados:
+        yield lote, descartados
+
+
+def filtro_de_opciones(opciones):  # filtro de Consultas_Gastos armado con las opciones comunes
+    return crear_filtro(opciones.desde, opciones.hasta, opciones.monto_minimo, opciones.monto_maximo,
+                        opciones.categorias, opciones.mes, opciones.formato_fecha)
+
+
+def estadisticas_filtradas(almacen, filtro=None, procesos=None):  # estadísticas de los gastos que cumplen el filtro
+    if filtro is None and procesos:  # todo el ledger, repartido en varios procesos
+        return estadisticas_paralelas(almacen, procesos, almacen.formato_fecha)
+    if filtro is None and hasattr(almacen, "estadisticas"):  # la base y el libro binario agrupan solos
+        return almacen.estadisticas()
+    return IndiceConsultas(almacen).seleccion(filtro).estadisticas()  # sobre las columnas
+
+
+# ------------------------------
+# Comandos
+# ------------------------------
+def comando_importar(opciones):  # suma al ledger los gastos de uno o más archivos
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha, modificar=True)
+    total, errores = 0, 0
+    if opciones.duplicados:  # todo lo leído, sin comparar
+        for ruta in opciones.archivos:
+            nuevo, _ = importar_a_almacen(ruta, opciones.formato_fecha)  # carga por columnas cuando se puede
+            almacen.absorber(nuevo)  # de una sola vez, con ids nuevos
+            total += len(nuevo)
+            print(f"📂 {ruta}: {len(nuevo)} gastos")
+    else:  # solo lo que no estaba en el ledger ni en un archivo anterior
+        nuevo, _, informe = fusionar_archivos(opciones.archivos, almacen, opciones.formato_fecha, opciones.procesos)
+        almacen.absorber(nuevo)
+        total, errores = len(nuevo), sum(1 for a in informe["archivos"] if a["error"])
+        print(texto_informe(informe))
+    guardar_gastos_en(almacen, opciones.ledger)
+    print(f"✅ {total} gastos importados en {opciones.ledger} ({len(almacen)} en total).")
+    if errores:
+        raise ValueError(f"No se pudieron leer {errores} de {len(opciones.archivos)} archivos.")
+
+
+def comando_exportar(opciones):  # escribe el ledger en otro formato
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha)
+    if isinstance(almacen, LibroBinario):  # la exportación recorre un almacén
+        almacen = importar_a_almacen(opciones.ledger, opciones.formato_fecha)[0]
+    exportar_gastos(almacen, opciones.destino)
+    print(f"✅ {len(almacen)} gastos exportados a {opciones.destino}.")
+
+
+def comando_agregar(opciones):  # agrega un lote de gastos leído de un archivo o de la entrada estándar
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha, modificar=True)
+    agregados, descartados = 0, 0
+    if opciones.entrada == "-":
+        lotes = lotes_entrada(sys.stdin, opciones.formato_fecha)
+    else:  # .json, .csv o .txt, en streaming (los inválidos no se cuentan)
+        lotes = ((lote, 0) for lote, _ in importar_en_lotes(opciones.entrada, formato_fecha=opciones.formato_fecha))
+    for lote, invalidos in lotes:
+        almacen.extender(lote)
+        agregados += len(lote)
+        descartados += invalidos
+    guardar_gastos_en(almacen, opciones.ledger)
+    aviso = f" ({descartados} registros inválidos descartados)" if descartados else ""
+    print(f"✅ {agregados} gastos agregados a {opciones.ledger}{aviso}.")
+
+
+def comando_eliminar(opciones):  # borra los gastos que cumplen el filtro
+    filtro = filtro_de_opciones(opciones)
+    if filtro is None and not opciones.texto and not opciones.todos:
+        raise ValueError("Indicá al menos un filtro (o --todos para vaciar el ledger).")
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha, modificar=True)
+    ids = busqueda_de(almacen).buscar(opciones.texto or "", filtro)  # los índices (o la base) resuelven el filtro
+    ids = list(ids[:])  # la base los entrega de a páginas
+    if opciones.simular:
+        print(f"🔎 Se eliminarían {len(ids)} de {len(almacen)} gastos (simulación, no se guardó nada).")
+        return
+    for id_gasto in ids:
+        almacen.eliminar(id_gasto)
+    guardar_gastos_en(almacen, opciones.ledger)
+    print(f"🗑️ {len(ids)} gastos eliminados de {opciones.ledger} (quedan {len(almacen)}).")
+
+
+def comando_resumir(opciones):  # totales por categoría (y por período) de los gastos filtrados
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha)
+    estadisticas = estadisticas_filtradas(almacen, filtro_de_opciones(opciones), opciones.procesos)
+    resumen = resumen_incremental(estadisticas)
+    cantidad = sum(r["cantidad"] for r in resumen.values())
+    suma = sum(r["suma"] for r in resumen.values())
+    periodos = None
+    if opciones.periodo:
+        inicios, valores = serie_temporal(estadisticas, opciones.periodo)
+        periodos = [(etiqueta_periodo(i, opciones.periodo, almacen.formato_fecha), v) for i, v in zip(inicios, valores)]
+    if opciones.json:
+        salida = {"cantidad": cantidad, "suma": suma, "categorias": resumen}
+        if periodos is not None:
+            salida["periodos"] = dict(periodos)
+        json.dump(salida, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print(f"{'Categoría':<20} {'Cantidad':>10} {'Total':>14} {'Media':>10} {'Mínimo':>10} {'Máximo':>10}")
+    for cat, r in sorted(resumen.items()):
+        print(f"{cat:<20} {r['cantidad']:>10} {r['suma']:>14.2f} {r['media']:>10.2f} {r['minimo']:>10.2f} {r['maximo']:>10.2f}")
+    print(f"{'Total':<20} {cantidad:>10} {suma:>14.2f}")
+    if periodos:
+        print(f"\nTotal por {opciones.periodo}:")
+        for etiqueta, valor in periodos:
+            print(f"  {etiqueta:<12} {valor:>14.2f}")
+
+
+def comando_graficos(opciones):  # escribe un archivo por gráfico pedido
+    almacen = abrir_ledger(opciones.ledger, opciones.formato_fecha)
+    servicio = ServicioGraficos(opciones.cache)
+    rutas = servicio.tablero(almacen, opciones.carpeta, opciones.formato, dpi=opciones.dpi,
+                             tipos=opciones.tipos, filtro=filtro_de_opciones(opciones))
+    for ruta in rutas:
+        print(f"📈 {ruta}")
+    print(f"✅ {len(rutas)} gráficos en {opciones.carpeta} ({servicio.aciertos} desde la caché).")
+
+
+# ------------------------------
+# Línea de comandos
+# ------------------------------
+def _agregar_filtros(parser):  # opciones de filtro por fecha, monto y categoría
+    grupo = parser.add_argument_group("filtro")
+    grupo.add_argument("--desde", help="fecha mínima (inclusive)")
+    grupo.add_argument("--hasta", help="fecha máxima (inclusive)")
+    grupo.add_argument("--mes", help="un mes completo (mm/aaaa)")
+    grupo.add_argument("--monto-minimo", help="monto mínimo (inclusive)")
+    grupo.add_argument("--monto-maximo", help="monto máximo (inclusive)")
+    grupo.add_argument("--categorias", nargs="+", help="una o más categorías")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Operaciones masivas sobre un ledger de gastos, sin interacción.")
+    parser.add_argument("--formato-fecha", default=FORMATO_FECHA_CONSOLA, help="formato de las fechas del ledger")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p = comandos.add_parser("importar", help="suma al ledger los gastos de otros archivos")
+    p.add_argument("ledger", help="ledger .json o base .db (el JSON se crea si no existe)")
+    p.add_argument("archivos", nargs="+", help="archivos .json, .csv, .txt o .gbin")
+    p.add_argument("--duplicados", action="store_true", help="agrega todo, aunque ya esté en el ledger")
+    p.add_argument("--procesos", type=int, help="procesos para leer los archivos (por defecto, uno por procesador)")
+    p.set_defaults(funcion=comando_importar)
+
+    p = comandos.add_parser("exportar", help="escribe el ledger en otro formato")
+    p.add_argument("ledger", help="archivo de gastos (.json, .db, .csv, .txt o .gbin)")
+    p.add_argument("destino", help="archivo de salida; el formato sale de la extensión")
+    p.set_defaults(funcion=comando_exportar)
+
+    p = comandos.add_parser("agregar", help="agrega un lote de gastos (líneas JSON o CSV)")
+    p.add_argument("ledger", help="ledger .json o base .db (el JSON se crea si no existe)")
+    p.add_argument("entrada", nargs="?", default="-", help="archivo .json, .csv o .txt, o - para la entrada estándar")
+    p.set_defaults(funcion=comando_agregar)
+
+    p = comandos.add_parser("eliminar", help="borra los gastos que cumplen un filtro")
+    p.add_argument("ledger", help="ledger .json o base .db")
+    _agregar_filtros(p)
+    p.add_argument("--texto", help="texto en la categoría o la descripción")
+    p.add_argument("--todos", action="store_true", help="permite eliminar sin filtro")
+    p.add_argument("--simular", action="store_true", help="solo informa cuántos se eliminarían")
+    p.set_defaults(funcion=comando_eliminar)
+
+    p = comandos.add_parser("resumir", help="totales por categoría y por período")
+    p.add_argument("ledger", help="archivo de gastos (.json, .db, .csv, .txt o .gbin)")
+    _agregar_filtros(p)
+    p.add_argument("--periodo", choices=PERIODOS, help="agrega el total por día, semana o mes")
+    p.add_argument("--json", action="store_true", help="salida en JSON")
+    p.add_argument("--procesos", type=int, help="sin filtro, reparte el cálculo en tantos procesos (conviene con .gbin grandes)")
+    p.set_defaults(funcion=comando_resumir)
+
+    p = comandos.add_parser("graficos", help="dibuja gráficos a archivos, sin ventana")
+    p.add_argument("ledger", help="archivo de gastos (.json, .db, .csv, .txt o .gbin)")
+    p.add_argument("carpeta", help="carpeta de salida (un archivo por gráfico)")
+    _agregar_filtros(p)
+    p.add_argument("--tipos", nargs="+", default=list(TIPOS), choices=TIPOS, help="gráficos a dibujar")
+    p.add_argument("--formato", default="png", choices=FORMATOS, help="formato de las imágenes")
+    p.add_argument("--dpi", type=int, default=DPI, help="resolución")
+    p.add_argument("--cache", help="carpeta de caché de imágenes (se reutiliza entre corridas)")
+    p.set_defaults(funcion=comando_graficos)
+    return parser
+
+
+def main(argumentos=None):
+    opciones = crear_parser().parse_args(argumentos)
+    try:
+        opciones.funcion(opciones)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
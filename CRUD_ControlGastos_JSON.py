@@ -1,8 +1,12 @@
 import os  # Módulo para interactuar con el sistema operativo (limpiar pantalla).
-import json  # Módulo para trabajar con archivos en formato JSON.
+import sys  # Para leer el archivo de datos desde la línea de comandos.
+from Agregacion_Gastos import crear_estadisticas, estadistica_agregar, estadistica_quitar, estadistica_reemplazar, resumen_incremental  # Estadísticas por categoría que se mantienen al día en cada cambio.
+from Almacen_Gastos import AlmacenGastos  # Almacén de gastos por columnas (id -> gasto), más liviano que un diccionario de diccionarios.
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA  # Formato dd-mm-aaaa con el que se muestran las fechas.
+from Persistencia_Gastos import abrir_gastos, guardar_gastos_en  # JSON con diario de cambios o base SQLite (.db), según la extensión.
 
 # --- Definición de la variable para el nombre del archivo ---
-archivo = "gastos.json"
+archivo = sys.argv[1] if len(sys.argv) > 1 else "gastos.json"  # p. ej. gastos.db para usar una base SQLite
 
 def limpiar_pantalla():
     """
@@ -19,32 +23,27 @@ def esperar_enter():
 
 def cargar_gastos(nombre_archivo):
     """
-    Carga los gastos desde el archivo JSON y devuelve el diccionario y el ID del próximo gasto.
-    Si el archivo no existe, devuelve un diccionario vacío.
+    Carga los gastos desde el archivo JSON (y los cambios de su diario) en un AlmacenGastos, o abre la
+    base SQLite si el archivo es .db, y devuelve el almacén y el ID del próximo gasto.
+    Si el archivo no existe, devuelve un almacén vacío.
     """
     try:
-        with open(nombre_archivo, 'r') as archivo:
-            gastos = json.load(archivo)
+        gastos = abrir_gastos(nombre_archivo, FORMATO_FECHA_CONSOLA)
         print("✅ Datos de gastos cargados correctamente.")
-        if gastos:
-            ultimo_id = max(int(id) for id in gastos.keys())
-            id_contador = ultimo_id + 1
-        else:
-            id_contador = 1
     except FileNotFoundError:
         print("⚠️ El archivo de datos no existe. Se iniciará con un diccionario de gastos vacío.")
-        gastos = {}
-        id_contador = 1
+        gastos = AlmacenGastos(FORMATO_FECHA_CONSOLA)
+    id_contador = gastos.proximo_id
     
     esperar_enter()
     return gastos, id_contador
 
 def guardar_gastos(gastos, nombre_archivo):
     """
-    Guarda el diccionario de gastos en el archivo JSON.
+    Guarda en el diario del archivo JSON solo los gastos que cambiaron desde el último guardado
+    (con una base SQLite, confirma los cambios pendientes).
     """
-    with open(nombre_archivo, 'w') as archivo:
-        json.dump(gastos, archivo, indent=4)
+    guardar_gastos_en(gastos, nombre_archivo)
     print("💾 Datos de gastos guardados correctamente.")
     esperar_enter()
     return gastos
@@ -65,9 +64,10 @@ def mostrar_menu():
     print("7️⃣  Salir                         ")
     print("---------------------------------")
 
-def agregar_gasto(gastos, id_contador):
+def agregar_gasto(gastos, id_contador, estadisticas):
     """
     Pide al usuario los datos de un nuevo gasto, lo añade al diccionario y devuelve los datos actualizados.
+    También suma el gasto a las estadísticas por categoría.
     """
     limpiar_pantalla()
     print("--- ➕ AGREGAR NUEVO GASTO ---")
@@ -91,14 +91,16 @@ def agregar_gasto(gastos, id_contador):
     }
 
     gastos[id_contador] = nuevo_gasto
+    estadistica_agregar(estadisticas, nuevo_gasto)
     id_contador += 1
     print("\n✅ Gasto agregado con éxito.")
     esperar_enter()
     return gastos, id_contador
 
-def ver_gastos(gastos):
+def ver_gastos(gastos, estadisticas):
     """
-    Muestra todos los gastos del diccionario.
+    Muestra todos los gastos del diccionario y, al final, un resumen por categoría
+    tomado de las estadísticas (sin volver a recorrer los gastos).
     """
     limpiar_pantalla()
     print("--- 📋 LISTA DE GASTOS ---")
@@ -111,13 +113,17 @@ def ver_gastos(gastos):
             print(f"💸 Monto: ${gasto_data['monto']:.2f}")
             print(f"🗓️  Fecha: {gasto_data['fecha']}")
             print(f"✍️  Descripción: {gasto_data['descripcion']}")
+        print("\n--- 📊 RESUMEN POR CATEGORÍA ---")
+        for categoria, datos in resumen_incremental(estadisticas).items():
+            print(f"🏷️  {categoria}: {datos['cantidad']} gastos, total ${datos['suma']:.2f}, promedio ${datos['media']:.2f}")
     esperar_enter()
     return gastos
 
-def actualizar_gasto(gastos):
+def actualizar_gasto(gastos, estadisticas):
     """
     Permite modificar un gasto por su ID.
     El usuario puede presionar Enter en cualquier campo para no modificarlo.
+    Las estadísticas por categoría se ajustan con los valores nuevos.
     """
     limpiar_pantalla()
     print("--- ✏️  ACTUALIZAR GASTO ---")
@@ -135,6 +141,7 @@ def actualizar_gasto(gastos):
 
     if id_a_actualizar in gastos:
         gasto_data = gastos[id_a_actualizar]
+        gasto_anterior = dict(gasto_data)
         print("\n✅ Se encontró el gasto. Ingrese los nuevos datos (presione Enter para no modificar):")
         
         nueva_categoria = input(f"📝 Nueva categoría ({gasto_data['categoria']}): ")
@@ -159,6 +166,8 @@ def actualizar_gasto(gastos):
         if nueva_descripcion:
             gasto_data['descripcion'] = nueva_descripcion
         
+        gastos[id_a_actualizar] = gasto_data
+        estadistica_reemplazar(estadisticas, gasto_anterior, gasto_data)
         print("\n✅ Gasto actualizado con éxito.")
     else:
         print("❌ ID no encontrado.")
@@ -166,9 +175,9 @@ def actualizar_gasto(gastos):
     esperar_enter()
     return gastos
 
-def eliminar_gasto(gastos):
+def eliminar_gasto(gastos, estadisticas):
     """
-    Elimina un gasto del diccionario por su ID.
+    Elimina un gasto del diccionario por su ID y lo descuenta de las estadísticas.
     """
     limpiar_pantalla()
     print("--- 🗑️  ELIMINAR GASTO ---")
@@ -185,6 +194,7 @@ def eliminar_gasto(gastos):
         return gastos
 
     if id_a_eliminar in gastos:
+        estadistica_quitar(estadisticas, gastos[id_a_eliminar])
         del gastos[id_a_eliminar]
         print("\n🗑️  Gasto eliminado con éxito.")
     else:
@@ -195,6 +205,7 @@ def eliminar_gasto(gastos):
 
 # --- Bucle Principal del Programa ---
 gastos, id_contador = cargar_gastos(archivo)
+estadisticas = crear_estadisticas(gastos)
 
 while True:
     limpiar_pantalla()
@@ -203,18 +214,19 @@ while True:
     opcion = input("➡️  Seleccione una opción: ")
     
     if opcion == '1':
-        gastos, id_contador = agregar_gasto(gastos, id_contador)
+        gastos, id_contador = agregar_gasto(gastos, id_contador, estadisticas)
     elif opcion == '2':
-        gastos = ver_gastos(gastos)
+        gastos = ver_gastos(gastos, estadisticas)
     elif opcion == '3':
-        gastos = actualizar_gasto(gastos)
+        gastos = actualizar_gasto(gastos, estadisticas)
     elif opcion == '4':
-        gastos = eliminar_gasto(gastos)
+        gastos = eliminar_gasto(gastos, estadisticas)
     elif opcion == '5':
         gastos = guardar_gastos(gastos, archivo)
     elif opcion == '6':
         print("🔃 Cargando los datos desde el archivo...")
         gastos, id_contador = cargar_gastos(archivo)
+        estadisticas = crear_estadisticas(gastos)
     elif opcion == '7':
         print("👋 Saliendo del programa. ¡Hasta luego!")
         break
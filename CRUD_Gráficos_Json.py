@@ -2,9 +2,8 @@ import os
 # Importa el módulo 'os', que proporciona una forma de usar funcionalidades
 # dependientes del sistema operativo, como limpiar la consola.
 
-import json
-# Importa el módulo 'json' para codificar y decodificar datos en formato JSON,
-# lo que permite guardar y cargar la información de gastos en un archivo.
+import sys
+# Importa el módulo 'sys' para leer el nombre del archivo de datos desde la línea de comandos.
 
 import matplotlib.pyplot as plt
 # Importa la biblioteca 'matplotlib.pyplot' con el alias 'plt', que se utiliza
@@ -14,18 +13,43 @@ import numpy as np
 # Importa la biblioteca 'numpy' con el alias 'np', fundamental para la
 # computación científica en Python. Se usa para operaciones numéricas eficientes.
 
-import random
-# Importa el módulo 'random' para generar números y elementos aleatorios,
-# lo cual es útil para crear datos de prueba falsos.
+from Agregacion_Gastos import agregar_por_categoria, serie
+# Importa la agregación por categoría en una sola pasada (cantidad, suma,
+# mínimo, máximo, media y cuartiles), compartida por todos los gráficos.
 
-from datetime import datetime, timedelta
-# Importa las clases 'datetime' y 'timedelta' del módulo 'datetime', que
-# permiten manipular fechas y horas, como calcular una fecha en el pasado.
+from Agregacion_Gastos import crear_estadisticas, estadistica_agregar, estadistica_quitar, estadistica_reemplazar, estadisticas_combinar, resumen_incremental
+# Importa las estadísticas incrementales por categoría, que se actualizan en
+# cada alta, edición o baja para que los gráficos no recorran todos los gastos.
+
+from Almacen_Gastos import AlmacenGastos
+# Importa el almacén de gastos por columnas, que se usa como un diccionario
+# id -> gasto pero guarda cada campo en un arreglo tipado (mucha menos memoria).
+
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA
+# Importa el formato de fecha "día-mes-año" con el que se muestran las fechas.
+
+from Persistencia_Gastos import abrir_gastos, guardar_gastos_en
+# Importa la capa de guardado: con un .json cada guardado agrega al diario solo los
+# gastos que cambiaron (la instantánea se rehace en segundo plano); con un .db los
+# gastos quedan en una base SQLite y guardar confirma la transacción.
+
+from Generador_Gastos import generar_en_almacen
+# Importa el generador de gastos de prueba, que arma todos los gastos de una
+# vez con NumPy (categoría, descripción, monto y fecha al azar).
+
+from Rollups_Gastos import serie_temporal, tendencia_por_categoria, etiqueta_periodo
+# Importa las consultas sobre los totales por día, semana y mes que las
+# estadísticas mantienen al día, para los gráficos de evolución en el tiempo.
+
+from Cuantiles_Gastos import caja
+# Importa el armado de cada caja del boxplot desde las cubetas de cuantiles de
+# las estadísticas (cuartiles y bigotes aproximados, sin guardar los montos).
 
 # --- Definición de la variable para el nombre del archivo ---
-archivo = "gastos.json"
+archivo = sys.argv[1] if len(sys.argv) > 1 else "gastos.json"
 # Define una variable de cadena que contiene el nombre del archivo donde se
-# almacenarán los datos de los gastos.
+# almacenarán los datos de los gastos. Se puede indicar otro al ejecutar el
+# programa, por ejemplo gastos.db para trabajar sobre una base SQLite.
 
 # --- Categorías predefinidas para el menú ---
 CATEGORIAS_PREDEFINIDAS = ['Comida', 'Transporte', 'Entretenimiento', 'Hogar', 'Salud', 'Compras', 'Otros']
@@ -52,68 +76,25 @@ def esperar_enter():
     # La función `input()` muestra un mensaje y espera a que el usuario
     # presione Enter, deteniendo el flujo del programa.
 
-def generar_gastos_falsos(gastos_existentes, id_contador, cantidad=100):
+def generar_gastos_falsos(gastos_existentes, id_contador, estadisticas, cantidad=100, semilla=None):
     """
-    Genera un diccionario con una cantidad de gastos falsos y los agrega a los gastos existentes.
+    Agrega a los gastos existentes una cantidad de gastos falsos, generados todos juntos
+    con Generador_Gastos (la misma semilla da siempre los mismos gastos).
+    Las estadísticas de lo generado se suman a las estadísticas por categoría.
     """
     # Define la función para generar datos de prueba.
     print(f"⚙️ Generando {cantidad} gastos de prueba...")
     # Imprime un mensaje indicando el inicio de la generación de datos.
-    
-    # Listas de datos predefinidos
-    # Comentario para la sección de datos predefinidos.
-    descripciones = {
-    # Crea un diccionario de listas de descripciones, una por cada categoría.
-        'Comida': ['Almuerzo en restaurante', 'Supermercado semanal', 'Café y postre', 'Cena a domicilio'],
-        'Transporte': ['Boleto de bus', 'Combustible', 'Pasaje de tren', 'Viaje en taxi'],
-        'Entretenimiento': ['Entrada de cine', 'Concierto', 'Videojuego', 'Streaming mensual'],
-        'Hogar': ['Factura de luz', 'Alquiler', 'Productos de limpieza', 'Reparación de grifo'],
-        'Salud': ['Consulta médica', 'Medicamentos', 'Suplementos vitamínicos', 'Gimnasio'],
-        'Compras': ['Ropa nueva', 'Electrónicos', 'Libro', 'Regalo de cumpleaños'],
-        'Otros': ['Regalo', 'Suscripción', 'Donación', 'Servicios varios']
-    }
-    
-    # Rango de fechas para los gastos
-    # Comentario para la sección de fechas.
-    fecha_hoy = datetime.now()
-    # Obtiene la fecha y hora actuales.
-    rango_dias = 90
-    # Define la cantidad de días hacia atrás a partir de hoy para generar fechas.
-    
-    for i in range(cantidad):
-    # Inicia un bucle que se ejecuta 'cantidad' de veces para crear cada gasto.
-        categoria_random = random.choice(CATEGORIAS_PREDEFINIDAS)
-        # Elige una categoría al azar de la lista predefinida.
-        descripcion_random = random.choice(descripciones[categoria_random])
-        # Elige una descripción al azar de la lista correspondiente a la categoría elegida.
-        
-        monto_random = random.randint(50, 1000)
-        # Genera un número entero aleatorio para el monto entre 50 y 1000.
-        
-        # Generar una fecha aleatoria dentro del rango
-        # Comentario.
-        dias_atras = random.randint(0, rango_dias)
-        # Genera un número aleatorio de días para restar a la fecha actual.
-        fecha_gasto = fecha_hoy - timedelta(days=dias_atras)
-        # Calcula la fecha del gasto restando los días aleatorios a la fecha actual.
-        fecha_formato = fecha_gasto.strftime("%d-%m-%Y")
-        # Formatea el objeto de fecha a una cadena con el formato "día-mes-año".
-
-        gastos_existentes[str(id_contador)] = {
-        # Agrega un nuevo gasto al diccionario `gastos_existentes` usando el contador
-        # como clave, convertido a cadena.
-            'categoria': categoria_random,
-        # Asigna la categoría aleatoria.
-            'monto': monto_random,
-        # Asigna el monto aleatorio.
-            'fecha': fecha_formato,
-        # Asigna la fecha formateada.
-            'descripcion': descripcion_random
-        # Asigna la descripción aleatoria.
-        }
-        id_contador += 1
-        # Incrementa el contador de ID en 1 para el siguiente gasto.
-    
+
+    _, estadisticas_nuevas = generar_en_almacen(gastos_existentes, cantidad, semilla=semilla)
+    # Genera los gastos: categoría y descripción al azar de la tabla de descripciones,
+    # monto entero entre 50 y 1000 y fecha dentro de los últimos 90 días. Se agregan
+    # al almacén de una vez, con IDs consecutivos desde el próximo libre.
+    estadisticas_combinar(estadisticas, estadisticas_nuevas)
+    # Suma los gastos generados a las estadísticas de cada categoría.
+    id_contador = gastos_existentes.proximo_id
+    # El contador de ID sigue desde el próximo ID libre del almacén.
+
     print("✅ Datos de prueba agregados correctamente.")
     # Imprime un mensaje de éxito.
     return gastos_existentes, id_contador
@@ -121,36 +102,26 @@ def generar_gastos_falsos(gastos_existentes, id_contador, cantidad=100):
 
 def cargar_gastos(nombre_archivo):
     """
-    Carga los gastos desde el archivo JSON y devuelve el diccionario y el ID del próximo gasto.
-    Si el archivo no existe, devuelve un diccionario vacío.
+    Carga los gastos desde el archivo JSON (y los cambios de su diario) en un AlmacenGastos y
+    devuelve el almacén y el ID del próximo gasto. Si el archivo no existe, devuelve un almacén vacío.
     """
     # Define la función para cargar datos de un archivo.
     try:
     # Inicia un bloque `try` para manejar el caso en que el archivo no exista.
-        with open(nombre_archivo, 'r') as archivo:
-        # Abre el archivo en modo de lectura ('r'). `with` asegura que el archivo se cierre.
-            gastos = json.load(archivo)
-        # Carga los datos del archivo JSON a un diccionario de Python.
+        gastos = abrir_gastos(nombre_archivo, FORMATO_FECHA_CONSOLA, ordenar_claves=True)
+        # Con un JSON lee la instantánea y le aplica los cambios del diario (si la cabecera
+        # está al día, lo hace en un hilo y el menú aparece enseguida); con un .db abre la
+        # base sin cargar los gastos en memoria. El almacén lleva la cuenta del próximo ID libre.
         print("✅ Datos de gastos cargados desde archivo.")
         # Imprime un mensaje de éxito.
-        if gastos:
-        # Comprueba si el diccionario `gastos` no está vacío.
-            ultimo_id = max(int(id) for id in gastos.keys())
-        # Encuentra el ID numérico más alto entre las claves del diccionario.
-            id_contador = ultimo_id + 1
-        # Establece el contador para el siguiente ID disponible.
-        else:
-        # Si el diccionario está vacío.
-            id_contador = 1
-        # Inicia el contador en 1.
     except FileNotFoundError:
     # Captura la excepción `FileNotFoundError` si el archivo no existe.
         print("⚠️ El archivo de datos no existe. Se iniciará con un diccionario de gastos vacío.")
         # Muestra un mensaje de advertencia.
-        gastos = {}
-        # Inicializa el diccionario de gastos como vacío.
-        id_contador = 1
-        # Inicia el contador en 1.
+        gastos = AlmacenGastos(FORMATO_FECHA_CONSOLA)
+        # Inicializa un almacén de gastos vacío.
+    id_contador = gastos.proximo_id
+    # Toma el próximo ID libre del almacén (1 si está vacío).
     
     esperar_enter()
     # Llama a la función para pausar y esperar la interacción del usuario.
@@ -159,14 +130,13 @@ def cargar_gastos(nombre_archivo):
 
 def guardar_gastos(gastos, nombre_archivo):
     """
-    Guarda el diccionario de gastos en el archivo JSON.
+    Guarda en el diario del archivo JSON solo los gastos que cambiaron desde el último guardado.
     """
     # Define la función para guardar datos en un archivo.
-    with open(nombre_archivo, 'w') as archivo:
-    # Abre el archivo en modo de escritura ('w'), lo que sobrescribe su contenido.
-        json.dump(gastos, archivo, indent=4, sort_keys=True) 
-    # Guarda el diccionario `gastos` como JSON en el archivo. `indent` formatea
-    # el archivo para que sea legible, y `sort_keys` lo ordena por clave.
+    guardar_gastos_en(gastos, nombre_archivo, ordenar_claves=True)
+    # Agrega al diario una línea por gasto nuevo, modificado o borrado y la fuerza al disco.
+    # Cuando el diario crece, la instantánea (con `indent=4` y `sort_keys`) se rehace en otro hilo.
+    # Con una base SQLite, confirma los cambios pendientes.
     print("💾 Datos de gastos guardados correctamente.")
     # Imprime un mensaje de éxito.
     esperar_enter()
@@ -210,10 +180,11 @@ def mostrar_menu():
     print("----------------------------------")
     # Imprime una línea separadora.
 
-def agregar_gasto(gastos, id_contador):
+def agregar_gasto(gastos, id_contador, estadisticas):
     """
     Pide al usuario los datos de un nuevo gasto, lo añade al diccionario y devuelve los datos actualizados.
     Ahora incluye un menú para seleccionar la categoría.
+    El gasto nuevo se suma a las estadísticas por categoría.
     """
     # Define la función para agregar un gasto.
     limpiar_pantalla()
@@ -285,6 +256,8 @@ def agregar_gasto(gastos, id_contador):
 
     gastos[str(id_contador)] = nuevo_gasto
     # Agrega el nuevo gasto al diccionario `gastos` con el ID actual como clave.
+    estadistica_agregar(estadisticas, nuevo_gasto)
+    # Suma el nuevo gasto a las estadísticas de su categoría.
     id_contador += 1
     # Incrementa el contador para el próximo gasto.
     print("\n✅ Gasto agregado con éxito.")
@@ -326,10 +299,11 @@ def ver_gastos(gastos):
     return gastos
     # Devuelve el diccionario de gastos.
 
-def actualizar_gasto(gastos):
+def actualizar_gasto(gastos, estadisticas):
     """
     Permite modificar un gasto por su ID.
     El usuario puede presionar Enter en cualquier campo para no modificarlo.
+    Las estadísticas por categoría se ajustan con los valores nuevos.
     """
     # Define la función para actualizar un gasto.
     limpiar_pantalla()
@@ -362,6 +336,8 @@ def actualizar_gasto(gastos):
     # Verifica si el ID ingresado existe como clave en el diccionario.
         gasto_data = gastos[id_a_actualizar]
     # Asigna los datos del gasto a la variable `gasto_data`.
+        gasto_anterior = dict(gasto_data)
+    # Guarda una copia de los valores anteriores para ajustar las estadísticas.
         print("\n✅ Se encontró el gasto. Ingrese los nuevos datos (presione Enter para no modificar):")
     # Imprime un mensaje de éxito.
         
@@ -405,6 +381,10 @@ def actualizar_gasto(gastos):
             gasto_data['descripcion'] = nueva_descripcion
         # Actualiza la descripción.
         
+        gastos[id_a_actualizar] = gasto_data
+    # Guarda el gasto modificado en el almacén (los gastos se devuelven como copias).
+        estadistica_reemplazar(estadisticas, gasto_anterior, gasto_data)
+    # Quita los valores anteriores de las estadísticas y suma los nuevos.
         print("\n✅ Gasto actualizado con éxito.")
     # Imprime un mensaje de éxito.
     else:
@@ -417,9 +397,10 @@ def actualizar_gasto(gastos):
     return gastos
     # Devuelve el diccionario de gastos.
 
-def eliminar_gasto(gastos):
+def eliminar_gasto(gastos, estadisticas):
     """
     Elimina un gasto del diccionario por su ID, solicitando confirmación al usuario.
+    El gasto eliminado se descuenta de las estadísticas por categoría.
     """
     # Define la función para eliminar un gasto con confirmación.
     limpiar_pantalla()
@@ -456,6 +437,8 @@ def eliminar_gasto(gastos):
     # Pide la confirmación al usuario y convierte la respuesta a minúsculas.
         if confirmacion == 'si':
         # Comprueba si la respuesta del usuario es 'si'.
+            estadistica_quitar(estadisticas, gastos[id_a_eliminar])
+        # Descuenta el gasto de las estadísticas de su categoría.
             del gastos[id_a_eliminar]
         # Elimina el gasto del diccionario usando el ID como clave.
             print("\n🗑️  Gasto eliminado con éxito.")
@@ -474,9 +457,10 @@ def eliminar_gasto(gastos):
     return gastos
     # Devuelve el diccionario de gastos actualizado.
 
-def mostrar_grafico_individual(gastos):
+def mostrar_grafico_individual(gastos, estadisticas):
     """
     Muestra un menú para seleccionar y ver un gráfico a la vez.
+    Los conteos y totales salen de las estadísticas incrementales.
     """
     # Define la función para mostrar un submenú de gráficos.
     if not gastos:
@@ -488,6 +472,10 @@ def mostrar_grafico_individual(gastos):
         return
     # Sale de la función.
 
+    resumen = resumen_incremental(estadisticas)
+    # Arma el resumen por categoría desde las estadísticas acumuladas, con un
+    # costo proporcional a la cantidad de categorías y no a la de gastos.
+
     while True:
     # Inicia un bucle infinito para el submenú.
         limpiar_pantalla()
@@ -502,8 +490,12 @@ def mostrar_grafico_individual(gastos):
         # Opción 3.
         print("4️⃣  Gráfico Circular: Proporción de gastos por categoría")
         # Opción 4.
-        print("5️⃣  Volver al menú principal")
+        print("5️⃣  Totales por mes")
         # Opción 5.
+        print("6️⃣  Tendencia semanal por categoría")
+        # Opción 6.
+        print("7️⃣  Volver al menú principal")
+        # Opción 7.
         print("---------------------------------")
         # Línea separadora.
         
@@ -512,22 +504,31 @@ def mostrar_grafico_individual(gastos):
 
         if opcion_grafico == '1':
         # Si la opción es '1'.
-            ver_histograma(gastos)
+            ver_histograma(gastos, resumen)
         # Llama a la función para el histograma.
         elif opcion_grafico == '2':
         # Si la opción es '2'.
-            ver_barras(gastos)
+            ver_barras(gastos, resumen)
         # Llama a la función para el gráfico de barras.
         elif opcion_grafico == '3':
         # Si la opción es '3'.
-            ver_boxplot(gastos)
+            ver_boxplot(estadisticas)
+        # El boxplot sale de las cubetas de cuantiles de las estadísticas.
         # Llama a la función para el boxplot.
         elif opcion_grafico == '4':
         # Si la opción es '4'.
-            ver_pie_chart(gastos)
+            ver_pie_chart(gastos, resumen)
         # Llama a la función para el gráfico circular.
         elif opcion_grafico == '5':
         # Si la opción es '5'.
+            ver_totales_mensuales(estadisticas)
+        # Llama a la función para los totales por mes.
+        elif opcion_grafico == '6':
+        # Si la opción es '6'.
+            ver_tendencia_categorias(estadisticas)
+        # Llama a la función para la tendencia por categoría.
+        elif opcion_grafico == '7':
+        # Si la opción es '7'.
             break
         # Sale del bucle `while True`, regresando al menú principal.
         else:
@@ -537,15 +538,18 @@ def mostrar_grafico_individual(gastos):
             esperar_enter()
         # Pausa la ejecución.
 
-def ver_histograma(gastos):
+def ver_histograma(gastos, resumen=None):
     """
     Genera y muestra un histograma de la cantidad de gastos por categoría.
+    Si se recibe un resumen ya calculado, lo reutiliza sin recorrer los gastos.
     """
     # Define la función para generar un histograma.
-    categorias = [gasto['categoria'] for gasto in gastos.values()]
-    # Crea una lista de todas las categorías de los gastos.
-    gastos_por_categoria = {cat: categorias.count(cat) for cat in set(categorias)}
-    # Crea un diccionario con el conteo de cada categoría.
+    if resumen is None:
+    # Si no se recibió un resumen previo.
+        resumen = agregar_por_categoria(gastos)
+    # Agrupa los gastos por categoría en una sola pasada.
+    gastos_por_categoria = serie(resumen, 'cantidad')
+    # Obtiene un diccionario con el conteo de cada categoría.
     
     plt.figure(figsize=(10, 6))
     # Crea una nueva figura de Matplotlib con un tamaño específico.
@@ -564,15 +568,18 @@ def ver_histograma(gastos):
     plt.show()
     # Muestra el gráfico en una ventana.
 
-def ver_barras(gastos):
+def ver_barras(gastos, resumen=None):
     """
     Genera y muestra un gráfico de barras del monto total por categoría.
+    Si se recibe un resumen ya calculado, lo reutiliza sin recorrer los gastos.
     """
     # Define la función para generar un gráfico de barras.
-    categorias = [gasto['categoria'] for gasto in gastos.values()]
-    # Crea una lista de categorías.
-    total_por_categoria = {cat: sum(gasto['monto'] for gasto in gastos.values() if gasto['categoria'] == cat) for cat in set(categorias)}
-    # Calcula la suma total de los montos para cada categoría.
+    if resumen is None:
+    # Si no se recibió un resumen previo.
+        resumen = agregar_por_categoria(gastos)
+    # Agrupa los gastos por categoría en una sola pasada.
+    total_por_categoria = serie(resumen, 'suma')
+    # Obtiene la suma total de los montos para cada categoría.
     
     plt.figure(figsize=(10, 6))
     # Crea una nueva figura.
@@ -591,29 +598,20 @@ def ver_barras(gastos):
     plt.show()
     # Muestra el gráfico.
 
-def ver_boxplot(gastos):
+def ver_boxplot(estadisticas):
     """
     Genera y muestra un boxplot de la distribución de montos por categoría.
+    Las cajas salen de las cubetas de cuantiles de las estadísticas, sin
+    recorrer los montos.
     """
     # Define la función para generar un boxplot.
-    categorias = [gasto['categoria'] for gasto in gastos.values()]
-    # Crea una lista de categorías.
-    montos_por_cat = {cat: [] for cat in set(categorias)}
-    # Inicializa un diccionario con listas vacías para cada categoría.
-    for gasto in gastos.values():
-    # Itera sobre los datos de los gastos.
-        montos_por_cat[gasto['categoria']].append(gasto['monto'])
-    # Agrega el monto a la lista correspondiente a su categoría.
-    
-    data_to_plot = [montos_por_cat[cat] for cat in montos_por_cat]
-    # Crea una lista de listas de montos, organizada por categoría.
-    labels = list(montos_por_cat.keys())
-    # Crea una lista de etiquetas de categorías.
+    cajas = [caja(acum, cat) for cat, acum in estadisticas.items()]
+    # Cuartiles, bigotes y valores atípicos de cada categoría.
     
     plt.figure(figsize=(10, 6))
     # Crea una nueva figura.
-    plt.boxplot(data_to_plot, labels=labels)
-    # Dibuja el boxplot.
+    plt.gca().bxp(cajas)
+    # Dibuja el boxplot con las estadísticas ya calculadas.
     plt.title('Distribución de Montos por Categoría (Boxplot)', weight='bold')
     # Establece el título.
     plt.ylabel('Monto ($)')
@@ -627,15 +625,18 @@ def ver_boxplot(gastos):
     plt.show()
     # Muestra el gráfico.
 
-def ver_pie_chart(gastos):
+def ver_pie_chart(gastos, resumen=None):
     """
     Genera y muestra un gráfico circular de la proporción de gastos por categoría.
+    Si se recibe un resumen ya calculado, lo reutiliza sin recorrer los gastos.
     """
     # Define la función para generar un gráfico circular.
-    categorias = [gasto['categoria'] for gasto in gastos.values()]
-    # Crea una lista de categorías.
-    gastos_por_categoria = {cat: categorias.count(cat) for cat in set(categorias)}
-    # Cuenta la cantidad de gastos por categoría.
+    if resumen is None:
+    # Si no se recibió un resumen previo.
+        resumen = agregar_por_categoria(gastos)
+    # Agrupa los gastos por categoría en una sola pasada.
+    gastos_por_categoria = serie(resumen, 'cantidad')
+    # Obtiene la cantidad de gastos por categoría.
     
     plt.figure(figsize=(8, 8))
     # Crea una figura cuadrada.
@@ -651,9 +652,72 @@ def ver_pie_chart(gastos):
     plt.show()
     # Muestra el gráfico.
 
-def mostrar_todos_los_graficos(gastos):
+def ver_totales_mensuales(estadisticas):
+    """
+    Genera y muestra un gráfico de barras con el monto total de cada mes.
+    Los totales salen de los acumuladores por período de las estadísticas,
+    sin recorrer los gastos.
+    """
+    # Define la función para el gráfico de totales mensuales.
+    meses, totales = serie_temporal(estadisticas, 'mes')
+    # Obtiene los meses con gastos (ordenados) y el monto total de cada uno.
+    etiquetas = [etiqueta_periodo(mes, 'mes') for mes in meses]
+    # Convierte cada mes a texto mm/aaaa para el eje x.
+
+    plt.figure(figsize=(10, 6))
+    # Crea una nueva figura.
+    plt.bar(etiquetas, totales, color='steelblue')
+    # Dibuja una barra por mes.
+    plt.title('Monto Total por Mes', weight='bold')
+    # Establece el título.
+    plt.xlabel('Mes')
+    # Establece la etiqueta del eje x.
+    plt.ylabel('Monto Total ($)')
+    # Establece la etiqueta del eje y.
+    plt.xticks(rotation=45)
+    # Rota las etiquetas.
+    plt.tight_layout()
+    # Ajusta el diseño.
+    plt.show()
+    # Muestra el gráfico.
+
+def ver_tendencia_categorias(estadisticas):
+    """
+    Genera y muestra una línea por categoría con el monto de cada semana.
+    Usa los acumuladores por período, así el costo depende de la cantidad
+    de semanas y no de la de gastos.
+    """
+    # Define la función para el gráfico de tendencia.
+    semanas, series = tendencia_por_categoria(estadisticas, 'semana')
+    # Obtiene las semanas con gastos y, por categoría, el monto de cada semana.
+    etiquetas = [etiqueta_periodo(semana, 'semana', FORMATO_FECHA_CONSOLA) for semana in semanas]
+    # Cada semana se rotula con la fecha de su lunes.
+
+    plt.figure(figsize=(12, 6))
+    # Crea una nueva figura.
+    for categoria, valores in series.items():
+    # Recorre las categorías.
+        plt.plot(etiquetas, valores, marker='o', label=categoria)
+    # Dibuja la línea de la categoría.
+    plt.title('Gasto Semanal por Categoría', weight='bold')
+    # Establece el título.
+    plt.xlabel('Semana (lunes)')
+    # Establece la etiqueta del eje x.
+    plt.ylabel('Monto ($)')
+    # Establece la etiqueta del eje y.
+    plt.xticks(rotation=45)
+    # Rota las etiquetas.
+    plt.legend()
+    # Muestra qué color corresponde a cada categoría.
+    plt.tight_layout()
+    # Ajusta el diseño.
+    plt.show()
+    # Muestra el gráfico.
+
+def mostrar_todos_los_graficos(gastos, estadisticas):
     """
     Genera y muestra los 4 gráficos en una sola ventana.
+    Conteos y totales salen de las estadísticas incrementales.
     """
     # Define la función para mostrar varios gráficos a la vez.
     if not gastos:
@@ -665,14 +729,12 @@ def mostrar_todos_los_graficos(gastos):
         return
     # Sale de la función.
 
-    categorias = [gasto['categoria'] for gasto in gastos.values()]
-    # Crea una lista de categorías.
-    montos = [gasto['monto'] for gasto in gastos.values()]
-    # Crea una lista de montos.
+    resumen = resumen_incremental(estadisticas)
+    # Arma el resumen por categoría desde las estadísticas acumuladas.
     
-    gastos_por_categoria = {cat: categorias.count(cat) for cat in set(categorias)}
+    gastos_por_categoria = serie(resumen, 'cantidad')
     # Cuenta los gastos por categoría.
-    total_por_categoria = {cat: sum(gasto['monto'] for gasto in gastos.values() if gasto['categoria'] == cat) for cat in set(categorias)}
+    total_por_categoria = serie(resumen, 'suma')
     # Suma los montos por categoría.
     
     # Crear la figura y los subplots
@@ -715,19 +777,10 @@ def mostrar_todos_los_graficos(gastos):
     
     # Boxplot de la Distribución de Gastos
     # Comentario.
-    montos_por_cat = {cat: [] for cat in set(categorias)}
-    # Inicializa un diccionario con listas vacías.
-    for gasto in gastos.values():
-    # Itera sobre los gastos.
-        montos_por_cat[gasto['categoria']].append(gasto['monto'])
-    # Agrega el monto a su lista correspondiente.
-    
-    data_to_plot = [montos_por_cat[cat] for cat in montos_por_cat]
-    # Prepara los datos para el boxplot.
-    labels = list(montos_por_cat.keys())
-    # Crea una lista de etiquetas.
+    cajas = [caja(acum, cat) for cat, acum in estadisticas.items()]
+    # Cuartiles, bigotes y valores atípicos de cada categoría, desde las estadísticas.
     
-    axs[1, 0].boxplot(data_to_plot, labels=labels)
+    axs[1, 0].bxp(cajas)
     # Dibuja el boxplot en el tercer subplot (fila 1, columna 0).
     axs[1, 0].set_title('Distribución de Montos por Categoría (Boxplot)', weight='bold')
     # Establece el título.
@@ -758,6 +811,9 @@ def mostrar_todos_los_graficos(gastos):
 gastos, id_contador = cargar_gastos(archivo)
 # Llama a `cargar_gastos` al iniciar el programa para cargar los datos
 # existentes y obtener el contador de ID.
+estadisticas = crear_estadisticas(gastos)
+# Construye las estadísticas por categoría, que luego se mantienen al día
+# en cada alta, edición o baja.
 
 while True:
 # Inicia un bucle infinito que representa el menú principal del programa.
@@ -771,7 +827,7 @@ while True:
     
     if opcion == '1':
     # Si la opción es '1'.
-        gastos, id_contador = agregar_gasto(gastos, id_contador)
+        gastos, id_contador = agregar_gasto(gastos, id_contador, estadisticas)
     # Llama a `agregar_gasto` y actualiza las variables `gastos` e `id_contador`.
     elif opcion == '2':
     # Si la opción es '2'.
@@ -779,11 +835,11 @@ while True:
     # Llama a `ver_gastos`.
     elif opcion == '3':
     # Si la opción es '3'.
-        gastos = actualizar_gasto(gastos)
+        gastos = actualizar_gasto(gastos, estadisticas)
     # Llama a `actualizar_gasto`.
     elif opcion == '4':
     # Si la opción es '4'.
-        gastos = eliminar_gasto(gastos)
+        gastos = eliminar_gasto(gastos, estadisticas)
     # Llama a `eliminar_gasto`.
     elif opcion == '5':
     # Si la opción es '5'.
@@ -795,19 +851,21 @@ while True:
     # Muestra un mensaje informativo.
         gastos, id_contador = cargar_gastos(archivo)
     # Vuelve a cargar los datos del archivo, refrescando el estado del programa.
+        estadisticas = crear_estadisticas(gastos)
+    # Reconstruye las estadísticas a partir de los datos recargados.
     elif opcion == '7':
     # Si la opción es '7'.
-        gastos, id_contador = generar_gastos_falsos(gastos, id_contador)
+        gastos, id_contador = generar_gastos_falsos(gastos, id_contador, estadisticas)
     # Llama a `generar_gastos_falsos` y actualiza las variables.
         esperar_enter()
     # Pausa la ejecución.
     elif opcion == '8':
     # Si la opción es '8'.
-        mostrar_todos_los_graficos(gastos)
+        mostrar_todos_los_graficos(gastos, estadisticas)
     # Llama a la función que muestra todos los gráficos.
     elif opcion == '9':
     # Si la opción es '9'.
-        mostrar_grafico_individual(gastos)
+        mostrar_grafico_individual(gastos, estadisticas)
     # Llama a la función que muestra un solo gráfico a la vez.
     elif opcion == '0':
     # Si la opción es '0'.
@@ -0,0 +1,263 @@
+# Consultas_Gastos.py
+# Consultas por rango sobre el almacén: índices ordenados por fecha (ordinal), por monto y por
+# (categoría, fecha), resueltos con búsqueda binaria. "Gastos entre dos fechas", "gastos de
+# más de $N" o "categoría C en el mes M" cuestan O(log n + k) en lugar de recorrer todo.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import calendar  # último día de cada mes
+from datetime import date  # límites de un mes
+import numpy as np  # índices ordenados y búsqueda binaria (searchsorted)
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, fecha_a_ordinal, formato_legible  # fechas como números de día
+from Agregacion_Gastos import estadisticas_columnas  # estadísticas de una selección
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+MAXIMO_PENDIENTES = 4096  # filas nuevas o editadas que se revisan aparte antes de rehacer un índice
+PROPORCION_PENDIENTES = 0.125  # ...o esta proporción del índice, si es mayor
+CAMPOS_FILTRO = ("desde", "hasta", "monto_minimo", "monto_maximo", "categorias")  # claves de un filtro
+DESPLAZAMIENTO = 32  # bits de la fecha en la clave (categoría, fecha)
+
+
+# ------------------------------
+# Filtros
+# ------------------------------
+def limites_mes(mes):  # (primer día, último día) del mes como ordinales
+    """
+    Acepta "mm/aaaa", "aaaa-mm" o un par (año, mes). Lanza ValueError si no es un mes válido.
+    """
+    try:
+        if isinstance(mes, str):
+            texto = mes.strip()
+            anio, numero = (texto.split("-") if "-" in texto else reversed(texto.split("/")))
+            anio, numero = int(anio), int(numero)
+        else:
+            anio, numero = (int(v) for v in mes)
+        return date(anio, numero, 1).toordinal(), date(anio, numero, calendar.monthrange(anio, numero)[1]).toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Mes inválido: {mes!r}. Usá mm/aaaa.") from None
+
+
+def _ordinal_filtro(fecha, campo, formato_fecha):  # ordinal de una fecha del filtro (texto u ordinal)
+    if fecha is None or fecha == "":
+        return None
+    ordinal = int(fecha) if isinstance(fecha, (int, np.integer)) else fecha_a_ordinal(fecha)
+    if ordinal == SIN_FECHA:
+        raise ValueError(f"Fecha inválida en '{campo}': {fecha!r}. Usá {formato_legible(formato_fecha)}.")
+    return ordinal
+
+
+def _monto_filtro(monto, campo):  # monto del filtro como float
+    if monto is None or monto == "":
+        return None
+    try:
+        return float(monto)
+    except (TypeError, ValueError):
+        raise ValueError(f"Monto inválido en '{campo}': {monto!r}.") from None
+
+
+def crear_filtro(desde=None, hasta=None, monto_minimo=None, monto_maximo=None, categorias=None, mes=None,
+                 formato_fecha=FORMATO_FECHA):  # arma un filtro
+    """
+    Devuelve un dict con las claves de CAMPOS_FILTRO (None = sin límite), o None si no
+    restringe nada. Las fechas pueden ser texto en cualquiera de los formatos aceptados u
+    ordinales; `mes` ("mm/aaaa") fija desde y hasta. Los límites son inclusivos.
+    `categorias` es un nombre o una lista de nombres. Lanza ValueError con datos inválidos;
+    el mensaje de una fecha inválida sugiere `formato_fecha`, el del almacén.
+    """
+    if mes is not None:
+        desde, hasta = limites_mes(mes)
+    if isinstance(categorias, str):
+        categorias = [categorias]
+    filtro = {
+        "desde": _ordinal_filtro(desde, "desde", formato_fecha),
+        "hasta": _ordinal_filtro(hasta, "hasta", formato_fecha),
+        "monto_minimo": _monto_filtro(monto_minimo, "monto_minimo"),
+        "monto_maximo": _monto_filtro(monto_maximo, "monto_maximo"),
+        "categorias": tuple(categorias) if categorias else None,
+    }
+    if filtro["hasta"] is not None and filtro["desde"] is None:  # las fechas no interpretadas no caen en ningún rango
+        filtro["desde"] = SIN_FECHA + 1
+    return filtro if any(v is not None for v in filtro.values()) else None
+
+
+def clave_filtro(filtro):  # versión inmutable del filtro (para usarlo como clave de una caché)
+    return None if filtro is None else tuple(filtro.get(campo) for campo in CAMPOS_FILTRO)
+
+
+def cumple_filtro(gasto, filtro):  # True si el gasto (dict) cumple el filtro
+    if filtro is None:
+        return True
+    ordinal = fecha_a_ordinal(gasto["fecha"])
+    monto = float(gasto["monto"])
+    return ((filtro["desde"] is None or ordinal >= filtro["desde"])
+            and (filtro["hasta"] is None or ordinal <= filtro["hasta"])
+            and (filtro["monto_minimo"] is None or monto >= filtro["monto_minimo"])
+            and (filtro["monto_maximo"] is None or monto <= filtro["monto_maximo"])
+            and (filtro["categorias"] is None or gasto["categoria"] in filtro["categorias"]))
+
+
+def condicion_sql(filtro):  # (condición, parámetros) del filtro para la base SQLite
+    if filtro is None:
+        return "", ()
+    partes, parametros = [], []
+    for campo, columna, operador in (("desde", "fecha", ">="), ("hasta", "fecha", "<="),
+                                     ("monto_minimo", "monto", ">="), ("monto_maximo", "monto", "<=")):
+        if filtro[campo] is not None:
+            partes.append(f"{columna} {operador} ?")
+            parametros.append(filtro[campo])
+    if filtro["categorias"] is not None:
+        partes.append(f"categoria IN ({', '.join('?' * len(filtro['categorias']))})")
+        parametros.extend(filtro["categorias"])
+    return " AND ".join(partes), tuple(parametros)
+
+
+# ------------------------------
+# Selección de gastos
+# ------------------------------
+class SeleccionGastos:
+    """
+    Gastos que cumplen un filtro, como columnas: tiene len(), columnas() y categorias,
+    lo que necesitan los gráficos (Graficos_Gastos.dibujar_figura).
+    """
+
+    def __init__(self, codigos, montos, fechas, categorias):
+        self._columnas = (codigos, montos, fechas)
+        self.categorias = categorias  # código -> nombre
+        self.version = 0  # la selección no cambia
+
+    def __len__(self):
+        return self._columnas[1].shape[0]
+
+    def columnas(self):  # (codigos_categoria, montos, fechas)
+        return self._columnas
+
+    def estadisticas(self):  # estadísticas acumuladas de la selección (por categoría y período)
+        codigos, montos, fechas = self._columnas
+        return estadisticas_columnas(codigos, montos, self.categorias, fechas)
+
+
+# ------------------------------
+# Índice de consultas
+# ------------------------------
+class IndiceConsultas:
+    """
+    Índices ordenados sobre un AlmacenGastos (o un LibroBinario) para filtrar por rango de
+    fechas, de montos y por categoría sin recorrer todas las filas. Cada índice se arma la
+    primera vez que se lo necesita; después, las filas nuevas o editadas se revisan aparte
+    (y las borradas se descartan al confirmar), así un alta o una edición no obliga a
+    reordenar todo. Con una base SQLite las consultas se resuelven en la base, que ya
+    tiene índices por fecha, monto y categoría.
+    """
+
+    def __init__(self, almacen):  # índice para un almacén
+        self.almacen = almacen
+        self._indices = {}  # "fecha" | "monto" | "categoria" -> claves ordenadas, filas, marca y pendientes
+        self._sql = hasattr(almacen, "consultar")  # base SQLite: se consulta con SQL
+
+    def _indice(self, nombre):  # índice al día (lo arma o incorpora los cambios)
+        marca = self.almacen.marca_indices()
+        indice = self._indices.get(nombre)
+        if indice is not None and indice["marca"] != marca:  # el almacén cambió
+            cambiadas = self.almacen.filas_cambiadas(indice["marca"])
+            if cambiadas is None:  # se compactó: las posiciones ya no sirven
+                indice = None
+            else:
+                pendientes = np.union1d(indice["pendientes"], cambiadas)
+                if pendientes.size > max(MAXIMO_PENDIENTES, indice["filas"].size * PROPORCION_PENDIENTES):
+                    indice = None  # demasiados cambios: conviene reordenar
+                else:
+                    indice["pendientes"], indice["marca"] = pendientes, marca
+        if indice is None:
+            filas, codigos, montos, fechas = self.almacen.filas_y_columnas()
+            if nombre == "fecha":
+                claves = fechas
+            elif nombre == "monto":
+                claves = montos
+            else:  # (categoría, fecha) en un solo entero
+                claves = (codigos.astype(np.int64) << DESPLAZAMIENTO) | fechas.astype(np.int64)
+            orden = np.argsort(claves, kind="stable")
+            indice = self._indices[nombre] = {"claves": claves[orden], "filas": filas[orden],
+                                              "marca": marca, "pendientes": np.empty(0, dtype=np.int64)}
+        return indice
+
+    def _rangos(self, filtro):  # candidatos de cada índice que sirve para el filtro: (cantidad, nombre, rangos)
+        opciones = []
+        if filtro["desde"] is not None or filtro["hasta"] is not None:
+            opciones.append(("fecha", [(filtro["desde"], filtro["hasta"])]))
+        if filtro["monto_minimo"] is not None or filtro["monto_maximo"] is not None:
+            opciones.append(("monto", [(filtro["monto_minimo"], filtro["monto_maximo"])]))
+        if filtro["categorias"] is not None:
+            codigos = [c for c, nombre in enumerate(self.almacen.categorias) if nombre in filtro["categorias"]]
+            desde = filtro["desde"] if filtro["desde"] is not None else 0
+            hasta = filtro["hasta"] if filtro["hasta"] is not None else (1 << DESPLAZAMIENTO) - 1
+            opciones.append(("categoria", [((c << DESPLAZAMIENTO) | desde, (c << DESPLAZAMIENTO) | hasta) for c in codigos]))
+        resultado = []
+        for nombre, rangos in opciones:
+            claves = self._indice(nombre)["claves"]
+            tipo = claves.dtype.type  # límites del mismo tipo que las claves (si no, NumPy convierte todo el arreglo)
+            posiciones = [(0 if bajo is None else int(np.searchsorted(claves, tipo(bajo), side="left")),
+                           claves.size if alto is None else int(np.searchsorted(claves, tipo(alto), side="right")))
+                          for bajo, alto in rangos]  # búsqueda binaria: O(log n) por rango
+            resultado.append((sum(fin - inicio for inicio, fin in posiciones), nombre, posiciones))
+        return resultado
+
+    def filas(self, filtro):  # posiciones de las filas que cumplen el filtro, en orden de alta
+        """
+        Elige el índice con menos candidatos (fechas, montos o categoría+fechas), toma su
+        rango con búsqueda binaria, le suma las filas nuevas o editadas desde que se armó y
+        confirma cada candidato con los valores actuales. Costo O(log n + k).
+        """
+        if filtro is None:
+            return self.almacen.filas_y_columnas()[0]
+        opciones = self._rangos(filtro)
+        if not opciones:  # filtro vacío
+            return self.almacen.filas_y_columnas()[0]
+        _, nombre, posiciones = min(opciones, key=lambda o: o[0])
+        indice = self._indices[nombre]
+        candidatos = np.concatenate([indice["filas"][inicio:fin] for inicio, fin in posiciones] + [indice["pendientes"]])
+        activas, codigos, montos, fechas = self.almacen.valores_de_filas(candidatos)
+        cumple = activas.copy()  # las borradas quedan afuera
+        if filtro["desde"] is not None:
+            cumple &= fechas >= filtro["desde"]
+        if filtro["hasta"] is not None:
+            cumple &= fechas <= filtro["hasta"]
+        if filtro["monto_minimo"] is not None:
+            cumple &= montos >= filtro["monto_minimo"]
+        if filtro["monto_maximo"] is not None:
+            cumple &= montos <= filtro["monto_maximo"]
+        if filtro["categorias"] is not None:
+            marca = np.zeros(len(self.almacen.categorias) + 1, dtype=bool)  # True en los códigos pedidos
+            marca[[c for c, n in enumerate(self.almacen.categorias) if n in filtro["categorias"]]] = True
+            cumple &= marca[codigos]
+        resultado = np.sort(candidatos[cumple])  # en orden de alta
+        if indice["pendientes"].size and resultado.size:  # una fila editada puede estar dos veces
+            resultado = resultado[np.concatenate(([True], resultado[1:] != resultado[:-1]))]
+        return resultado
+
+    def ids(self, filtro):  # ids de los gastos que cumplen el filtro, en orden de alta
+        if self._sql:
+            return self.almacen.consultar(*condicion_sql(filtro))
+        return self.almacen.ids_de_filas(self.filas(filtro))
+
+    def seleccion(self, filtro):  # los gastos que cumplen el filtro como SeleccionGastos
+        if self._sql:
+            columnas = self.almacen.columnas_donde(*condicion_sql(filtro))
+        else:
+            _, codigos, montos, fechas = self.almacen.valores_de_filas(self.filas(filtro))
+            columnas = (codigos, montos, fechas)
+        return SeleccionGastos(*columnas, list(self.almacen.categorias))
+
+    # ---------- consultas frecuentes ----------
+    def entre_fechas(self, desde, hasta):  # ids de los gastos entre dos fechas (inclusive)
+        return self.ids(crear_filtro(desde=desde, hasta=hasta))
+
+    def mayores_a(self, monto):  # ids de los gastos de `monto` o más
+        return self.ids(crear_filtro(monto_minimo=monto))
+
+    def categoria_en_mes(self, categoria, mes):  # ids de una categoría en un mes ("mm/aaaa")
+        return self.ids(crear_filtro(categorias=categoria, mes=mes))
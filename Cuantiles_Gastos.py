@@ -0,0 +1,190 @@
+# Cuantiles_Gastos.py
+# Cuantiles aproximados e histogramas por categoría sin guardar los montos: cada categoría
+# lleva en las estadísticas incrementales (acum["cuantiles"]) cuántos gastos cayeron en cada
+# cubeta de una escala logarítmica fija, al estilo DDSketch. Las cubetas no dependen de los
+# datos, así que un alta suma 1, una baja resta 1 y dos conjuntos se combinan sumando, igual
+# que los períodos. Un cuantil sale con error relativo de a lo sumo ERROR_RELATIVO, y el
+# boxplot y el histograma se dibujan desde las cubetas (ax.bxp y pesos en ax.hist) con un
+# costo que no depende de la cantidad de gastos. Las mismas cubetas acotan el mínimo y el
+# máximo cuando se quita un gasto extremo (cuantiles_extremos).
+
+# ------------------------------
+# Imports
+# ------------------------------
+from bisect import bisect_left  # cubeta de un monto suelto
+import numpy as np  # cubetas desde columnas y cuantiles
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+ERROR_RELATIVO = 0.01  # error relativo máximo de un cuantil (1%)
+GAMMA = (1 + ERROR_RELATIVO) / (1 - ERROR_RELATIVO)  # razón entre bordes consecutivos
+MONTO_MINIMO = 0.005  # montos de menor valor absoluto van a la cubeta del cero (menos de medio centavo)
+CUBETAS = 2048  # cubetas por signo: cubren hasta MONTO_MINIMO * GAMMA**CUBETAS (más de 1e15)
+BORDES = MONTO_MINIMO * GAMMA ** np.arange(CUBETAS)  # borde superior de cada cubeta (la 0 es el cero)
+REPRESENTANTES = np.concatenate(([0.0], 2 * BORDES[1:] / (1 + GAMMA)))  # valor de cada cubeta (error <= ERROR_RELATIVO)
+_BORDES = BORDES.tolist()  # los mismos bordes para bisect (da la misma cubeta que searchsorted)
+BARRAS_HISTOGRAMA = 12  # barras del histograma de montos
+RANGO_BIGOTES = 1.5  # largo de los bigotes del boxplot, en rangos intercuartílicos
+
+
+# ------------------------------
+# Acumuladores
+# ------------------------------
+def cuantiles_vacios():  # clave de cubeta -> cantidad de gastos
+    return {}
+
+
+def clave_cuantil(monto):  # cubeta del monto: 0 para el cero, negativa para montos negativos
+    clave = min(bisect_left(_BORDES, abs(monto)), CUBETAS - 1)
+    return clave if monto >= 0 else -clave
+
+
+def claves_cuantil(montos):  # clave_cuantil sobre un arreglo
+    claves = np.minimum(np.searchsorted(BORDES, np.abs(montos)), CUBETAS - 1)
+    return np.where(montos < 0, -claves, claves)
+
+
+def cuantiles_sumar(cuantiles, monto, cantidad=1):  # suma (o resta) gastos a la cubeta del monto
+    """
+    Suma `cantidad` gastos a la cubeta de `monto`; con una cantidad negativa los resta.
+    Costo O(1). Una cubeta sin gastos se borra.
+    """
+    clave = clave_cuantil(monto)
+    restantes = cuantiles.get(clave, 0) + cantidad
+    if restantes > 0:
+        cuantiles[clave] = restantes
+    else:
+        cuantiles.pop(clave, None)
+
+
+def cuantiles_combinar(destino, origen):  # suma a `destino` las cubetas de `origen` (O(cubetas))
+    for clave, cantidad in origen.items():
+        destino[clave] = destino.get(clave, 0) + cantidad
+
+
+def _borde(clave, inferior):  # borde inferior (o superior) de una cubeta, como en _limites
+    modulo = abs(clave)
+    externo = float(BORDES[modulo])  # borde más lejos del cero
+    interno = float(BORDES[modulo - 1]) if modulo > 0 else -MONTO_MINIMO  # borde más cerca
+    if clave < 0:
+        return -externo if inferior else -interno
+    return interno if inferior else externo
+
+
+def cuantiles_extremos(cuantiles, monto, minimo, maximo):  # (minimo, maximo) después de quitar un gasto de `monto`
+    """
+    Sin los montos exactos, un extremo que se quitó se acota con las cubetas (ya sin ese
+    gasto): si en su cubeta quedan gastos, el extremo sigue siendo `monto` (exacto si estaba
+    repetido, y a menos de ERROR_RELATIVO si no); si la cubeta quedó vacía, pasa al borde de
+    la primera (o la última) cubeta con gastos. El mínimo nunca supera al menor monto real ni
+    el máximo queda por debajo del mayor, así los cuantiles y el histograma siguen cubiertos.
+    """
+    if not cuantiles:  # no quedan gastos
+        return minimo, maximo
+    if monto == minimo and clave_cuantil(monto) not in cuantiles:
+        minimo = max(_borde(min(cuantiles), True), minimo)
+    if monto == maximo and clave_cuantil(monto) not in cuantiles:
+        maximo = min(_borde(max(cuantiles), False), maximo)
+    return minimo, maximo
+
+
+def cuantiles_de_frecuencias(valores, cuentas):  # cubetas desde montos distintos ordenados y sus frecuencias
+    """
+    Arma las cubetas a partir de los montos distintos de una categoría, en orden creciente,
+    y de cuántas veces aparece cada uno (por ejemplo, la salida de np.unique). Como las
+    claves crecen con el monto, cada cubeta es un tramo contiguo.
+    """
+    if len(valores) == 0:
+        return cuantiles_vacios()
+    claves = claves_cuantil(np.asarray(valores, dtype=np.float64))
+    inicios = np.concatenate(([0], np.flatnonzero(np.diff(claves)) + 1))  # primera posición de cada cubeta
+    return dict(zip(claves[inicios].tolist(), np.add.reduceat(np.asarray(cuentas), inicios).tolist()))
+
+
+# ------------------------------
+# Consultas (O(cubetas))
+# ------------------------------
+def _cubetas(acum):  # (claves, cantidades) de las cubetas, en orden creciente de monto
+    claves = np.fromiter(sorted(acum["cuantiles"]), dtype=np.int64, count=len(acum["cuantiles"]))
+    return claves, np.fromiter((acum["cuantiles"][c] for c in claves.tolist()), dtype=np.int64, count=claves.size)
+
+
+def _valores(acum, claves):  # valor de cada cubeta, dentro de los extremos (que se conocen exactos)
+    return np.clip(np.copysign(REPRESENTANTES[np.abs(claves)], claves), acum["minimo"], acum["maximo"])
+
+
+def _limites(acum, claves):  # (desde, hasta) de cada cubeta, dentro de los extremos
+    modulo = np.abs(claves)
+    externo = BORDES[modulo]  # borde más lejos del cero
+    interno = np.where(modulo > 0, BORDES[np.maximum(modulo - 1, 0)], -MONTO_MINIMO)  # borde más cerca (la del cero va de -mín a mín)
+    desde = np.where(claves < 0, -externo, interno)
+    hasta = np.where(claves < 0, -interno, externo)
+    return np.clip(desde, acum["minimo"], acum["maximo"]), np.clip(hasta, acum["minimo"], acum["maximo"])
+
+
+def total_cuantiles(estadisticas):  # acumuladores de todas las categorías juntas (para un gráfico general)
+    """
+    Devuelve un acumulador con cantidad, suma, mínimo, máximo y cubetas de todas las
+    categorías, o None si no hay gastos.
+    """
+    if not estadisticas:
+        return None
+    cuantiles = cuantiles_vacios()
+    for acum in estadisticas.values():
+        cuantiles_combinar(cuantiles, acum["cuantiles"])
+    return {"cantidad": sum(a["cantidad"] for a in estadisticas.values()),
+            "suma": sum(a["suma"] for a in estadisticas.values()),
+            "minimo": min(a["minimo"] for a in estadisticas.values()),
+            "maximo": max(a["maximo"] for a in estadisticas.values()),
+            "cuantiles": cuantiles}
+
+
+def cuantiles_aproximados(acum, probabilidades):  # montos aproximados en las probabilidades pedidas
+    """
+    Devuelve un arreglo con el cuantil de cada probabilidad (entre 0 y 1): el valor de la
+    cubeta donde cae la posición q * (cantidad - 1) de los montos ordenados.
+    """
+    claves, cantidades = _cubetas(acum)
+    acumuladas = np.cumsum(cantidades)
+    posiciones = np.asarray(probabilidades, dtype=np.float64) * (acumuladas[-1] - 1)
+    return _valores(acum, claves)[np.searchsorted(acumuladas, posiciones, side="right")]
+
+
+def caja(acum, etiqueta=None):  # estadísticas del boxplot en el formato de ax.bxp
+    """
+    Arma el diccionario que espera Axes.bxp (cuartiles, media, bigotes y valores atípicos)
+    desde las cubetas. Los bigotes llegan hasta el último valor dentro de RANGO_BIGOTES
+    rangos intercuartílicos, como en ax.boxplot; los atípicos son los valores de las
+    cubetas que quedan afuera (uno por cubeta, no uno por gasto).
+    """
+    valores = _valores(acum, _cubetas(acum)[0])
+    q1, mediana, q3 = cuantiles_aproximados(acum, (0.25, 0.5, 0.75)).tolist()
+    rango = q3 - q1
+    dentro = valores[(valores >= q1 - RANGO_BIGOTES * rango) & (valores <= q3 + RANGO_BIGOTES * rango)]
+    bigote_bajo = min(float(dentro.min()), q1) if dentro.size else q1
+    bigote_alto = max(float(dentro.max()), q3) if dentro.size else q3
+    estadisticas = {"q1": q1, "med": mediana, "q3": q3, "mean": acum["suma"] / acum["cantidad"],
+                    "whislo": bigote_bajo, "whishi": bigote_alto,
+                    "fliers": valores[(valores < bigote_bajo) | (valores > bigote_alto)]}
+    if etiqueta is not None:  # sin etiqueta, bxp numera la caja
+        estadisticas["label"] = etiqueta
+    return estadisticas
+
+
+def histograma(acum, barras=BARRAS_HISTOGRAMA):  # (cantidades, bordes) del histograma de montos
+    """
+    Devuelve las cantidades de `barras` barras iguales entre el mínimo y el máximo (como
+    np.histogram sobre los montos) y sus bordes. Una cubeta que cruza el borde de una barra
+    se reparte entre las dos en proporción a su ancho, como si sus gastos estuvieran
+    distribuidos parejo dentro de ella.
+    """
+    claves, cantidades = _cubetas(acum)
+    if acum["minimo"] == acum["maximo"]:  # un solo monto: una barra, con los mismos bordes que np.histogram
+        return np.histogram([acum["minimo"]], bins=barras, weights=[float(cantidades.sum())])
+    desde, hasta = _limites(acum, claves)
+    bordes = np.linspace(acum["minimo"], acum["maximo"], barras + 1)
+    puntos = np.concatenate((desde[:1], hasta))  # distribución acumulada, lineal dentro de cada cubeta
+    acumuladas = np.concatenate(([0], np.cumsum(cantidades)))
+    return np.diff(np.interp(bordes, puntos, acumuladas)), bordes
@@ -0,0 +1,261 @@
+# Diario_Gastos.py
+# Guardado incremental: cada guardado agrega al diario (un archivo de líneas JSON) solo los
+# gastos que cambiaron, y cada tanto se rehace la instantánea completa en segundo plano.
+#
+# Archivos, para gastos.json:
+#   gastos.json           instantánea: dict id -> gasto, el mismo formato de siempre
+#   gastos.json.diario    cambios posteriores a la instantánea, uno por línea
+#   gastos.json.diario.1  diario cerrado mientras se escribe la instantánea nueva
+#   gastos.json.cabecera  cantidad de gastos y próximo id, para abrir sin leer todo
+# Al cargar se lee la instantánea y se aplican los diarios en orden. Aplicar un cambio dos
+# veces da el mismo resultado, así que un corte en cualquier momento no pierde ni duplica datos.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # para fsync, reemplazo atómico y borrado de archivos
+import json  # instantánea y líneas del diario
+import threading  # para rehacer la instantánea sin frenar el programa
+
+from Almacen_Gastos import AlmacenGastos  # almacén donde se cargan los gastos
+from Almacen_Diferido import AlmacenDiferido  # apertura inmediata con carga en un hilo
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+EXTENSION_DIARIO = ".diario"  # sufijo del diario abierto
+EXTENSION_CERRADO = ".diario.1"  # sufijo del diario cerrado durante una instantánea
+EXTENSION_CABECERA = ".cabecera"  # sufijo de la cabecera
+COMPACTAR_MINIMO = 1000  # cambios en el diario antes de pensar en rehacer la instantánea
+COMPACTAR_PROPORCION = 0.5  # y además deben superar esta fracción de los gastos (costo amortizado O(1))
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _escribir_seguro(ruta, escribir):  # escribe en un temporal, lo fuerza al disco y reemplaza el destino
+    temporal = ruta + ".tmp"  # archivo temporal
+    with open(temporal, "w", encoding="utf-8") as f:
+        escribir(f)  # contenido
+        f.flush()
+        os.fsync(f.fileno())  # asegura que esté en disco antes de reemplazar
+    os.replace(temporal, ruta)  # el destino cambia de una sola vez
+
+
+def _aplicar_diario(almacen, ruta):  # aplica al almacén los cambios de un diario; devuelve cuántos leyó
+    """
+    Aplica las líneas del diario en orden. Solo la última línea, si quedó sin terminar y no
+    es un JSON válido, se toma como cortada (corte de luz a mitad de escritura) y se recorta
+    del archivo. Cualquier otra línea dañada lanza el error sin tocar el archivo.
+    """
+    if not os.path.exists(ruta):  # no hay diario
+        return 0
+    cantidad = 0  # cambios aplicados
+    cortada = None  # bytes de la última línea, si quedó cortada
+    with open(ruta, "rb") as f:
+        for linea in f:
+            if linea.endswith(b"\n"):  # línea completa: tiene que leerse bien
+                cambio = json.loads(linea.decode("utf-8"))  # un cambio por línea
+            else:  # la última, sin terminar (el corte puede caer a mitad de una letra)
+                try:
+                    cambio = json.loads(linea.decode("utf-8", errors="replace"))
+                except json.JSONDecodeError:  # cortada por un corte de luz
+                    cortada = len(linea)
+                    break
+            if cambio.get("baja"):  # el gasto fue borrado
+                if cambio["id"] in almacen:
+                    del almacen[cambio["id"]]
+            else:  # alta o modificación: queda el gasto completo
+                almacen[cambio["id"]] = cambio["gasto"]
+            cantidad += 1
+    if cortada is not None:  # se corta para poder seguir agregando
+        os.truncate(ruta, os.path.getsize(ruta) - cortada)
+    elif cantidad and not linea.endswith(b"\n"):  # completa, pero el corte fue justo antes del salto de línea
+        with open(ruta, "ab") as f:
+            f.write(b"\n")  # los cambios siguientes van en otra línea
+    return cantidad
+
+
+def _firma(ruta):  # [tamaño, fecha de modificación] del archivo, o None si no existe
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+# ------------------------------
+# Diario de un archivo de gastos
+# ------------------------------
+class DiarioGastos:
+    """
+    Maneja la instantánea y el diario de un archivo de gastos.
+    cargar() devuelve un AlmacenGastos que registra sus cambios; guardar() escribe en el
+    diario solo esos cambios (O(cambios)) y, cuando el diario ya es grande, rehace la
+    instantánea en un hilo con una copia de los datos.
+    """
+
+    def __init__(self, ruta, ordenar_claves=False):  # diario para el archivo `ruta`
+        self.ruta = ruta  # instantánea
+        self.ruta_diario = ruta + EXTENSION_DIARIO  # diario abierto
+        self.ruta_cerrado = ruta + EXTENSION_CERRADO  # diario cerrado
+        self.ruta_cabecera = ruta + EXTENSION_CABECERA  # cabecera
+        self.ordenar_claves = ordenar_claves  # sort_keys al escribir la instantánea
+        self.cambios_en_diario = 0  # líneas en los diarios (abierto y cerrado)
+        self._hilo = None  # hilo que escribe la instantánea, si hay uno en curso
+        self._cerrojo = threading.RLock()  # los archivos y su cabecera cambian juntos
+        self._cantidad = None  # cantidad de gastos y próximo id del último guardado
+        self._proximo_id = None
+
+    def esperar(self):  # espera a que termine la instantánea en curso, si la hay
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def abrir(self, formato_fecha):  # devuelve el almacén sin esperar a leerlo, si la cabecera está al día
+        """
+        Con una cabecera que coincide con los archivos en disco devuelve enseguida un
+        AlmacenDiferido (cantidad y próximo id de la cabecera, gastos cargándose en un hilo).
+        Si no hay cabecera, o quedó vieja, carga todo con cargar().
+        """
+        cabecera = self._leer_cabecera()
+        if cabecera is None:
+            return self.cargar(formato_fecha)
+        return AlmacenDiferido(lambda: self.cargar(formato_fecha), *cabecera)
+
+    def cargar(self, formato_fecha):  # lee instantánea + diarios y devuelve el almacén
+        """
+        Devuelve un AlmacenGastos con la instantánea y los cambios del diario aplicados.
+        Lanza FileNotFoundError si no hay ni instantánea ni diario.
+        """
+        self.esperar()  # la instantánea en curso tiene que quedar completa
+        cabecera = self._leer_cabecera()  # antes de aplicar los diarios (pueden recortarse)
+        if os.path.exists(self.ruta):
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                almacen = AlmacenGastos.desde_registros(json.load(f), formato_fecha)  # instantánea
+        elif os.path.exists(self.ruta_diario) or os.path.exists(self.ruta_cerrado):
+            almacen = AlmacenGastos(formato_fecha)  # solo hay diario
+        else:
+            raise FileNotFoundError(self.ruta)
+        self.cambios_en_diario = (_aplicar_diario(almacen, self.ruta_cerrado)  # primero el cerrado (más viejo)
+                                  + _aplicar_diario(almacen, self.ruta_diario))
+        if cabecera is None:  # la deja al día para que la próxima apertura sea inmediata
+            self._actualizar_cabecera(almacen)
+        else:  # los ids borrados al final no se vuelven a usar
+            almacen.proximo_id = max(almacen.proximo_id, cabecera[1])
+        almacen.seguir_cambios()  # a partir de acá se registran los cambios
+        return almacen
+
+    def guardar(self, almacen):  # agrega al diario los cambios pendientes del almacén
+        """
+        Escribe en el diario una línea por cada gasto dado de alta, modificado o borrado
+        desde el último guardado y la fuerza al disco. Si todavía no hay instantánea, o el
+        almacén no venía registrando cambios, escribe la instantánea completa.
+        Devuelve la cantidad de cambios guardados.
+        """
+        if not almacen.registrando_cambios() or not os.path.exists(self.ruta):  # no se sabe qué cambió
+            self.esperar()
+            self._escribir_instantanea(almacen)  # guardado completo
+            for ruta in (self.ruta_diario, self.ruta_cerrado):  # los diarios ya están incluidos
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+            self._actualizar_cabecera(almacen)
+            self.cambios_en_diario = 0
+            almacen.seguir_cambios()
+            return len(almacen)
+        cambios = almacen.tomar_cambios()  # ids cambiados
+        if cambios:
+            with self._cerrojo:
+                tamano = os.path.getsize(self.ruta_diario) if os.path.exists(self.ruta_diario) else 0
+                try:
+                    with open(self.ruta_diario, "a", encoding="utf-8") as f:  # solo se agrega al final
+                        for id_gasto in sorted(cambios):
+                            gasto = almacen.obtener(id_gasto)  # estado actual (None si se borró)
+                            cambio = {"id": id_gasto, "baja": True} if gasto is None else {"id": id_gasto, "gasto": gasto}
+                            f.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())  # el guardado no termina hasta que esté en disco
+                except BaseException:  # disco lleno, archivo bloqueado...: se puede reintentar
+                    try:
+                        os.truncate(self.ruta_diario, tamano)  # sin líneas a medias al final
+                    except OSError:
+                        pass
+                    almacen.devolver_cambios(cambios)  # el próximo guardado los vuelve a escribir
+                    raise
+            self._actualizar_cabecera(almacen)
+            self.cambios_en_diario += len(cambios)
+        if self._conviene_compactar(almacen):  # el diario ya es grande
+            self._compactar_en_segundo_plano(almacen)
+        return len(cambios)
+
+    def _conviene_compactar(self, almacen):  # True si conviene rehacer la instantánea
+        return (self._hilo is None or not self._hilo.is_alive()) and \
+            self.cambios_en_diario >= max(COMPACTAR_MINIMO, len(almacen) * COMPACTAR_PROPORCION)
+
+    def _leer_cabecera(self):  # (cantidad, próximo id) si la cabecera coincide con los archivos, o None
+        try:
+            with open(self.ruta_cabecera, "r", encoding="utf-8") as f:
+                cabecera = json.load(f)
+            vigente = cabecera["archivos"] == [_firma(self.ruta), _firma(self.ruta_diario), _firma(self.ruta_cerrado)]
+        except (OSError, ValueError, KeyError, TypeError):  # no hay cabecera o está dañada
+            return None
+        return (cabecera["cantidad"], cabecera["proximo_id"]) if vigente else None
+
+    def _actualizar_cabecera(self, almacen=None):  # reescribe la cabecera según los archivos actuales
+        """
+        Guarda la cantidad de gastos y el próximo id de `almacen` (o los del último guardado)
+        junto con tamaño y fecha de cada archivo, que al abrir confirman que sigue vigente.
+        """
+        with self._cerrojo:
+            if almacen is not None:
+                self._cantidad, self._proximo_id = len(almacen), almacen.proximo_id
+            cabecera = {"cantidad": self._cantidad, "proximo_id": self._proximo_id,
+                        "archivos": [_firma(self.ruta), _firma(self.ruta_diario), _firma(self.ruta_cerrado)]}
+            _escribir_seguro(self.ruta_cabecera, lambda f: json.dump(cabecera, f))
+
+    def _escribir_instantanea(self, almacen):  # escribe la instantánea completa (atómica)
+        datos = almacen.a_diccionario()  # dict id -> gasto
+        _escribir_seguro(self.ruta, lambda f: json.dump(datos, f, indent=4, sort_keys=self.ordenar_claves))
+
+    def _compactar_en_segundo_plano(self, almacen):  # rehace la instantánea en un hilo
+        """
+        Cierra el diario actual (los guardados siguientes van a uno nuevo) y escribe en un
+        hilo la instantánea a partir de una copia de las columnas. Cuando la instantánea
+        quedó en disco se borra el diario cerrado, que ya está incluido en ella.
+        """
+        self.esperar()  # limpia el hilo anterior
+        if not os.path.exists(self.ruta_diario):  # no hay nada que cerrar
+            return
+        if os.path.exists(self.ruta_cerrado):  # quedó uno de un corte anterior: se incluye en esta instantánea
+            with open(self.ruta_cerrado, "a", encoding="utf-8") as cerrado, \
+                    open(self.ruta_diario, "r", encoding="utf-8") as abierto:
+                cerrado.write(abierto.read())
+            os.remove(self.ruta_diario)
+        else:
+            os.replace(self.ruta_diario, self.ruta_cerrado)  # cierra el diario actual
+        self._actualizar_cabecera(almacen)
+        self.cambios_en_diario = 0  # el diario abierto empieza vacío
+        copia = almacen.instantanea()  # datos al momento del cierre
+
+        def escribir():  # cuerpo del hilo
+            self._escribir_instantanea(copia)
+            with self._cerrojo:
+                os.remove(self.ruta_cerrado)  # ya está en la instantánea
+                self._actualizar_cabecera()
+
+        self._hilo = threading.Thread(target=escribir)  # no es daemon: al salir se espera que termine
+        self._hilo.start()
+
+
+# ------------------------------
+# Un diario por archivo
+# ------------------------------
+_diarios = {}  # ruta -> DiarioGastos (así cargar y guardar comparten el conteo y el hilo)
+
+
+def diario_de(ruta, ordenar_claves=False):  # devuelve el diario del archivo (lo crea la primera vez)
+    diario = _diarios.get(ruta)
+    if diario is None:
+        diario = _diarios[ruta] = DiarioGastos(ruta, ordenar_claves)
+    return diario
@@ -0,0 +1,106 @@
+# Exportacion_Gastos.py
+# Escritura de gastos a JSON, CSV o TXT (líneas JSON) gasto por gasto, a una base SQLite o
+# a un libro binario, en un archivo temporal que reemplaza al destino recién al terminar bien.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # para extensiones, reemplazo atómico y borrado del temporal
+import csv  # para escribir CSV
+import json  # para escribir JSON
+
+from Almacen_SQLite import AlmacenSQLite, es_base_sqlite  # para exportar a una base SQLite
+from Formato_Binario import escribir_binario, es_libro_binario  # para exportar al libro binario
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+PASO_PROGRESO = 10000  # cada cuántos gastos se informa el avance (y se revisa la cancelación)
+COLUMNAS_CSV = ["id", "fecha", "categoria", "descripcion", "monto"]  # encabezado del CSV
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _recorrer(almacen, tarea):  # recorre (id, gasto) informando avance cada PASO_PROGRESO
+    total = len(almacen) or 1  # total de gastos (evita dividir por cero)
+    for i, (id_gasto, g) in enumerate(almacen.items(), 1):
+        if tarea is not None and i % PASO_PROGRESO == 0:  # cada tanto
+            tarea.comprobar()  # se detiene si pidieron cancelar
+            tarea.informar(i / total, f"{i} de {total} gastos")  # informa el avance
+        yield id_gasto, g
+
+
+# ------------------------------
+# Exportación
+# ------------------------------
+def exportar_gastos(almacen, ruta, tarea=None):  # escribe los gastos del almacén en la ruta según la extensión
+    """
+    Guarda los gastos en `ruta` con formato JSON (lista con sangría 4), CSV, TXT
+    (una línea JSON por gasto), base SQLite (.db) o libro binario (.gbin), incluyendo el id de cada uno.
+    Escribe primero en `ruta + '.tmp'` y lo renombra al final, así una falla o una
+    cancelación nunca dejan el archivo destino a medio escribir.
+    """
+    ext = os.path.splitext(ruta)[1].lower()  # extensión
+    if ext not in (".json", ".csv", ".txt") and not es_base_sqlite(ruta) and not es_libro_binario(ruta):  # se valida antes de escribir
+        raise ValueError("Extensión no soportada para guardar.")
+    temporal = ruta + ".tmp"  # archivo temporal
+    if es_base_sqlite(ruta):  # base SQLite nueva
+        return _exportar_sqlite(almacen, ruta, temporal, tarea)
+    try:
+        if es_libro_binario(ruta):  # registros de ancho fijo (columnas copiadas de una vez)
+            escribir_binario(almacen, temporal, _recorrer(almacen, tarea))
+            os.replace(temporal, ruta)
+            return _terminar(almacen, ruta, tarea)
+        with open(temporal, "w", newline="", encoding="utf-8") as f:
+            if ext == ".json":  # lista JSON, con el mismo formato que json.dump(..., indent=4)
+                f.write("[")
+                separador = "\n"  # antes del primer elemento solo va el salto de línea
+                for id_gasto, g in _recorrer(almacen, tarea):
+                    texto = json.dumps(dict(g, id=id_gasto), indent=4, ensure_ascii=False)  # un gasto
+                    f.write(separador + "    " + texto.replace("\n", "\n    "))  # sangría del nivel de la lista
+                    separador = ",\n"  # los siguientes van separados por coma
+                f.write("\n]" if separador == ",\n" else "]")  # cierra la lista (vacía: "[]")
+            elif ext == ".csv":  # csv con encabezado
+                writer = csv.DictWriter(f, fieldnames=COLUMNAS_CSV)
+                writer.writeheader()  # escribe cabecera
+                for id_gasto, g in _recorrer(almacen, tarea):
+                    writer.writerow(dict(g, id=id_gasto))  # escribe fila por fila
+            else:  # txt -> cada gasto como línea JSON para robustez
+                for id_gasto, g in _recorrer(almacen, tarea):
+                    f.write(json.dumps(dict(g, id=id_gasto), ensure_ascii=False) + "\n")  # una línea JSON por gasto
+        os.replace(temporal, ruta)  # reemplaza el destino de una sola vez
+    except BaseException:
+        if os.path.exists(temporal):  # limpia el temporal si algo falló o se canceló
+            os.remove(temporal)
+        raise
+    return _terminar(almacen, ruta, tarea)
+
+
+def _terminar(almacen, ruta, tarea):  # informa el avance final y devuelve la ruta escrita
+    if tarea is not None:
+        tarea.informar(1.0, f"{len(almacen)} gastos guardados")  # avance final
+    return ruta  # ruta escrita
+
+
+def _exportar_sqlite(almacen, ruta, temporal, tarea):  # escribe los gastos en una base SQLite nueva
+    if os.path.exists(temporal):  # restos de un intento anterior
+        os.remove(temporal)
+    try:
+        base = AlmacenSQLite(temporal)  # base vacía con tabla e índices
+        try:
+            base.cargar_registros(_recorrer(almacen, tarea))  # inserta respetando los ids
+            base.confirmar()
+        finally:
+            base.cerrar()  # al cerrar, SQLite vuelca el WAL en el archivo
+        for resto in (ruta + "-wal", ruta + "-shm"):  # archivos auxiliares de la base anterior
+            if os.path.exists(resto):
+                os.remove(resto)
+        os.replace(temporal, ruta)  # reemplaza el destino de una sola vez
+    except BaseException:
+        for resto in (temporal, temporal + "-wal", temporal + "-shm"):  # limpia el temporal
+            if os.path.exists(resto):
+                os.remove(resto)
+        raise
+    return _terminar(almacen, ruta, tarea)
@@ -0,0 +1,118 @@
+# Fechas_Gastos.py
+# Conversión de fechas de texto a números de día (ordinales) y de vuelta a texto.
+
+# ------------------------------
+# Imports
+# ------------------------------
+from datetime import datetime, date  # para interpretar y formatear fechas
+from functools import lru_cache  # caché de fechas ya interpretadas
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+FORMATO_FECHA = "%d/%m/%Y"  # formato dd/mm/aaaa usado por la interfaz Tkinter
+FORMATO_FECHA_CONSOLA = "%d-%m-%Y"  # formato dd-mm-aaaa usado por los programas de consola
+FORMATOS_ACEPTADOS = ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d")  # formatos que se intentan al leer una fecha
+SIN_FECHA = 0  # ordinal reservado para fechas que no se pudieron interpretar (date.toordinal() nunca da 0)
+
+
+# ------------------------------
+# Interpretación rápida (sin strptime)
+# ------------------------------
+TAMANO_CACHE = 1 << 16  # textos de fecha distintos que se recuerdan (un ledger tiene pocos miles)
+_ultimo_formato = FORMATOS_ACEPTADOS[0]  # formato que coincidió la última vez en el camino lento
+
+
+def _fecha_rapida(texto):  # interpreta fechas de ancho fijo dd/mm/aaaa, dd-mm-aaaa o aaaa-mm-dd
+    """
+    Reconoce el formato por la posición de los separadores y arma la fecha con int(),
+    sin strptime ni excepciones por cada formato probado. Devuelve None si el texto
+    no tiene esa forma o no es una fecha válida (lo resuelve el camino lento).
+    """
+    if len(texto) != 10:  # todos los formatos de ancho fijo miden 10
+        return None
+    if texto[2] == texto[5] and texto[2] in "/-":  # dd/mm/aaaa o dd-mm-aaaa
+        dia, mes, anio = texto[0:2], texto[3:5], texto[6:10]
+    elif texto[4] == texto[7] == "-":  # aaaa-mm-dd
+        anio, mes, dia = texto[0:4], texto[5:7], texto[8:10]
+    else:
+        return None
+    digitos = dia + mes + anio  # solo dígitos ASCII (isdigit solo acepta también '²', etc.)
+    if not (digitos.isascii() and digitos.isdigit()):
+        return None
+    try:
+        return date(int(anio), int(mes), int(dia))  # valida rangos (31/02 no existe)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _ordinal_de_texto(texto):  # ordinal de la fecha del texto (o SIN_FECHA), recordado por texto
+    global _ultimo_formato
+    fecha = _fecha_rapida(texto)  # camino rápido: casi todas las fechas
+    if fecha is not None:
+        return fecha.toordinal()
+    formatos = (_ultimo_formato,) + tuple(f for f in FORMATOS_ACEPTADOS if f != _ultimo_formato)  # primero el último que sirvió
+    for fmt in formatos:  # camino lento: fechas sin ceros (1/2/2024) o anomalías
+        try:
+            fecha = datetime.strptime(texto, fmt).date()
+        except ValueError:
+            continue  # prueba el siguiente formato
+        _ultimo_formato = fmt  # el archivo probablemente siga con el mismo formato
+        return fecha.toordinal()
+    return SIN_FECHA  # ningún formato coincidió
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _formatear(ordinal, formato):  # texto de un ordinal en el formato pedido, recordado
+    return date.fromordinal(ordinal).strftime(formato)
+
+
+# ------------------------------
+# Conversión texto <-> ordinal
+# ------------------------------
+def formato_legible(formato=FORMATO_FECHA):  # el formato como se lo escribe en un mensaje ("%d-%m-%Y" -> "dd-mm-aaaa")
+    return formato.replace("%d", "dd").replace("%m", "mm").replace("%Y", "aaaa").replace("%y", "aa")
+
+
+def _ordinal_texto_valido(texto, formato=FORMATO_FECHA):  # ordinal de la fecha o ValueError si no es reconocible
+    ordinal = fecha_a_ordinal(texto)  # número de día (usa la caché)
+    if ordinal == SIN_FECHA:  # ningún formato coincidió
+        raise ValueError(f"Formato de fecha inválido. Usá {formato_legible(formato)}.")
+    return ordinal
+
+
+def texto_a_fecha(texto):  # interpreta una fecha en cualquiera de los formatos aceptados
+    """
+    Devuelve un objeto date a partir del texto, probando los formatos aceptados.
+    Lanza ValueError si ninguno coincide.
+    """
+    return date.fromordinal(_ordinal_texto_valido(texto))  # fecha del número de día
+
+
+def fecha_a_ordinal(texto):  # convierte el texto de una fecha al número de día (int)
+    """
+    Devuelve el ordinal (número de día desde el 01/01/0001) de la fecha,
+    o SIN_FECHA si el texto no es una fecha reconocible.
+    """
+    return _ordinal_de_texto(texto) if isinstance(texto, str) else SIN_FECHA  # número de día (o SIN_FECHA)
+
+
+def ordinal_a_fecha(ordinal, formato=FORMATO_FECHA):  # convierte un número de día a texto
+    """
+    Devuelve la fecha del ordinal formateada con el formato pedido.
+    """
+    return _formatear(int(ordinal), formato)  # texto de la fecha
+
+
+def parsear_fecha(texto, formato=FORMATO_FECHA):  # normaliza una fecha de texto al formato pedido
+    """
+    Interpreta la fecha en cualquiera de los formatos aceptados y la devuelve como texto
+    en `formato` (dd/mm/aaaa por defecto). Lanza ValueError si no es una fecha válida.
+    """
+    return _formatear(_ordinal_texto_valido(texto, formato), formato)  # fecha reescrita en el formato pedido
+
+
+def hoy_str(formato=FORMATO_FECHA):  # fecha de hoy como texto
+    return date.today().strftime(formato)  # hoy formateado
@@ -0,0 +1,277 @@
+# Formato_Binario.py
+# Libro de gastos binario: registros de ancho fijo más tablas de textos, leído con mmap.
+# Abrirlo solo lee la cabecera y las categorías; montos, fechas y códigos se usan
+# directamente desde el archivo mapeado, sin crear un objeto de Python por gasto.
+#
+# Estructura (little-endian, secciones alineadas a 8 bytes):
+#   cabecera       FIRMA, versión, cantidad de gastos, próximo id y posición de cada sección
+#   registros      REGISTRO por gasto: id, monto, fecha (ordinal), descripción y categoría (códigos)
+#   categorías     tabla de textos: desplazamientos uint64 (n + 1) y los textos UTF-8 seguidos
+#   descripciones  tabla de textos
+#   fechas libres  posiciones int64 de los gastos con fecha no interpretable y tabla con sus textos
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # para la extensión del archivo
+import mmap  # lectura del archivo sin copiarlo a memoria
+import struct  # cabecera
+import numpy as np  # registros como arreglo estructurado
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, fecha_a_ordinal, ordinal_a_fecha  # fechas como números de día
+from Agregacion_Gastos import estadisticas_columnas  # estadísticas sobre las columnas mapeadas
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+EXTENSION_BINARIA = ".gbin"  # extensión del libro binario
+FIRMA = b"GASTOSB\x00"  # primeros bytes del archivo
+VERSION = 1  # versión del formato
+CABECERA = struct.Struct("<8sI4x9q")  # firma, versión y 9 enteros (ver _escribir)
+REGISTRO = np.dtype([  # 32 bytes por gasto
+    ("id", "<i8"),
+    ("monto", "<f8"),
+    ("fecha", "<i4"),  # ordinal (SIN_FECHA si es una fecha libre)
+    ("descripcion", "<u4"),  # código en la tabla de descripciones
+    ("categoria", "<u2"),  # código en la tabla de categorías
+    ("reservado", "V6"),  # relleno hasta 32 bytes
+])
+FILAS_POR_BLOQUE = 1 << 20  # registros que se arman por vez al escribir
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def es_libro_binario(ruta):  # True si la ruta corresponde a un libro binario
+    return os.path.splitext(ruta)[1].lower() == EXTENSION_BINARIA
+
+
+def _alinear(f):  # completa con ceros hasta múltiplo de 8 y devuelve la posición
+    posicion = f.tell()
+    if posicion % 8:
+        f.write(b"\x00" * (8 - posicion % 8))
+    return f.tell()
+
+
+def _escribir_textos(f, textos):  # escribe una tabla de textos y devuelve su posición
+    posicion = _alinear(f)
+    codificados = [str(t).encode("utf-8") for t in textos]  # textos en UTF-8
+    desplazamientos = np.zeros(len(codificados) + 1, dtype="<u8")  # inicio de cada texto
+    desplazamientos[1:] = np.cumsum(np.fromiter(map(len, codificados), dtype=np.uint64, count=len(codificados)))
+    f.write(desplazamientos.tobytes())
+    f.write(b"".join(codificados))
+    return posicion
+
+
+class TablaTextos:
+    """
+    Tabla de textos dentro del archivo mapeado. Cada texto se decodifica recién cuando
+    se lo pide, así abrir un libro con millones de descripciones no las lee todas.
+    """
+
+    def __init__(self, mapa, posicion, cantidad):  # tabla de `cantidad` textos en `posicion`
+        self._mapa = mapa  # archivo mapeado
+        self._desplazamientos = np.frombuffer(mapa, dtype="<u8", count=cantidad + 1, offset=posicion)
+        self._datos = posicion + 8 * (cantidad + 1)  # donde empiezan los textos
+
+    def __len__(self):
+        return self._desplazamientos.shape[0] - 1
+
+    def __getitem__(self, codigo):  # texto del código
+        if not 0 <= codigo < len(self):
+            raise IndexError(codigo)
+        inicio = self._datos + int(self._desplazamientos[codigo])
+        fin = self._datos + int(self._desplazamientos[codigo + 1])
+        return self._mapa[inicio:fin].decode("utf-8")
+
+    def __iter__(self):  # todos los textos, en orden de código
+        limites = (self._datos + self._desplazamientos).tolist()
+        return (self._mapa[a:b].decode("utf-8") for a, b in zip(limites, limites[1:]))
+
+
+# ------------------------------
+# Escritura
+# ------------------------------
+def columnas_de_pares(pares):  # arma las columnas del libro recorriendo pares (id, gasto)
+    ids, montos, fechas, cod_cat, cod_desc, libres = [], [], [], [], [], {}
+    categorias, descripciones = {}, {}  # texto -> código (en orden de aparición)
+    for fila, (id_gasto, g) in enumerate(pares):
+        ordinal = fecha_a_ordinal(str(g["fecha"]))  # fecha como número de día
+        if ordinal == SIN_FECHA:  # fecha libre: se guarda el texto
+            libres[fila] = str(g["fecha"])
+        ids.append(int(id_gasto))
+        montos.append(float(g["monto"]))
+        fechas.append(ordinal)
+        cod_cat.append(categorias.setdefault(str(g["categoria"]), len(categorias)))
+        cod_desc.append(descripciones.setdefault(str(g["descripcion"]), len(descripciones)))
+    return (np.array(ids, dtype=np.int64), np.array(montos, dtype=np.float64), np.array(fechas, dtype=np.int32),
+            np.array(cod_cat, dtype=np.uint16), np.array(cod_desc, dtype=np.uint32), libres,
+            list(categorias), list(descripciones))
+
+
+def escribir_binario(almacen, ruta, pares=None):  # escribe el libro binario con los gastos del almacén
+    """
+    Guarda los gastos del almacén en `ruta` con el formato binario. Si el almacén da sus
+    columnas (AlmacenGastos, LibroBinario) se copian vectorizadas; si no, se recorren los
+    pares (id, gasto) de `pares` o de almacen.items(). Devuelve la cantidad de gastos.
+    """
+    if hasattr(almacen, "columnas_registro"):  # almacén columnar: sin recorrer gasto por gasto
+        ids, montos, fechas, cod_cat, cod_desc, libres = almacen.columnas_registro()
+        categorias, descripciones = almacen.categorias, almacen.tabla_descripciones()
+    else:
+        ids, montos, fechas, cod_cat, cod_desc, libres, categorias, descripciones = \
+            columnas_de_pares(almacen.items() if pares is None else pares)
+    cantidad = ids.shape[0]
+    with open(ruta, "wb") as f:
+        f.write(b"\x00" * CABECERA.size)  # lugar para la cabecera (se escribe al final)
+        pos_registros = _alinear(f)
+        for inicio in range(0, cantidad, FILAS_POR_BLOQUE):  # registros de a bloques (acota la memoria)
+            fin = min(inicio + FILAS_POR_BLOQUE, cantidad)
+            bloque = np.zeros(fin - inicio, dtype=REGISTRO)
+            bloque["id"], bloque["monto"], bloque["fecha"] = ids[inicio:fin], montos[inicio:fin], fechas[inicio:fin]
+            bloque["descripcion"], bloque["categoria"] = cod_desc[inicio:fin], cod_cat[inicio:fin]
+            f.write(bloque.tobytes())
+        pos_categorias = _escribir_textos(f, categorias)
+        pos_descripciones = _escribir_textos(f, descripciones)
+        pos_fechas = _alinear(f)
+        f.write(np.array(sorted(libres), dtype="<i8").tobytes())  # posiciones con fecha libre
+        _escribir_textos(f, [libres[fila] for fila in sorted(libres)])  # y sus textos
+        proximo_id = getattr(almacen, "proximo_id", int(ids.max()) + 1 if cantidad else 1)
+        f.seek(0)
+        f.write(CABECERA.pack(FIRMA, VERSION, cantidad, proximo_id, pos_registros,
+                              pos_categorias, len(categorias), pos_descripciones, len(descripciones),
+                              pos_fechas, len(libres)))
+    return cantidad
+
+
+# ------------------------------
+# Lectura
+# ------------------------------
+class LibroBinario:
+    """
+    Libro binario abierto con mmap, de solo lectura. Se usa como el almacén para leer:
+    len(), keys(), values(), items(), obtener(id), gastos[id], columnas() y estadisticas().
+    columnas() devuelve vistas del archivo mapeado, así agregar_por_categoria y las
+    estadísticas corren sobre el archivo sin crear un diccionario por gasto.
+    Lanza ValueError si el archivo no es un libro binario de esta versión.
+    """
+
+    def __init__(self, ruta, formato_fecha=FORMATO_FECHA):  # abre y mapea el libro
+        self.ruta = ruta
+        self.formato_fecha = formato_fecha  # formato con el que se devuelven las fechas
+        with open(ruta, "rb") as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # sigue abierto al cerrar el archivo
+        if len(self._mapa) < CABECERA.size:
+            raise ValueError("El archivo no es un libro de gastos binario.")
+        (firma, version, cantidad, self.proximo_id, pos_registros, pos_categorias, n_categorias,
+         pos_descripciones, n_descripciones, pos_fechas, n_fechas) = CABECERA.unpack_from(self._mapa)
+        if firma != FIRMA:
+            raise ValueError("El archivo no es un libro de gastos binario.")
+        if version != VERSION:
+            raise ValueError(f"Versión de libro binario no soportada: {version}.")
+        self.registros = np.frombuffer(self._mapa, dtype=REGISTRO, count=cantidad, offset=pos_registros)  # sin copiar
+        self.categorias = list(TablaTextos(self._mapa, pos_categorias, n_categorias))  # son pocas
+        self._descripciones = TablaTextos(self._mapa, pos_descripciones, n_descripciones)  # se decodifican al pedirlas
+        filas = np.frombuffer(self._mapa, dtype="<i8", count=n_fechas, offset=pos_fechas)
+        self._fechas_texto = dict(zip(filas.tolist(), TablaTextos(self._mapa, pos_fechas + 8 * n_fechas, n_fechas)))
+        self._orden = None  # filas ordenadas por id (se arma al buscar el primer id)
+        self.version = 0  # no cambia: el libro es de solo lectura
+
+    def _leer_fila(self, fila):  # arma el diccionario del gasto de la fila
+        r = self.registros[fila]
+        ordinal = int(r["fecha"])
+        return {
+            "categoria": self.categorias[r["categoria"]],
+            "monto": float(r["monto"]),
+            "fecha": self._fechas_texto[fila] if ordinal == SIN_FECHA else ordinal_a_fecha(ordinal, self.formato_fecha),
+            "descripcion": self._descripciones[int(r["descripcion"])],
+        }
+
+    def _fila(self, id_gasto):  # fila del id, o None (búsqueda binaria sobre los ids ordenados)
+        try:
+            id_gasto = int(id_gasto)
+        except (TypeError, ValueError):
+            return None
+        ids = self.registros["id"]
+        if self._orden is None:
+            self._orden = np.argsort(ids, kind="stable")
+        i = int(np.searchsorted(ids[self._orden], id_gasto))
+        if i < self._orden.shape[0] and ids[self._orden[i]] == id_gasto:
+            return int(self._orden[i])
+        return None
+
+    def obtener(self, id_gasto):  # gasto como diccionario (o None si no existe)
+        fila = self._fila(id_gasto)
+        return None if fila is None else self._leer_fila(fila)
+
+    def __getitem__(self, id_gasto):  # gastos[id]
+        gasto = self.obtener(id_gasto)
+        if gasto is None:
+            raise KeyError(id_gasto)
+        return gasto
+
+    def __contains__(self, id_gasto):  # id in gastos
+        return self._fila(id_gasto) is not None
+
+    def __len__(self):
+        return self.registros.shape[0]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):  # ids en el orden del archivo
+        return self.registros["id"].tolist()
+
+    def values(self):  # gastos como diccionarios
+        for fila in range(len(self)):
+            yield self._leer_fila(fila)
+
+    def items(self):  # pares (id, gasto)
+        ids = self.registros["id"]
+        for fila in range(len(self)):
+            yield int(ids[fila]), self._leer_fila(fila)
+
+    def instantanea(self):  # el libro no cambia: sirve tal cual para exportar en segundo plano
+        return self
+
+    def cerrar(self):  # libera el mapeo (en Windows un archivo mapeado no se puede borrar)
+        """
+        Suelta las columnas y cierra el mapeo; el libro queda vacío. Lanza BufferError si
+        todavía hay vistas de columnas() en uso fuera del libro.
+        """
+        self.registros = np.empty(0, dtype=REGISTRO)
+        self._descripciones = self._orden = None
+        self._mapa.close()
+
+    def columnas(self):  # (codigos_categoria, montos, fechas) como vistas del archivo
+        return self.registros["categoria"], self.registros["monto"], self.registros["fecha"]
+
+    def columnas_registro(self):  # todas las columnas, como AlmacenGastos.columnas_registro()
+        r = self.registros
+        return r["id"], r["monto"], r["fecha"], r["categoria"], r["descripcion"], dict(self._fechas_texto)
+
+    def tabla_descripciones(self):  # textos de descripción, indexados por su código
+        return self._descripciones
+
+    # ---------- índices de consultas (ver Consultas_Gastos); el libro no cambia ----------
+    def filas_y_columnas(self):  # (filas, codigos_categoria, montos, fechas) de todo el libro
+        codigos, montos, fechas = self.columnas()
+        return np.arange(montos.shape[0], dtype=np.int64), codigos, montos, fechas
+
+    def valores_de_filas(self, filas):  # (activas, codigos_categoria, montos, fechas) de esas filas
+        r = self.registros[filas]
+        return np.ones(r.shape[0], dtype=bool), r["categoria"], r["monto"], r["fecha"]
+
+    def marca_indices(self):
+        return 0, len(self), 0
+
+    def filas_cambiadas(self, marca):  # nunca hay filas nuevas ni editadas
+        return np.empty(0, dtype=np.int64)
+
+    def ids_de_filas(self, filas):  # traduce posiciones de filas a ids
+        return self.registros["id"][filas].tolist()
+
+    def estadisticas(self):  # estadísticas acumuladas calculadas sobre las columnas mapeadas
+        codigos, montos, fechas = self.columnas()
+        return estadisticas_columnas(codigos, montos, self.categorias, fechas)
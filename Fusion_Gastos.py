@@ -0,0 +1,246 @@
+# Fusion_Gastos.py
+# Importación de varios archivos sin duplicados. Cada archivo (JSON, CSV, TXT o libro binario)
+# se lee con importar_a_almacen en un proceso del grupo y, en el orden en que se pidieron, se
+# compara contra el ledger y contra lo ya incorporado con una huella de contenido de 64 bits de
+# fecha + categoría + descripción + monto. Las huellas se guardan ordenadas (el índice): cada
+# archivo cuesta una búsqueda binaria vectorizada y una mezcla de dos tramos ordenados, nunca
+# una comparación de todos contra todos.
+# Un gasto que aparece k veces en un archivo y j veces en lo ya incorporado agrega max(0, k - j)
+# copias: importar dos veces el mismo archivo no agrega nada, pero dos cafés iguales del mismo
+# día en un archivo se conservan. Se informan como conflictos los gastos nuevos que coinciden
+# en fecha, categoría y descripción con uno existente pero tienen otro monto (se agregan igual).
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # cantidad de procesadores y nombres de archivo
+import multiprocessing  # lectura de los archivos en paralelo
+import numpy as np  # huellas y búsquedas vectorizadas
+
+from Fechas_Gastos import FORMATO_FECHA, ordinal_a_fecha  # fechas como números de día
+from Almacen_Gastos import AlmacenGastos  # gastos nuevos de la fusión
+from Formato_Binario import columnas_de_pares  # columnas de almacenes que no las tienen (base SQLite)
+from Importacion_Gastos import importar_a_almacen  # lectura de cada archivo
+from Agregacion_Gastos import estadisticas_columnas  # estadísticas de lo incorporado
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+MAXIMO_CONFLICTOS = 100  # conflictos que se detallan en el informe (los demás solo se cuentan)
+CONFLICTOS_EN_TEXTO = 10  # conflictos que muestra texto_informe
+SEMILLAS = (0x243F6A8885A308D3, 0x13198A2E03707344)  # dos huellas independientes: la segunda confirma la primera
+_MULTIPLICADORES = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))  # mezcla de splitmix64
+
+
+# ------------------------------
+# Huellas de contenido
+# ------------------------------
+def _mezclar(h):  # mezcla de splitmix64 sobre un arreglo uint64 (cada bit de entrada cambia toda la salida)
+    h = (h ^ (h >> np.uint64(30))) * _MULTIPLICADORES[0]
+    h = (h ^ (h >> np.uint64(27))) * _MULTIPLICADORES[1]
+    return h ^ (h >> np.uint64(31))
+
+
+def _huellas(claves, semilla):  # (huella completa, huella sin monto) de cada gasto
+    categoria, descripcion, fecha, centavos = (c.view(np.uint64) for c in claves)
+    h = _mezclar(categoria ^ np.uint64(semilla))
+    h = _mezclar(h ^ descripcion)
+    sin_monto = _mezclar(h ^ fecha)
+    return _mezclar(sin_monto ^ centavos), sin_monto
+
+
+def columnas_fusion(almacen):  # (ids, montos, fechas, cód. categoría, cód. descripción, fechas libres, categorías, descripciones)
+    """
+    Columnas de los gastos de cualquier almacén: las de columnas_registro() si las tiene
+    (AlmacenGastos, LibroBinario) o, si no, recorriendo sus pares (base SQLite).
+    """
+    if hasattr(almacen, "columnas_registro"):
+        return (*almacen.columnas_registro(), almacen.categorias, almacen.tabla_descripciones())
+    return columnas_de_pares(almacen.items())
+
+
+def _gasto(columnas, posicion, formato_fecha):  # diccionario del gasto en esa posición de las columnas
+    _, montos, fechas, cod_cat, cod_desc, libres, categorias, descripciones = columnas
+    fecha = libres[posicion] if posicion in libres else ordinal_a_fecha(int(fechas[posicion]), formato_fecha)
+    return {"fecha": fecha, "categoria": categorias[cod_cat[posicion]],
+            "descripcion": descripciones[cod_desc[posicion]], "monto": float(montos[posicion])}
+
+
+class IndiceHuellas:
+    """
+    Huellas de los gastos ya incorporados, ordenadas para buscarlas con searchsorted. Los
+    textos de categoría, descripción y fechas libres se traducen a números con un diccionario
+    común a todos los archivos (O(textos distintos)); el resto del cálculo es vectorizado.
+    Cada gasto tiene dos huellas independientes: la primera ordena y la segunda confirma
+    que una coincidencia no es una colisión.
+    """
+
+    def __init__(self):  # índice vacío
+        self._textos = {}  # texto -> número (el mismo en todos los archivos)
+        self.huellas = np.empty(0, dtype=np.uint64)  # huella de cada gasto, ordenadas
+        self.confirmacion = np.empty(0, dtype=np.uint64)  # segunda huella, en el mismo orden
+        self.parciales = np.empty(0, dtype=np.uint64)  # huella sin monto, ordenadas
+        self.origen = np.empty(0, dtype=np.int64)  # número de gasto de cada huella parcial (ver agregar)
+
+    def __len__(self):  # gastos en el índice
+        return self.huellas.size
+
+    def _numeros(self, textos):  # número de cada texto de una tabla
+        return np.fromiter((self._textos.setdefault(t, len(self._textos)) for t in textos), dtype=np.int64, count=len(textos))
+
+    def claves(self, columnas):  # (huella, confirmación, huella sin monto) de cada gasto de las columnas
+        _, montos, fechas, cod_cat, cod_desc, libres, categorias, descripciones = columnas
+        fechas = fechas.astype(np.int64)
+        if libres:  # fechas que no se pudieron interpretar: cuenta su texto
+            posiciones = np.fromiter(libres, dtype=np.int64, count=len(libres))
+            fechas[posiciones] = -1 - self._numeros([libres[p] for p in libres])
+        claves = (self._numeros(categorias)[cod_cat], self._numeros(descripciones)[cod_desc],
+                  fechas, np.rint(np.asarray(montos) * 100).astype(np.int64))  # montos en centavos
+        huellas, parciales = _huellas(claves, SEMILLAS[0])
+        return huellas, _huellas(claves, SEMILLAS[1])[0], parciales
+
+    def repetidos(self, huellas, confirmacion):  # (repetido, ya_estaba) de cada gasto de un archivo
+        """
+        Marca como repetido el k-ésimo gasto de un archivo con cierto contenido si en el
+        índice ya hay al menos k gastos con ese contenido. `ya_estaba` dice si hay al menos
+        uno, repetido o no.
+        """
+        n = huellas.size
+        if n == 0 or not len(self):
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        orden = np.argsort(huellas, kind="stable")
+        ordenadas = huellas[orden]
+        primero = np.concatenate(([True], ordenadas[1:] != ordenadas[:-1]))  # empieza un contenido nuevo
+        inicio_grupo = np.maximum.accumulate(np.where(primero, np.arange(n), 0))
+        rango = np.arange(n) - inicio_grupo  # iguales que hay antes en el mismo archivo
+        desde = np.searchsorted(self.huellas, ordenadas, side="left")  # consultas en orden: mucho más rápido
+        hasta = np.searchsorted(self.huellas, ordenadas, side="right")
+        pareja = np.minimum(desde + rango, len(self) - 1)  # el gasto del índice que le corresponde
+        repetido, ya_estaba = np.empty(n, dtype=bool), np.empty(n, dtype=bool)
+        repetido[orden] = (rango < hasta - desde) & (self.confirmacion[pareja] == confirmacion[orden])
+        ya_estaba[orden] = hasta > desde
+        return repetido, ya_estaba
+
+    def conflictos(self, parciales):  # número del gasto con la misma huella sin monto (o -1)
+        if not len(self):
+            return np.full(parciales.size, -1, dtype=np.int64)
+        desde = np.minimum(np.searchsorted(self.parciales, parciales), len(self) - 1)
+        return np.where(self.parciales[desde] == parciales, self.origen[desde], -1)
+
+    def agregar(self, huellas, confirmacion, parciales, origen):  # suma gastos al índice
+        """
+        Incorpora las huellas de gastos nuevos; `origen` es el número con el que conflictos()
+        los va a informar. El índice ya está ordenado, así que el orden estable (timsort)
+        solo ordena lo nuevo y mezcla los dos tramos.
+        """
+        todas = np.concatenate((self.huellas, huellas))
+        orden = np.argsort(todas, kind="stable")
+        self.huellas, self.confirmacion = todas[orden], np.concatenate((self.confirmacion, confirmacion))[orden]
+        todas = np.concatenate((self.parciales, parciales))
+        orden = np.argsort(todas, kind="stable")
+        self.parciales, self.origen = todas[orden], np.concatenate((self.origen, origen))[orden]
+
+
+# ------------------------------
+# Lectura en paralelo
+# ------------------------------
+def _leer(ruta, formato_fecha):  # (almacén, error) de un archivo
+    try:
+        return importar_a_almacen(ruta, formato_fecha)[0], None
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+
+def _leer_en_proceso(argumentos):  # cuerpo de cada trabajo del grupo
+    return _leer(*argumentos)
+
+
+def _lecturas(rutas, formato_fecha, procesos):  # (ruta, almacén, error) de cada archivo, en el orden pedido
+    if procesos == 1 or len(rutas) <= 1:
+        for ruta in rutas:
+            yield (ruta, *_leer(ruta, formato_fecha))
+        return
+    contexto = multiprocessing.get_context("spawn")  # procesos limpios, igual que Reportes_Gastos
+    with contexto.Pool(min(procesos, len(rutas))) as grupo:
+        for ruta, resultado in zip(rutas, grupo.imap(_leer_en_proceso, [(r, formato_fecha) for r in rutas])):
+            yield (ruta, *resultado)  # los siguientes se siguen leyendo mientras se fusiona este
+
+
+# ------------------------------
+# Fusión
+# ------------------------------
+def fusionar_archivos(rutas, existentes=None, formato_fecha=FORMATO_FECHA, procesos=None, tarea=None):  # importa sin duplicados
+    """
+    Lee los archivos de `rutas` (en paralelo, en `procesos` procesos; por defecto uno por
+    procesador) y junta en un AlmacenGastos nuevo los gastos que no estaban ni en
+    `existentes` (el ledger, cualquier almacén) ni en los archivos anteriores de la lista.
+    Devuelve (nuevo, estadisticas, informe), listos para sumarse al ledger de una vez, como
+    el resultado de importar_a_almacen. El informe trae, por archivo y en total, cuántos
+    gastos se leyeron, cuántos son nuevos, cuántos duplicados se omitieron y cuántos
+    conflictos hubo, más el detalle de los primeros MAXIMO_CONFLICTOS conflictos. Un archivo
+    que no se puede leer queda en el informe con su error y no detiene a los demás.
+    Acepta la tarea de Tareas_Gastos para correr en segundo plano.
+    """
+    rutas = list(rutas)
+    indice = IndiceHuellas()
+    columnas_existentes = None
+    if existentes is not None and len(existentes):
+        columnas_existentes = columnas_fusion(existentes)
+        indice.agregar(*indice.claves(columnas_existentes), np.arange(columnas_existentes[0].size))
+    base = len(indice)  # los números desde `base` son posiciones en `nuevo`
+    nuevo = AlmacenGastos(formato_fecha)
+    informe = {"archivos": [], "leidos": 0, "nuevos": 0, "duplicados": 0, "conflictos": 0, "detalle_conflictos": []}
+
+    def existente(numero):  # gasto ya incorporado con ese número de índice
+        if numero < base:
+            return dict(_gasto(columnas_existentes, numero, formato_fecha), id=int(columnas_existentes[0][numero]))
+        return nuevo.obtener(nuevo.ids_de_filas([numero - base])[0])
+
+    for i, (ruta, almacen, error) in enumerate(_lecturas(rutas, formato_fecha, max(1, procesos or os.cpu_count() or 1))):
+        if tarea is not None:
+            tarea.comprobar()  # se detiene si pidieron cancelar
+        archivo = {"ruta": ruta, "leidos": 0, "nuevos": 0, "duplicados": 0, "conflictos": 0, "error": error}
+        informe["archivos"].append(archivo)
+        if almacen is not None and len(almacen):
+            columnas = columnas_fusion(almacen)
+            huellas, confirmacion, parciales = indice.claves(columnas)
+            repetido, ya_estaba = indice.repetidos(huellas, confirmacion)
+            posiciones = np.flatnonzero(~repetido)  # gastos que se incorporan
+            conflicto = indice.conflictos(parciales[posiciones])
+            conflicto[ya_estaba[posiciones]] = -1  # hay uno igual: es otra copia, no un conflicto
+            for posicion, numero in zip(posiciones[conflicto >= 0].tolist(), conflicto[conflicto >= 0].tolist()):
+                if len(informe["detalle_conflictos"]) >= MAXIMO_CONFLICTOS:
+                    break
+                informe["detalle_conflictos"].append({"ruta": ruta, "gasto": _gasto(columnas, posicion, formato_fecha),
+                                                      "existente": existente(numero)})
+            indice.agregar(huellas[posiciones], confirmacion[posiciones], parciales[posiciones],
+                           base + len(nuevo) + np.arange(posiciones.size))
+            nuevo.absorber(almacen, posiciones)
+            archivo.update(leidos=len(almacen), nuevos=int(posiciones.size), duplicados=len(almacen) - int(posiciones.size),
+                           conflictos=int((conflicto >= 0).sum()))
+        for campo in ("leidos", "nuevos", "duplicados", "conflictos"):
+            informe[campo] += archivo[campo]
+        if tarea is not None:
+            tarea.informar((i + 1) / len(rutas), f"{i + 1} de {len(rutas)} archivos, {informe['nuevos']} gastos nuevos")
+    codigos, montos, fechas = nuevo.columnas()
+    return nuevo, estadisticas_columnas(codigos, montos, nuevo.categorias, fechas), informe
+
+
+def texto_informe(informe, conflictos=CONFLICTOS_EN_TEXTO):  # resumen del informe para mostrar
+    lineas = [f"{informe['nuevos']} gastos nuevos, {informe['duplicados']} duplicados omitidos, "
+              f"{informe['conflictos']} conflictos."]
+    for archivo in informe["archivos"]:
+        nombre = os.path.basename(archivo["ruta"])
+        if archivo["error"]:
+            lineas.append(f"❌ {nombre}: {archivo['error']}")
+        else:
+            lineas.append(f"📂 {nombre}: {archivo['leidos']} leídos, {archivo['nuevos']} nuevos, "
+                          f"{archivo['duplicados']} duplicados, {archivo['conflictos']} conflictos")
+    for c in informe["detalle_conflictos"][:conflictos]:
+        g, e = c["gasto"], c["existente"]
+        lineas.append(f"⚠️ {g['fecha']} {g['categoria']} '{g['descripcion']}': {g['monto']:.2f} "
+                      f"({os.path.basename(c['ruta'])}) y {e['monto']:.2f} (ya estaba)")
+    if informe["conflictos"] > conflictos:
+        lineas.append(f"... y {informe['conflictos'] - conflictos} conflictos más.")
+    return "\n".join(lineas)
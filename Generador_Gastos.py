@@ -0,0 +1,141 @@
+# Generador_Gastos.py
+# Generación de gastos de prueba en bloque: millones de gastos en una sola pasada de NumPy,
+# reproducibles con una semilla, directo a un almacén o a un archivo.
+
+# ------------------------------
+# Imports
+# ------------------------------
+from datetime import date  # para el día de hoy como ordinal
+import numpy as np  # generación vectorizada
+
+from Fechas_Gastos import FORMATO_FECHA, ordinal_a_fecha  # fechas como números de día
+from Almacen_Gastos import AlmacenGastos  # destino de la generación a archivo
+from Agregacion_Gastos import estadisticas_columnas  # estadísticas de lo generado
+from Exportacion_Gastos import exportar_gastos  # escritura en cualquiera de los formatos
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+DESCRIPCIONES = {  # categoría -> descripciones posibles (la tabla del programa de consola)
+    'Comida': ['Almuerzo en restaurante', 'Supermercado semanal', 'Café y postre', 'Cena a domicilio'],
+    'Transporte': ['Boleto de bus', 'Combustible', 'Pasaje de tren', 'Viaje en taxi'],
+    'Entretenimiento': ['Entrada de cine', 'Concierto', 'Videojuego', 'Streaming mensual'],
+    'Hogar': ['Factura de luz', 'Alquiler', 'Productos de limpieza', 'Reparación de grifo'],
+    'Salud': ['Consulta médica', 'Medicamentos', 'Suplementos vitamínicos', 'Gimnasio'],
+    'Compras': ['Ropa nueva', 'Electrónicos', 'Libro', 'Regalo de cumpleaños'],
+    'Otros': ['Regalo', 'Suscripción', 'Donación', 'Servicios varios'],
+}
+MONTO_MINIMO = 50  # rango de montos por defecto (el del programa de consola)
+MONTO_MAXIMO = 1000
+RANGO_DIAS = 90  # las fechas caen entre hoy y esta cantidad de días atrás
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _tabla_descripciones(descripciones):  # aplana la tabla categoría -> descripciones
+    """
+    Devuelve (categorias, textos, acumulados): la lista de categorías, todas las descripciones
+    seguidas y, para cada descripción, su probabilidad acumulada dentro de su categoría más el
+    número de la categoría. Así, con la categoría c y un número u en [0, 1), la descripción es
+    la primera con acumulado > c + u (una sola búsqueda binaria para todas las filas).
+    Cada categoría puede traer una lista (descripciones equiprobables) o un dict texto -> peso.
+    """
+    categorias, textos, acumulados = list(descripciones), [], []
+    for c, opciones in enumerate(descripciones.values()):
+        pesos = np.asarray(list(opciones.values()) if isinstance(opciones, dict) else [1.0] * len(opciones), dtype=np.float64)
+        if pesos.size == 0 or (pesos < 0).any() or pesos.sum() <= 0:
+            raise ValueError(f"La categoría {categorias[c]!r} no tiene descripciones con peso positivo.")
+        textos.extend(opciones)
+        acumulado = np.cumsum(pesos / pesos.sum())
+        acumulado[-1] = 1.0  # evita que el redondeo deje afuera a la última
+        acumulados.append(c + acumulado)
+    return categorias, textos, np.concatenate(acumulados)
+
+
+def _probabilidades(categorias, pesos_categoria):  # probabilidad de cada categoría (uniforme si no hay pesos)
+    if pesos_categoria is None:
+        return None
+    pesos = np.array([float(pesos_categoria.get(c, 0)) for c in categorias])
+    if (pesos < 0).any() or pesos.sum() <= 0:
+        raise ValueError("Los pesos de las categorías deben ser positivos.")
+    return pesos / pesos.sum()
+
+
+# ------------------------------
+# Generación
+# ------------------------------
+def generar_columnas(cantidad, semilla=None, descripciones=DESCRIPCIONES, pesos_categoria=None,
+                     monto_minimo=MONTO_MINIMO, monto_maximo=MONTO_MAXIMO, decimales=0,
+                     rango_dias=RANGO_DIAS, hasta=None):  # genera las columnas de `cantidad` gastos
+    """
+    Genera `cantidad` gastos con NumPy, sin un bucle en Python por gasto:
+      - categoría según `pesos_categoria` (dict categoría -> peso; uniforme si es None),
+      - descripción elegida dentro de la categoría según la tabla `descripciones`,
+      - monto uniforme entre monto_minimo y monto_maximo, redondeado a `decimales`,
+      - fecha uniforme entre `hasta` (date, por defecto hoy) y rango_dias días antes.
+    La misma semilla da siempre los mismos gastos. Devuelve las columnas en el orden de
+    AlmacenGastos.extender_columnas: (montos, fechas, categorias, codigos_categoria,
+    descripciones, codigos_descripcion), con las fechas como ordinales.
+    """
+    categorias, textos, acumulados = _tabla_descripciones(descripciones)
+    rng = np.random.default_rng(semilla)  # generador reproducible
+    codigos_categoria = rng.choice(len(categorias), size=cantidad, p=_probabilidades(categorias, pesos_categoria))
+    codigos_descripcion = np.searchsorted(acumulados, codigos_categoria + rng.random(cantidad), side="right")
+    if decimales == 0:  # montos enteros, incluido el máximo (como random.randint)
+        montos = rng.integers(monto_minimo, monto_maximo, cantidad, endpoint=True).astype(np.float64)
+    else:
+        montos = np.round(rng.uniform(monto_minimo, monto_maximo, cantidad), decimales)
+    hoy = (hasta or date.today()).toordinal()
+    fechas = (hoy - rng.integers(0, rango_dias, cantidad, endpoint=True)).astype(np.int32)
+    return montos, fechas, categorias, codigos_categoria, textos, codigos_descripcion
+
+
+def estadisticas_generadas(columnas):  # estadísticas acumuladas de unas columnas generadas
+    montos, fechas, categorias, codigos_categoria, _, _ = columnas
+    return estadisticas_columnas(codigos_categoria, montos, categorias, fechas)
+
+
+def generar_en_almacen(almacen, cantidad, **opciones):  # agrega `cantidad` gastos generados al almacén
+    """
+    Genera los gastos (ver generar_columnas, que recibe las `opciones`) y los agrega al
+    almacén. Con un AlmacenGastos se copian las columnas de una vez; con otro almacén
+    (por ejemplo AlmacenSQLite) se arman los diccionarios y se agregan con extender().
+    Devuelve (ids, estadisticas) de lo generado, para sumarlas a las del programa.
+    """
+    columnas = generar_columnas(cantidad, **opciones)
+    if hasattr(almacen, "extender_columnas"):  # almacén columnar
+        ids = almacen.extender_columnas(*columnas)
+    else:
+        montos, fechas, categorias, codigos_categoria, textos, codigos_descripcion = columnas
+        unicas, posicion = np.unique(fechas, return_inverse=True)  # cada fecha distinta se formatea una vez
+        formato = getattr(almacen, "formato_fecha", FORMATO_FECHA)
+        textos_fecha = [ordinal_a_fecha(int(o), formato) for o in unicas]
+        ids = almacen.extender([
+            {"categoria": categorias[c], "monto": m, "fecha": textos_fecha[f], "descripcion": textos[d]}
+            for c, m, f, d in zip(codigos_categoria.tolist(), montos.tolist(), posicion.tolist(), codigos_descripcion.tolist())
+        ])
+    return ids, estadisticas_generadas(columnas)
+
+
+def generar_almacen(cantidad, formato_fecha=FORMATO_FECHA, tarea=None, **opciones):  # genera los gastos en un almacén nuevo
+    """
+    Genera los gastos en un AlmacenGastos nuevo y devuelve (almacen, estadisticas), igual
+    que importar_a_almacen, así la interfaz los suma de la misma forma. Acepta la tarea de
+    Tareas_Gastos para correr en segundo plano.
+    """
+    almacen = AlmacenGastos(formato_fecha, capacidad=max(cantidad, 1))  # reserva lugar una vez
+    _, estadisticas = generar_en_almacen(almacen, cantidad, **opciones)
+    if tarea is not None:
+        tarea.informar(1.0, f"{cantidad} gastos generados")
+    return almacen, estadisticas
+
+
+def generar_archivo(ruta, cantidad, formato_fecha=FORMATO_FECHA, **opciones):  # escribe `cantidad` gastos generados en un archivo
+    """
+    Genera los gastos y los guarda en `ruta` con exportar_gastos (el formato sale de la
+    extensión: .json, .csv, .txt, .db o .gbin). Devuelve la ruta escrita.
+    """
+    almacen, _ = generar_almacen(cantidad, formato_fecha, **opciones)
+    return exportar_gastos(almacen, ruta)
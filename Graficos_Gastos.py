@@ -0,0 +1,300 @@
+# Graficos_Gastos.py
+# Gráficos sin ventana: dibuja las figuras de la interfaz con matplotlib puro (backend Agg, sin
+# Tkinter ni pyplot) y las entrega como PNG, SVG o PDF. Lo ya dibujado queda en una caché por
+# tipo de gráfico y versión de los datos: un ledger que no cambió no se vuelve a dibujar.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import io  # la imagen se arma en memoria
+import os  # rutas de la caché en disco
+import hashlib  # huella del contenido (caché en disco compartida entre procesos)
+import itertools  # fichas únicas por almacén
+import threading  # la caché se puede usar desde varios hilos
+import weakref  # la ficha de un almacén desaparece con él
+from collections import OrderedDict  # caché en memoria con descarte del más viejo
+from matplotlib.figure import Figure  # figura sin pyplot (no abre ventanas ni usa Tkinter)
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # dibujo en memoria
+from matplotlib.artist import setp  # rotación de etiquetas sin pyplot
+import numpy as np  # columnas de los gastos
+
+from Agregacion_Gastos import crear_estadisticas, estadisticas_columnas, resumen_incremental, serie  # datos de los gráficos
+from Rollups_Gastos import serie_temporal, tendencia_por_categoria, etiqueta_periodo  # totales por período
+from Cuantiles_Gastos import total_cuantiles, caja, histograma  # boxplot e histograma desde las cubetas
+from Consultas_Gastos import IndiceConsultas, clave_filtro  # gráficos de los gastos que cumplen un filtro
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+TIPOS = ("boxplot", "histograma", "barras", "pie", "todos", "mensual", "tendencia")  # gráficos disponibles (los de la interfaz)
+MINIMO_MESES_TENDENCIA = 4  # con menos meses, la tendencia por categoría se muestra por semana
+FORMATOS = ("png", "svg", "pdf")  # formatos de salida
+TAMANO_FIGURA = (10, 6)  # pulgadas, igual que la ventana de la interfaz
+DPI = 100  # resolución por defecto de las imágenes
+CAPACIDAD_CACHE = 64  # imágenes que se guardan en memoria
+
+
+# ------------------------------
+# Dibujo
+# ------------------------------
+def dibujar_figura(fig, tipo, gastos, estadisticas):  # dibuja el gráfico `tipo` en la figura y la devuelve
+    """
+    Dibuja en `fig` el gráfico pedido (uno de TIPOS). Todo sale de las estadísticas
+    incrementales: las sumas por categoría y por período, y el boxplot y el histograma de
+    las cubetas de cuantiles, así que no se leen los montos. Lo usan la interfaz (figura de
+    pyplot, con ventana) y crear_figura (figura sin ventana).
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de gráfico desconocido: {tipo!r} (se espera uno de {', '.join(TIPOS)}).")
+    if not len(gastos):  # sin datos se dibuja un mensaje simple
+        ax = fig.add_subplot(111)
+        ax.text(0.5, 0.5, "Sin datos", ha="center", va="center")
+        return fig
+    totals = serie(resumen_incremental(estadisticas), "suma")  # categoria->suma, sin recorrer los gastos
+    if tipo in ("boxplot", "histograma", "todos"):  # distribución de todos los montos, desde las cubetas
+        total = total_cuantiles(estadisticas)
+    if tipo == "boxplot":
+        ax = fig.add_subplot(111)
+        ax.bxp([caja(total)], patch_artist=True, showmeans=True)
+        ax.set_title("Boxplot de montos")
+    elif tipo == "histograma":
+        ax = fig.add_subplot(111)
+        cantidades, bordes = histograma(total)
+        ax.hist(bordes[:-1], bins=bordes, weights=cantidades)  # una barra por tramo, ya contada
+        ax.set_title("Histograma de montos")
+    elif tipo == "barras":
+        ax = fig.add_subplot(111)
+        ax.bar(list(totals.keys()), list(totals.values()))
+        ax.set_title("Monto total por categoría")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
+    elif tipo == "pie":
+        ax = fig.add_subplot(111)
+        ax.pie(list(totals.values()), labels=list(totals.keys()), autopct="%1.1f%%", startangle=140)
+        ax.set_title("Proporción de gasto por categoría")
+    elif tipo == "mensual":
+        ax = fig.add_subplot(111)
+        meses, totales_mes = serie_temporal(estadisticas, "mes")  # O(meses)
+        ax.bar([etiqueta_periodo(m, "mes") for m in meses], totales_mes)
+        ax.set_title("Monto total por mes")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
+    elif tipo == "tendencia":
+        ax = fig.add_subplot(111)
+        periodo = "mes" if len(serie_temporal(estadisticas, "mes")[0]) >= MINIMO_MESES_TENDENCIA else "semana"
+        inicios, series = tendencia_por_categoria(estadisticas, periodo)  # O(períodos x categorías)
+        etiquetas = [etiqueta_periodo(i, periodo) for i in inicios]
+        for cat, valores in series.items():
+            ax.plot(etiquetas, valores, marker="o", label=cat)
+        ax.set_title("Gasto por categoría " + ("por mes" if periodo == "mes" else "por semana"))
+        ax.legend(fontsize="small")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
+    else:  # 'todos': 2x2 con los 4 gráficos
+        axs = fig.subplots(2, 2)
+        axs[0, 0].bxp([caja(total)], patch_artist=True, showmeans=True)
+        axs[0, 0].set_title("Boxplot de montos")
+        cantidades, bordes = histograma(total)
+        axs[0, 1].hist(bordes[:-1], bins=bordes, weights=cantidades)
+        axs[0, 1].set_title("Histograma de montos")
+        axs[1, 0].bar(list(totals.keys()), list(totals.values()))
+        axs[1, 0].set_title("Monto total por categoría")
+        setp(axs[1, 0].get_xticklabels(), rotation=45, ha="right")
+        axs[1, 1].pie(list(totals.values()), labels=list(totals.keys()), autopct="%1.1f%%", startangle=140)
+        axs[1, 1].set_title("Proporción por categoría")
+    fig.tight_layout()
+    return fig
+
+
+def estadisticas_de(gastos):  # estadísticas acumuladas de cualquier almacén
+    """
+    Calcula las estadísticas por categoría: la base SQLite y el libro binario las agrupan
+    ellos mismos, un almacén columnar se resume sobre sus columnas y cualquier otra
+    colección se recorre con crear_estadisticas.
+    """
+    if not hasattr(gastos, "estadisticas") and hasattr(gastos, "columnas"):
+        codigos, montos, fechas = gastos.columnas()
+        return estadisticas_columnas(codigos, montos, gastos.categorias, fechas)
+    return crear_estadisticas(gastos)
+
+
+def crear_figura(tipo, gastos, estadisticas=None, filtro=None, consultas=None):  # figura sin ventana del gráfico pedido
+    """
+    Arma la figura con el lienzo Agg (no necesita pantalla). Si no se pasan las
+    estadísticas, se calculan con estadisticas_de. Con un `filtro` (ver
+    Consultas_Gastos.crear_filtro) se dibujan solo los gastos que lo cumplen, tomados de
+    los índices ordenados de `consultas` (un IndiceConsultas del almacén; si no se pasa,
+    se arma uno).
+    """
+    if filtro is not None:
+        seleccion = (consultas or IndiceConsultas(gastos)).seleccion(filtro)
+        gastos, estadisticas = seleccion, seleccion.estadisticas()
+    fig = Figure(figsize=TAMANO_FIGURA)
+    FigureCanvasAgg(fig)  # lienzo en memoria
+    return dibujar_figura(fig, tipo, gastos, estadisticas if estadisticas is not None else estadisticas_de(gastos))
+
+
+def renderizar_figura(fig, formato="png", dpi=DPI):  # bytes de la figura en el formato pedido
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de imagen no soportado: {formato!r} (se espera uno de {', '.join(FORMATOS)}).")
+    salida = io.BytesIO()
+    fig.savefig(salida, format=formato, dpi=dpi)
+    return salida.getvalue()
+
+
+def huella_contenido(gastos):  # resumen del contenido de los gastos (igual en cualquier proceso)
+    """
+    Devuelve un hash de las columnas (categorías, montos y fechas) y de los nombres de las
+    categorías. Dos almacenes con los mismos gastos dan la misma huella, aunque se hayan
+    cargado en procesos distintos; sirve de clave para la caché en disco.
+    """
+    codigos, montos, fechas = gastos.columnas()
+    h = hashlib.blake2b(digest_size=16)
+    for columna in (codigos, montos, fechas):
+        h.update(np.ascontiguousarray(columna).tobytes())
+    h.update("\x00".join(gastos.categorias).encode("utf-8"))
+    return h.hexdigest()
+
+
+# ------------------------------
+# Servicio con caché
+# ------------------------------
+class ServicioGraficos:
+    """
+    Entrega gráficos como bytes (PNG, SVG o PDF) y los recuerda por (tipo, formato, dpi,
+    almacén, versión, filtro): mientras el almacén no cambie, pedir el mismo gráfico no lo
+    vuelve a dibujar. Con `carpeta`, las imágenes también se guardan en disco con la huella del
+    contenido en el nombre, así otro proceso (o la próxima corrida de un trabajo por lotes)
+    las encuentra sin dibujar.
+    Los almacenes sin `version` (por ejemplo, un dict) se dibujan siempre.
+    """
+
+    def __init__(self, carpeta=None, capacidad=CAPACIDAD_CACHE):
+        self.carpeta = carpeta  # caché en disco (opcional)
+        self.capacidad = capacidad  # imágenes en memoria
+        self.aciertos = 0  # pedidos servidos desde la caché
+        self.dibujos = 0  # pedidos que hubo que dibujar
+        self._imagenes = OrderedDict()  # clave -> bytes (la más usada al final)
+        self._derivados = OrderedDict()  # sello -> {"estadisticas": ..., "huella": ...}
+        self._fichas = weakref.WeakKeyDictionary()  # almacén -> ficha única
+        self._consultas = weakref.WeakKeyDictionary()  # almacén -> IndiceConsultas (filtros por rango)
+        self._contador = itertools.count(1)  # próxima ficha
+        self._cerrojo = threading.Lock()
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+    def _sello(self, gastos):  # (ficha, versión) del almacén, o None si no se puede saber si cambió
+        version = getattr(gastos, "version", None)
+        if version is None:
+            return None
+        try:
+            with self._cerrojo:
+                ficha = self._fichas.get(gastos)
+                if ficha is None:
+                    ficha = self._fichas[gastos] = next(self._contador)
+        except TypeError:  # no admite referencias débiles
+            return None
+        return ficha, version, len(gastos)
+
+    def _recordar(self, cache, clave, valor, capacidad):  # guarda en una caché con descarte del más viejo
+        with self._cerrojo:
+            cache[clave] = valor
+            cache.move_to_end(clave)
+            while len(cache) > capacidad:
+                cache.popitem(last=False)
+
+    def _derivado(self, gastos, sello, campo, calcular):  # estadísticas o huella, calculadas una vez por versión
+        if sello is None:
+            return calcular(gastos)
+        with self._cerrojo:
+            derivados = self._derivados.get(sello)
+            if derivados is not None and campo in derivados:
+                return derivados[campo]
+        valor = calcular(gastos)
+        with self._cerrojo:
+            self._derivados.setdefault(sello, {})[campo] = valor
+            self._derivados.move_to_end(sello)
+            while len(self._derivados) > self.capacidad:
+                self._derivados.popitem(last=False)
+        return valor
+
+    def _indice_consultas(self, gastos):  # un IndiceConsultas por almacén (sus índices se reutilizan)
+        try:
+            with self._cerrojo:
+                consultas = self._consultas.get(gastos)
+                if consultas is None:
+                    consultas = self._consultas[gastos] = IndiceConsultas(gastos)
+            return consultas
+        except TypeError:  # no admite referencias débiles
+            return IndiceConsultas(gastos)
+
+    def renderizar(self, gastos, tipo, formato="png", estadisticas=None, dpi=DPI, filtro=None):  # bytes del gráfico
+        """
+        Devuelve la imagen del gráfico `tipo` en `formato`. `estadisticas` son las
+        incrementales del programa, si las tiene al día; si no, se calculan una vez por
+        versión del almacén. Con un `filtro` se dibujan solo los gastos que lo cumplen
+        (las estadísticas pasadas se ignoran: se calculan sobre la selección).
+        """
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de gráfico desconocido: {tipo!r} (se espera uno de {', '.join(TIPOS)}).")
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de imagen no soportado: {formato!r} (se espera uno de {', '.join(FORMATOS)}).")
+        sello = self._sello(gastos)
+        filtro_clave = clave_filtro(filtro)
+        clave = (tipo, formato, dpi, sello, filtro_clave)
+        if sello is not None:
+            with self._cerrojo:
+                imagen = self._imagenes.get(clave)
+                if imagen is not None:
+                    self._imagenes.move_to_end(clave)
+                    self.aciertos += 1
+                    return imagen
+        ruta = None
+        if self.carpeta and sello is not None:  # caché en disco, por contenido
+            huella = self._derivado(gastos, sello, "huella", huella_contenido)
+            if filtro is not None:  # la huella del filtro va en el nombre
+                huella += "-" + hashlib.blake2b(repr(filtro_clave).encode("utf-8"), digest_size=8).hexdigest()
+            ruta = os.path.join(self.carpeta, f"{tipo}-{dpi}-{huella}.{formato}")
+            if os.path.exists(ruta):
+                with open(ruta, "rb") as f:
+                    imagen = f.read()
+                self._recordar(self._imagenes, clave, imagen, self.capacidad)
+                self.aciertos += 1
+                return imagen
+        if filtro is not None:  # selección y sus estadísticas, una vez por versión y filtro
+            seleccion = self._derivado(gastos, sello, ("seleccion", filtro_clave),
+                                       lambda g: self._indice_consultas(g).seleccion(filtro))
+            dibujados, estadisticas = seleccion, self._derivado(gastos, sello, ("estadisticas", filtro_clave),
+                                                                lambda g: seleccion.estadisticas())
+        else:
+            dibujados = gastos
+            if estadisticas is None:
+                estadisticas = self._derivado(gastos, sello, "estadisticas", estadisticas_de)
+        imagen = renderizar_figura(crear_figura(tipo, dibujados, estadisticas), formato, dpi)
+        self.dibujos += 1
+        if ruta:
+            temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"  # escritura atómica
+            with open(temporal, "wb") as f:
+                f.write(imagen)
+            os.replace(temporal, ruta)
+        if sello is not None:
+            self._recordar(self._imagenes, clave, imagen, self.capacidad)
+        return imagen
+
+    def guardar(self, gastos, tipo, ruta, estadisticas=None, dpi=DPI, filtro=None):  # escribe el gráfico; el formato sale de la extensión
+        formato = os.path.splitext(ruta)[1].lower().lstrip(".")
+        imagen = self.renderizar(gastos, tipo, formato, estadisticas, dpi, filtro)
+        with open(ruta, "wb") as f:
+            f.write(imagen)
+        return ruta
+
+    def tablero(self, gastos, carpeta, formato="png", estadisticas=None, dpi=DPI, tipos=TIPOS, filtro=None):  # todos los gráficos en una carpeta
+        """
+        Escribe un archivo por tipo de gráfico (`carpeta`/<tipo>.<formato>) y devuelve las rutas.
+        """
+        os.makedirs(carpeta, exist_ok=True)
+        return [self.guardar(gastos, tipo, os.path.join(carpeta, f"{tipo}.{formato}"), estadisticas, dpi, filtro)
+                for tipo in tipos]
+
+    def vaciar(self):  # olvida lo guardado en memoria (la carpeta queda)
+        with self._cerrojo:
+            self._imagenes.clear()
+            self._derivados.clear()
@@ -0,0 +1,342 @@
+# Importacion_Gastos.py
+# Importación de gastos por lotes y en streaming: el archivo se lee de a pedazos y los
+# registros válidos se entregan en lotes de tamaño fijo, sin cargar todo en memoria.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # para extensiones y tamaño del archivo
+import csv  # para leer CSV fila por fila
+import json  # para decodificar JSON de a un registro
+
+import io  # para pasar un bloque de texto a csv.reader
+import operator  # para contar comas por línea sin un bucle en Python
+import numpy as np  # columnas del CSV como arreglos
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, parsear_fecha, fecha_a_ordinal, hoy_str  # normalización de fechas
+from Almacen_Gastos import AlmacenGastos  # destino de la importación en segundo plano
+from Agregacion_Gastos import estadistica_agregar, estadisticas_columnas  # estadísticas de lo importado
+from Formato_Binario import LibroBinario, es_libro_binario  # libro binario mapeado
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+TAMANO_LOTE = 10000  # registros válidos por lote
+TAMANO_BLOQUE = 1 << 16  # caracteres que se leen por vez en los JSON (64 KiB)
+EXTENSIONES = (".json", ".csv", ".txt")  # formatos soportados
+TAMANO_BLOQUE_CSV = 1 << 23  # caracteres que procesa por vez la carga columnar de CSV (8 Mi)
+CAMPOS_CSV = ("fecha", "categoria", "descripcion", "monto")  # columnas que necesita la carga columnar
+_contar_comas = operator.methodcaller("count", ",")  # comas de una línea
+
+
+# ------------------------------
+# Validación de un registro
+# ------------------------------
+def validar_registro(item, formato_fecha=FORMATO_FECHA):  # convierte un registro crudo en gasto válido
+    """
+    Devuelve el gasto normalizado (fecha, categoria, descripcion, monto con 2 decimales)
+    o None si el registro no es válido. Los campos ausentes toman los mismos valores por
+    defecto que antes: fecha de hoy, categoría 'Otros', descripción vacía y monto 0.
+    """
+    try:
+        fecha_texto = item["fecha"] if "fecha" in item else hoy_str(formato_fecha)  # sin fecha: hoy
+        fecha = parsear_fecha(str(fecha_texto), formato_fecha)  # fecha normalizada
+        categoria = str(item.get("categoria", "Otros"))  # categoría
+        descripcion = str(item.get("descripcion", ""))  # descripción
+        monto = float(item.get("monto", 0))  # monto
+    except (AttributeError, TypeError, ValueError):
+        return None  # registro inválido
+    return {"fecha": fecha, "categoria": categoria, "descripcion": descripcion, "monto": round(monto, 2)}
+
+
+# ------------------------------
+# Lectores en streaming (devuelven registros crudos)
+# ------------------------------
+class _LectorJSON:
+    """
+    Decodifica un JSON de a un valor por vez, leyendo el archivo en bloques.
+    Mantiene en memoria solo el bloque actual, no el archivo completo.
+    """
+
+    def __init__(self, archivo):  # archivo abierto en modo texto
+        self.archivo = archivo  # archivo fuente
+        self.buffer = ""  # texto leído y todavía no consumido
+        self.pos = 0  # posición actual dentro del buffer
+        self.fin = False  # True cuando ya no queda nada por leer
+        self.decoder = json.JSONDecoder()  # decodificador reutilizable
+
+    def _leer_mas(self):  # agrega otro bloque al buffer; False si se terminó el archivo
+        bloque = self.archivo.read(TAMANO_BLOQUE)  # siguiente bloque
+        if not bloque:  # fin de archivo
+            self.fin = True
+            return False
+        self.buffer = self.buffer[self.pos:] + bloque  # descarta lo consumido y suma lo nuevo
+        self.pos = 0  # el buffer empieza en lo no consumido
+        return True
+
+    def siguiente_caracter(self, saltear=" \t\r\n"):  # devuelve el próximo carácter significativo sin consumirlo
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in saltear:
+                self.pos += 1  # saltea espacios (y comas, si se pide)
+            if self.pos < len(self.buffer):  # hay un carácter disponible
+                return self.buffer[self.pos]
+            if not self._leer_mas():  # no hay más datos
+                return ""
+
+    def consumir(self, caracter):  # consume el carácter esperado o lanza error
+        if self.siguiente_caracter() != caracter:
+            raise ValueError(f"JSON inválido: se esperaba '{caracter}'.")
+        self.pos += 1
+
+    def valor(self):  # decodifica y devuelve el próximo valor JSON completo
+        self.siguiente_caracter()  # saltea espacios
+        while True:
+            try:
+                objeto, fin = self.decoder.raw_decode(self.buffer, self.pos)  # intenta decodificar
+                if fin < len(self.buffer) or self.fin:  # el valor no quedó cortado por el bloque
+                    self.pos = fin  # avanza
+                    return objeto
+            except json.JSONDecodeError:
+                if self.fin:  # no hay más datos: el JSON está mal formado
+                    raise ValueError("JSON inválido o incompleto.")
+            if not self._leer_mas():  # el valor quedó cortado: lee más y reintenta
+                continue  # con fin=True el próximo intento decide
+
+
+def _registros_json(archivo):  # recorre los registros de un JSON (lista o dict id -> gasto)
+    lector = _LectorJSON(archivo)  # decodificador por bloques
+    apertura = lector.siguiente_caracter()  # '[' o '{'
+    if apertura == "[":  # lista de gastos
+        lector.consumir("[")
+        while lector.siguiente_caracter(" \t\r\n,") not in ("]", ""):  # hasta el cierre
+            yield lector.valor()  # un gasto por vez
+    elif apertura == "{":  # diccionario id -> gasto (o un único gasto suelto)
+        lector.consumir("{")
+        while lector.siguiente_caracter(" \t\r\n,") not in ("}", ""):  # hasta el cierre
+            lector.valor()  # id del gasto (se descarta: el almacén asigna los ids)
+            lector.consumir(":")
+            valor = lector.valor()  # datos del gasto
+            if not isinstance(valor, dict):  # no es id -> gasto: el JSON es un único gasto
+                archivo.seek(0)  # vuelve al principio
+                yield json.load(archivo)  # un solo registro (es chico)
+                return
+            yield valor
+    else:
+        raise ValueError("JSON no contiene una lista de gastos.")
+
+
+def _registros_txt(archivo):  # TXT: líneas JSON (como lo guarda la interfaz) o texto con columnas
+    posicion = archivo.tell()  # inicio del archivo
+    primera = archivo.readline()  # mira la primera línea
+    while primera and not primera.strip():  # saltea líneas vacías iniciales
+        primera = archivo.readline()
+    archivo.seek(posicion)  # vuelve al inicio
+    if primera.lstrip().startswith("{"):  # una línea JSON por gasto
+        for linea in archivo:
+            if linea.strip():  # ignora líneas vacías
+                try:
+                    yield json.loads(linea)  # un gasto por línea
+                except json.JSONDecodeError:
+                    continue  # línea inválida
+    else:  # texto con columnas, igual que un CSV
+        yield from csv.DictReader(archivo)
+
+
+def leer_registros(archivo, ext):  # elige el lector según la extensión
+    if ext == ".json":
+        return _registros_json(archivo)
+    if ext == ".csv":
+        return csv.DictReader(archivo)  # fila por fila
+    if ext == ".txt":
+        return _registros_txt(archivo)
+    raise ValueError("Formato no soportado (usar .json .csv .txt).")  # extensión no soportada
+
+
+# ------------------------------
+# Importación por lotes
+# ------------------------------
+def importar_en_lotes(ruta, tamano_lote=TAMANO_LOTE, formato_fecha=FORMATO_FECHA):  # genera lotes de gastos válidos
+    """
+    Lee el archivo en streaming y entrega tuplas (lote, progreso), donde `lote` es una lista
+    de hasta `tamano_lote` gastos válidos y `progreso` la fracción del archivo leída (0 a 1).
+    Los registros inválidos se ignoran. La memoria usada depende del lote, no del archivo.
+    """
+    ext = os.path.splitext(ruta)[1].lower()  # extensión
+    if ext not in EXTENSIONES:  # se valida antes de abrir
+        raise ValueError("Formato no soportado (usar .json .csv .txt).")
+    total = os.path.getsize(ruta) or 1  # tamaño en bytes (evita dividir por cero)
+    with open(ruta, "r", encoding="utf-8", newline="") as f:  # abre en modo texto
+        lote = []  # lote en construcción
+        for item in leer_registros(f, ext):  # un registro crudo por vez
+            gasto = validar_registro(item, formato_fecha)  # valida y normaliza
+            if gasto is None:
+                continue  # ignora registros inválidos
+            lote.append(gasto)
+            if len(lote) >= tamano_lote:  # lote completo
+                yield lote, min(f.buffer.tell() / total, 1.0)  # entrega el lote con el avance
+                lote = []  # empieza otro
+        if lote:  # último lote incompleto
+            yield lote, 1.0
+
+
+# ------------------------------
+# Carga columnar de CSV (fecha,categoria,descripcion,monto)
+# ------------------------------
+def _factorizar(valores):  # textos distintos (en orden de aparición) y el código de cada valor
+    unicos = list(dict.fromkeys(valores))  # distintos, en orden de aparición
+    codigos = {v: i for i, v in enumerate(unicos)}  # texto -> código
+    inversa = np.fromiter(map(codigos.__getitem__, valores), dtype=np.int64, count=len(valores))  # código de cada valor
+    return unicos, inversa
+
+
+def _montos(valores):  # columna de montos como float64 y máscara de los que son números
+    try:
+        montos = np.array(valores, dtype=np.float64)  # conversión de toda la columna
+        validos = np.ones(len(valores), dtype=bool)
+    except ValueError:  # hay algún monto inválido: se convierte uno por uno
+        montos = np.zeros(len(valores), dtype=np.float64)
+        validos = np.zeros(len(valores), dtype=bool)
+        for i, v in enumerate(valores):
+            try:
+                montos[i] = float(v)
+                validos[i] = True
+            except ValueError:
+                pass  # queda marcado como inválido
+    redondeados = np.round(montos, 2)  # casi todos ya tienen 2 decimales
+    distintos = np.flatnonzero(redondeados != montos)  # los que hay que redondear
+    redondeados[distintos] = [round(m, 2) for m in montos[distintos].tolist()]  # mismo redondeo que round()
+    return redondeados, validos
+
+
+def _columnas_bloque(texto, relleno):  # separa un bloque de líneas del CSV en columnas
+    """
+    Si el bloque no tiene comillas y todas sus líneas tienen la misma cantidad de comas,
+    lo separa con str.split y toma cada columna con un slice (todo en C). Si no, usa
+    csv.reader, completando o recortando las filas como DictReader. Devuelve None si
+    el bloque no tiene filas.
+    """
+    ancho = len(relleno)  # columnas del encabezado
+    if '"' not in texto and "\r" not in texto:  # camino rápido: CSV simple
+        lineas = texto.split("\n")  # una línea por fila
+        if lineas[-1] == "":  # el bloque termina en salto de línea
+            lineas.pop()
+        if set(map(_contar_comas, lineas)) == {ancho - 1}:  # todas las filas completas
+            campos = ",".join(lineas).split(",")  # todos los campos seguidos
+            return [campos[i::ancho] for i in range(ancho)]  # una lista por columna
+    filas = [f[:ancho] + relleno[len(f):] for f in csv.reader(io.StringIO(texto)) if f]  # camino general
+    return list(zip(*filas)) if filas else None
+
+
+def _cargar_bloque_csv(almacen, columnas, posiciones):  # agrega al almacén las filas válidas de un bloque
+    fechas_texto, codigos_fecha = _factorizar(columnas[posiciones["fecha"]])  # pocas fechas distintas
+    ordinales = np.array([fecha_a_ordinal(f) for f in fechas_texto], dtype=np.int32)[codigos_fecha]  # una interpretación por fecha distinta
+    montos, validos = _montos(columnas[posiciones["monto"]])
+    validos &= ordinales != SIN_FECHA  # descarta fechas inválidas, como validar_registro
+    categorias, codigos_cat = _factorizar(columnas[posiciones["categoria"]])
+    descripciones, codigos_desc = _factorizar(columnas[posiciones["descripcion"]])
+    if not validos.all():  # se quedan solo las filas válidas
+        montos, ordinales = montos[validos], ordinales[validos]
+        codigos_cat, codigos_desc = codigos_cat[validos], codigos_desc[validos]
+    almacen.extender_columnas(montos, ordinales, categorias, codigos_cat, descripciones, codigos_desc)
+    return int(montos.size)
+
+
+def _bloques_de_lineas(archivo, tamano):  # lee el archivo en bloques que terminan en fin de línea
+    while True:
+        bloque = archivo.read(tamano)  # siguiente bloque
+        if not bloque:
+            return
+        bloque += archivo.readline()  # completa la última línea
+        while bloque.count('"') % 2:  # quedó abierto un campo entre comillas con saltos de línea
+            linea = archivo.readline()
+            if not linea:
+                break
+            bloque += linea
+        yield bloque
+
+
+def cargar_csv_columnar(ruta, formato_fecha=FORMATO_FECHA, tamano_bloque=TAMANO_BLOQUE_CSV, tarea=None):  # carga un CSV por columnas
+    """
+    Carga un CSV con columnas fecha, categoria, descripcion y monto directamente a un
+    AlmacenGastos nuevo, de a bloques de texto: cada bloque se separa en columnas, las
+    fechas y los textos se interpretan una sola vez por valor distinto y los montos se
+    convierten con NumPy. Acepta y descarta los mismos registros que importar_en_lotes.
+    Devuelve None si el encabezado no tiene esas columnas.
+    """
+    total = os.path.getsize(ruta) or 1  # tamaño en bytes (evita dividir por cero)
+    with open(ruta, "r", encoding="utf-8", newline="") as f:
+        encabezado = next(csv.reader([f.readline()]), None)  # nombres de las columnas
+        if encabezado is None or not set(CAMPOS_CSV) <= set(encabezado):  # no es el formato esperado
+            return None
+        posiciones = {campo: encabezado.index(campo) for campo in CAMPOS_CSV}  # columna de cada campo
+        relleno = ["" if c in ("fecha", "monto") else "None" for c in encabezado]  # campos faltantes: fecha/monto inválidos, textos 'None'
+        almacen = AlmacenGastos(formato_fecha)  # almacén destino
+        for bloque in _bloques_de_lineas(f, tamano_bloque):
+            if tarea is not None:
+                tarea.comprobar()  # se detiene si pidieron cancelar
+            columnas = _columnas_bloque(bloque, relleno)  # columnas del bloque
+            if columnas is not None:
+                _cargar_bloque_csv(almacen, columnas, posiciones)
+            if tarea is not None:
+                tarea.informar(min(f.buffer.tell() / total, 1.0), f"{len(almacen)} gastos leídos")  # informa el avance
+    return almacen
+
+
+# ------------------------------
+# Carga del libro binario
+# ------------------------------
+def cargar_binario(ruta, formato_fecha=FORMATO_FECHA, tarea=None):  # carga un libro binario a un almacén nuevo
+    """
+    Copia las columnas del libro binario (mapeado con mmap) a un AlmacenGastos nuevo con
+    un solo extender_columnas; en Python solo se recorre cada texto distinto. Las fechas
+    que no se pudieron interpretar se descartan, igual que en los otros formatos.
+    """
+    libro = LibroBinario(ruta, formato_fecha)  # solo lee cabecera y categorías
+    try:
+        if tarea is not None:
+            tarea.informar(0.0, f"{len(libro)} gastos en el archivo")
+        return _copiar_libro(libro, formato_fecha)
+    finally:
+        libro.cerrar()  # ya no hacen falta las vistas del archivo: se libera el mapeo
+
+
+def _copiar_libro(libro, formato_fecha):  # AlmacenGastos con las columnas del libro (las vistas mueren acá)
+    _, montos, fechas, codigos_cat, codigos_desc, _ = libro.columnas_registro()
+    validos = fechas != SIN_FECHA  # descarta fechas inválidas, como validar_registro
+    almacen = AlmacenGastos(formato_fecha, capacidad=max(int(validos.sum()), 1))  # reserva lugar una vez
+    almacen.extender_columnas(montos[validos], fechas[validos], libro.categorias, codigos_cat[validos],
+                              libro.tabla_descripciones(), codigos_desc[validos])
+    return almacen
+
+
+def _estadisticas(almacen):  # estadísticas de un almacén columnar (por categoría y período)
+    codigos, montos, fechas = almacen.columnas()
+    return estadisticas_columnas(codigos, montos, almacen.categorias, fechas)
+
+
+def importar_a_almacen(ruta, formato_fecha=FORMATO_FECHA, tarea=None):  # importa el archivo a un almacén nuevo
+    """
+    Importa el archivo completo a un AlmacenGastos nuevo y calcula sus estadísticas.
+    Pensada para correr en segundo plano (ver Tareas_Gastos): informa el avance y se
+    detiene entre lotes si se pidió cancelar. Devuelve (almacen, estadisticas), listos
+    para sumarse de una sola vez a los datos de la interfaz.
+    """
+    if es_libro_binario(ruta):  # libro binario: copia de columnas
+        almacen = cargar_binario(ruta, formato_fecha, tarea)
+        return almacen, _estadisticas(almacen)
+    if os.path.splitext(ruta)[1].lower() == ".csv":  # CSV: carga por columnas si tiene el formato esperado
+        almacen = cargar_csv_columnar(ruta, formato_fecha, tarea=tarea)
+        if almacen is not None:
+            return almacen, _estadisticas(almacen)
+    almacen = AlmacenGastos(formato_fecha)  # almacén propio de la tarea
+    estadisticas = {}  # estadísticas de lo importado
+    for lote, progreso in importar_en_lotes(ruta, formato_fecha=formato_fecha):  # lote por lote
+        if tarea is not None:
+            tarea.comprobar()  # se detiene si pidieron cancelar
+        almacen.extender(lote)  # agrega el lote
+        for g in lote:
+            estadistica_agregar(estadisticas, g)  # acumula sus estadísticas
+        if tarea is not None:
+            tarea.informar(progreso, f"{len(almacen)} gastos leídos")  # informa el avance
+    return almacen, estadisticas
@@ -6,27 +6,44 @@
 # ------------------------------
 import os  # para manejo de rutas y extensiones
 import sys  # para terminar el programa con sys.exit()
-import json  # para leer/escribir archivos JSON
-import csv  # para leer/escribir archivos CSV/TXT
-import random  # para generar gastos simulados
 from datetime import datetime  # para manejo de fechas y formateo
-import uuid  # para generar IDs únicos por gasto
 import tkinter as tk  # interfaz gráfica principal (Tk)
 from tkinter import ttk, messagebox, filedialog, simpledialog  # widgets y diálogos de Tkinter
 from tkcalendar import DateEntry, Calendar  # componente calendario para seleccionar fechas
 import matplotlib.pyplot as plt  # para generar gráficos en ventanas separadas
-from datetime import datetime, date, timedelta
+from Agregacion_Gastos import crear_estadisticas, estadistica_agregar, estadistica_quitar, estadistica_reemplazar, estadisticas_combinar  # estadísticas por categoría mantenidas en cada cambio
+from Almacen_Gastos import AlmacenGastos  # almacén de gastos por columnas (ids numéricos, campos en arreglos NumPy)
+from Busqueda_Gastos import IndiceBusqueda, normalizar  # búsqueda indexada por categoría/descripción
+from Almacen_SQLite import AlmacenSQLite, BusquedaSQLite, es_base_sqlite  # base SQLite como almacén alternativo
+from Importacion_Gastos import importar_en_lotes  # importación en streaming por lotes (JSON/CSV/TXT)
+from Fusion_Gastos import fusionar_archivos, texto_informe  # importación de varios archivos sin duplicados
+from Exportacion_Gastos import exportar_gastos  # escritura a JSON/CSV/TXT/SQLite/binario en archivo temporal
+from Generador_Gastos import generar_almacen, DESCRIPCIONES  # gastos simulados generados en bloque y sus descripciones por categoría
+from Graficos_Gastos import dibujar_figura, TAMANO_FIGURA  # dibujo de los gráficos, compartido con el servicio sin ventana
+from Tareas_Gastos import TareaSegundoPlano, seguir_tarea  # importar/guardar en otro hilo sin bloquear la ventana
+from Consultas_Gastos import crear_filtro, cumple_filtro  # filtros por rango de fechas, montos y categoría (índices ordenados)
 
 
 # ------------------------------
 # Configuración y variables globales
 # ------------------------------
 FORMATO_FECHA = "%d/%m/%Y"  # formato de fecha dd/mm/aaaa usado en todo el programa
-gastos = []  # lista que almacenará los gastos como diccionarios
+gastos = AlmacenGastos(FORMATO_FECHA)  # almacén por columnas con los gastos (id -> gasto)
+indice_busqueda = IndiceBusqueda(gastos)  # índice de trigramas para el buscador
+estadisticas = {}  # estadísticas por categoría (cantidad, suma, mín, máx) actualizadas en cada alta/edición/baja
 categorias = ["Comida", "Transporte", "Entretenimiento", "Hogar", "Salud", "Compras", "Otros"]  # categorías por defecto
 archivo_actual = None  # ruta del archivo actualmente asociado (si el usuario importó o guardó)
 root = None  # referencia a la ventana principal (se asigna luego)
 tree = None  # referencia al Treeview de la tabla de gastos (se asigna luego)
+TAMANO_PAGINA = 200  # filas que se insertan en el Treeview por vez (el resto se carga al desplazarse)
+filtro_actual = ""  # texto de búsqueda aplicado a la tabla (en minúsculas)
+filtro_consulta = None  # filtro por fechas, montos y categoría (crear_filtro) aplicado a la tabla y a los gráficos
+filas_visibles = []  # ids de los gastos que coinciden con el filtro, en orden
+filas_cargadas = 0  # posición en filas_visibles hasta donde ya se insertó en el Treeview
+MAXIMO_GENERAR = 10_000_000  # tope de gastos simulados por vez (se generan todos juntos con NumPy)
+DESCRIPCIONES_SIMULADAS = ["Compra", "Servicio", "Suscripción", "Regalo", "Varios"]  # descripciones de categorías que no están en DESCRIPCIONES
+RETARDO_BUSQUEDA_MS = 150  # espera tras la última tecla antes de buscar (debounce)
+busqueda_pendiente = None  # id del after() de la búsqueda programada (para cancelarla)
 
 # ------------------------------
 # Utilidades: formateo y validaciones
@@ -43,95 +60,115 @@ def validar_monto(monto_str):  # valida y convierte un string a float positivo c
         raise ValueError("El monto debe ser mayor o igual a 0.")  # error si es negativo
     return round(m, 2)  # devuelve monto redondeado a 2 decimales
 
-def parsear_fecha(fecha_texto):  # intenta parsear varias formas comunes de fecha y devuelve dd/mm/aaaa
-    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):  # formatos aceptados
-        try:
-            d = datetime.strptime(fecha_texto, fmt)  # intenta parsear
-            return d.strftime(FORMATO_FECHA)  # devuelve en formato deseado
-        except Exception:
-            continue  # prueba el siguiente formato si falla
-    raise ValueError("Formato de fecha inválido. Usá dd/mm/aaaa.")  # si todos fallan, lanza error
-
-def generar_id():  # genera un id único para cada gasto
-    return str(uuid.uuid4())  # usa UUID4 convertido a string
-
 # ------------------------------
 # Funciones I/O: importar y exportar gastos
 # ------------------------------
-def importar_gastos_ruta(ruta):  # importa desde ruta, soporta JSON/CSV/TXT
-    ext = os.path.splitext(ruta)[1].lower()  # obtiene extensión del archivo
-    lista = []  # lista temporal para almacenar registros importados
-    if ext == ".json":  # si es JSON
-        with open(ruta, "r", encoding="utf-8") as f:  # abre archivo en modo lectura
-            data = json.load(f)  # carga JSON
-        if isinstance(data, dict):  # si JSON es dict (posible id->registro)
-            try:
-                # intenta ordenar por clave numérica si aplica
-                sorted_items = sorted(((int(k), v) for k, v in data.items()), key=lambda x: x[0])
-                data = [v for _, v in sorted_items]  # convierte a lista ordenada
-            except Exception:
-                # si no son claves numéricas, lo tratamos como dict simple -> un elemento
-                data = [data]
-        if not isinstance(data, list):  # si no es lista ahora, error
-            raise ValueError("JSON no contiene una lista de gastos.")
-        for item in data:  # itera cada item esperado
-            try:
-                fecha = parsear_fecha(str(item.get("fecha", ahora_str())))  # parsea fecha
-                categoria = str(item.get("categoria", "Otros"))  # obtiene categoría
-                descripcion = str(item.get("descripcion", ""))  # obtiene descripción
-                monto = float(item.get("monto", 0))  # obtiene monto
-                lista.append({"id": generar_id(), "fecha": fecha, "categoria": categoria, "descripcion": descripcion, "monto": round(monto, 2)})  # agrega registro con id
-            except Exception:
-                continue  # si falla un registro, lo ignora
-    elif ext in (".csv", ".txt"):  # si es CSV o TXT (esperamos columnas)
-        with open(ruta, "r", encoding="utf-8", newline="") as f:  # abre archivo
-            reader = csv.DictReader(f)  # usa DictReader para leer por nombre de columnas
-            for row in reader:  # itera cada fila
-                try:
-                    fecha = parsear_fecha(row.get("fecha", ahora_str()))  # parsea fecha
-                    categoria = row.get("categoria", "Otros")  # categoría
-                    descripcion = row.get("descripcion", "")  # descripcion
-                    monto = float(row.get("monto", 0))  # monto
-                    lista.append({"id": generar_id(), "fecha": fecha, "categoria": categoria, "descripcion": descripcion, "monto": round(monto, 2)})  # agrega
-                except Exception:
-                    continue  # ignora filas inválidas
-    else:
-        raise ValueError("Formato no soportado (usar .json .csv .txt).")  # extensión no soportada
-    return lista  # devuelve lista de registros válidos
+def importar_gastos_ruta(ruta):  # importa desde ruta, soporta JSON/CSV/TXT (devuelve todo en una lista)
+    return [g for lote, _ in importar_en_lotes(ruta) for g in lote]  # junta los lotes del importador en streaming
+
+def ejecutar_con_progreso(titulo, tarea, al_terminar, titulo_error):  # corre la tarea en segundo plano con barra de progreso y botón cancelar
+    win = tk.Toplevel(root)  # ventana de progreso (no modal: la principal sigue respondiendo)
+    win.title(titulo)  # título
+    win.transient(root)  # asociada a la principal
+    barra = ttk.Progressbar(win, length=320, maximum=100)  # barra de 0 a 100
+    barra.pack(padx=12, pady=(12,4))  # empaqueta
+    estado = ttk.Label(win, text="")  # texto de avance
+    estado.pack(padx=12, pady=4)  # empaqueta
+    ttk.Button(win, text="Cancelar", command=tarea.cancelar).pack(pady=(4,12))  # pide cancelar la tarea
+    def progreso(fraccion, texto):  # llega desde la cola, ya en el hilo de Tkinter
+        barra["value"] = fraccion * 100  # avanza la barra
+        estado.config(text=texto)  # actualiza el texto
+    def terminar(resultado):  # la tarea terminó bien
+        win.destroy()  # cierra la ventana de progreso
+        al_terminar(resultado)  # aplica el resultado
+    def fallar(error):  # la tarea lanzó un error
+        win.destroy()
+        messagebox.showerror(titulo_error, str(error))  # muestra error
+    def cancelada():  # el usuario canceló: no se aplicó ningún cambio
+        win.destroy()
+        messagebox.showinfo(titulo, "Operación cancelada.")
+    seguir_tarea(root, tarea.iniciar(), progreso, terminar, fallar, cancelada)  # arranca y revisa la cola con root.after
+
+def sobre_instantanea(funcion):  # cuerpo de tarea que trabaja sobre una copia de los gastos
+    copia = gastos.instantanea()  # se toma acá, en el hilo de Tkinter; se puede seguir editando
+    def cuerpo(*args, tarea):  # corre en el hilo de la tarea: funcion(copia, *args, tarea=tarea)
+        try:
+            return funcion(copia, *args, tarea=tarea)
+        finally:  # también si falla o se cancela
+            if isinstance(copia, AlmacenSQLite):
+                copia.cerrar()  # cierra la conexión y borra la base temporal
+    return cuerpo
+
+def incorporar_gastos(nuevo, estad):  # suma de una vez un almacén importado o generado
+    gastos.absorber(nuevo)  # agrega todos sus gastos (asigna ids)
+    estadisticas_combinar(estadisticas, estad)  # suma sus estadísticas
+    for c in nuevo.categorias:  # categorías nuevas
+        if c not in categorias:
+            categorias.append(c)
+    refrescar_tabla()  # refresca la tabla en la UI
+
+def importar_en_segundo_plano(rutas):  # importa uno o más archivos sin bloquear la interfaz ni duplicar gastos
+    def al_terminar(resultado):  # se suma todo de una vez, en el hilo de Tkinter
+        global archivo_actual  # variable global
+        nuevo, estad, informe = resultado  # almacén y estadísticas de lo nuevo, y el informe de la fusión
+        if not informe["leidos"]:  # si no se leyó nada
+            messagebox.showwarning("Importar", "No se encontraron registros válidos.\n" + texto_informe(informe))  # aviso
+            return  # sale
+        if len(nuevo):  # puede que todo estuviera ya cargado
+            incorporar_gastos(nuevo, estad)  # agrega los gastos y refresca la tabla
+        if len(rutas) == 1:  # con un solo archivo, guardar vuelve a ese archivo
+            archivo_actual = rutas[0]  # actualiza archivo actual
+        messagebox.showinfo("Importar", texto_informe(informe))  # nuevos, duplicados omitidos y conflictos
+    # lectura en paralelo, validación y comparación contra una copia de los gastos, en otro hilo
+    tarea = TareaSegundoPlano(sobre_instantanea(lambda copia, tarea: fusionar_archivos(rutas, copia, FORMATO_FECHA, tarea=tarea)))
+    ejecutar_con_progreso("Importando...", tarea, al_terminar, "Error al importar")
+
+def abrir_base(ruta):  # trabaja directamente sobre una base SQLite, sin cargarla en memoria
+    global gastos, indice_busqueda, estadisticas, archivo_actual  # se reemplaza el almacén
+    gastos = AlmacenSQLite(ruta, FORMATO_FECHA)  # abre (o crea) la base
+    indice_busqueda = BusquedaSQLite(gastos)  # la búsqueda la resuelve la base
+    estadisticas = crear_estadisticas(gastos)  # GROUP BY en la base
+    for c in gastos.categorias:  # categorías de la base
+        if c not in categorias:
+            categorias.append(c)
+    archivo_actual = ruta  # guardar confirma en esta base
+    refrescar_tabla()  # muestra la primera página
+    messagebox.showinfo("Abrir base", f"Base abierta con {len(gastos)} gastos:\n{ruta}")  # confirma
+
+def abrir_archivo(ruta):  # importa un JSON/CSV/TXT/binario o abre una base SQLite
+    if not es_base_sqlite(ruta):
+        importar_en_segundo_plano([ruta])  # importa sin bloquear la ventana
+    elif not len(gastos) or messagebox.askyesno("Abrir base", "Los gastos en memoria se reemplazan por los de la base.\n¿Continuar?"):
+        abrir_base(ruta)
 
 def importar_gastos_dialogo():  # abre diálogo para importar y agrega a la lista principal
-    global gastos, archivo_actual, categorias  # declara variables globales que modificaremos
-    ruta = filedialog.askopenfilename(title="Importar gastos (JSON/CSV/TXT)", filetypes=[("JSON/CSV/TXT","*.json *.csv *.txt"),("All files","*.*")])  # diálogo
-    if not ruta:  # si usuario canceló
+    rutas = filedialog.askopenfilenames(title="Importar gastos (JSON/CSV/TXT/binario) o abrir base SQLite", filetypes=[("JSON/CSV/TXT/Binario/SQLite","*.json *.csv *.txt *.gbin *.db *.sqlite *.sqlite3"),("All files","*.*")])  # diálogo (admite varios)
+    if not rutas:  # si usuario canceló
         return  # no hace nada
-    try:
-        nuevos = importar_gastos_ruta(ruta)  # intenta importar desde la ruta
-        if not nuevos:  # si no se importó nada
-            messagebox.showwarning("Importar", "No se encontraron registros válidos en el archivo.")  # aviso
-            return  # sale
-        gastos.extend(nuevos)  # agrega los nuevos registros a la lista principal
-        # actualizar categorías con las nuevas encontradas
-        for c in {g["categoria"] for g in nuevos}:
-            if c not in categorias:
-                categorias.append(c)
+    if len(rutas) == 1:  # un solo archivo: puede ser una base
+        abrir_archivo(rutas[0])  # importa o abre la base
+    else:
+        importar_en_segundo_plano(list(rutas))  # varios archivos: se fusionan sin duplicados
+
+def guardar_en_segundo_plano(ruta):  # guarda una copia de los gastos sin bloquear la interfaz
+    def al_terminar(_):  # el archivo ya quedó escrito
+        global archivo_actual  # variable global
         archivo_actual = ruta  # actualiza archivo actual
-        refrescar_tabla()  # refresca la tabla en la UI
-        messagebox.showinfo("Importar", f"Se importaron {len(nuevos)} gastos desde:\n{ruta}")  # confirma
-    except Exception as e:
-        messagebox.showerror("Error al importar", str(e))  # muestra error si falla
+        messagebox.showinfo("Guardado", f"Gastos guardados en:\n{ruta}")  # confirma
+    if isinstance(gastos, AlmacenSQLite) and os.path.abspath(ruta) == os.path.abspath(gastos.ruta):  # la base abierta
+        gastos.confirmar()  # guardar = confirmar los cambios pendientes
+        al_terminar(None)
+        return
+    tarea = TareaSegundoPlano(sobre_instantanea(exportar_gastos), ruta)  # escribe una copia: se puede seguir editando
+    ejecutar_con_progreso("Guardando...", tarea, al_terminar, "Error al guardar")
 
 def guardar_gastos_dialogo():  # diálogo para guardar: si hay archivo_actual pregunta, o permite crear nuevo
-    global archivo_actual  # variable global
     if archivo_actual:  # si existe un archivo asociado
         resp = messagebox.askyesnocancel("Guardar", f"¿Deseás guardar en el archivo actual?\n{archivo_actual}")  # pregunta sí/no/cancel
         if resp is None:  # cancelar
             return  # salir
         if resp:  # elegir guardar en archivo actual
-            ok, err = guardar_en_ruta(archivo_actual)  # intenta guardar
-            if not ok:
-                messagebox.showerror("Error al guardar", err)  # muestra error si falla
-            else:
-                messagebox.showinfo("Guardado", f"Gastos guardados en:\n{archivo_actual}")  # confirma
+            guardar_en_segundo_plano(archivo_actual)  # guarda sin bloquear
             return  # sale
     # si llega acá, usuario quiere guardar en nuevo archivo o no había archivo actual
     # abrir ventana modal para elegir formato antes de abrir el explorador
@@ -141,7 +178,7 @@ def guardar_gastos_dialogo():  # diálogo para guardar: si hay archivo_actual pr
     win.grab_set()  # bloquea interacción con ventana principal
     ttk.Label(win, text="Elegí formato:").pack(padx=12, pady=8)  # etiqueta
     var = tk.StringVar(value="json")  # variable para combobox
-    cb = ttk.Combobox(win, textvariable=var, values=["json", "csv", "txt"], state="readonly")  # combobox de formatos
+    cb = ttk.Combobox(win, textvariable=var, values=["json", "csv", "txt", "gbin", "db"], state="readonly")  # combobox de formatos
     cb.pack(padx=12, pady=6)  # empaqueta
     def confirmar():  # al confirmar
         fmt = var.get()  # obtiene formato
@@ -153,39 +190,24 @@ def guardar_gastos_dialogo():  # diálogo para guardar: si hay archivo_actual pr
         elif fmt == "csv":
             ext = ".csv"
             filetypes = [("CSV", "*.csv")]
+        elif fmt == "gbin":
+            ext = ".gbin"
+            filetypes = [("Libro binario", "*.gbin")]
+        elif fmt == "db":
+            ext = ".db"
+            filetypes = [("SQLite", "*.db *.sqlite *.sqlite3")]
         else:
             ext = ".txt"
             filetypes = [("TXT", "*.txt")]
         ruta = filedialog.asksaveasfilename(defaultextension=ext, filetypes=filetypes, title="Guardar gastos")  # abre explorador con el tipo correcto
         if ruta:
-            ok, err = guardar_en_ruta(ruta)  # guarda
-            if ok:
-                messagebox.showinfo("Guardado", f"Gastos guardados en:\n{ruta}")  # confirma
-                archivo_actual = ruta  # actualiza archivo actual
-            else:
-                messagebox.showerror("Error al guardar", err)  # error
+            guardar_en_segundo_plano(ruta)  # guarda sin bloquear (actualiza archivo actual al terminar)
     ttk.Button(win, text="Confirmar", command=confirmar).pack(pady=8)  # botón confirmar
     ttk.Button(win, text="Cancelar", command=win.destroy).pack(pady=(0,12))  # botón cancelar
 
-def guardar_en_ruta(ruta):  # escribe gastos en la ruta con formato según extensión
+def guardar_en_ruta(ruta):  # escribe gastos en la ruta con formato según extensión (sin hilo, devuelve (ok, error))
     try:
-        ext = os.path.splitext(ruta)[1].lower()  # obtiene extensión
-        if ext == ".json":  # json
-            with open(ruta, "w", encoding="utf-8") as f:
-                json.dump(gastos, f, indent=4, ensure_ascii=False)  # volcar lista como JSON
-        elif ext == ".csv":  # csv
-            with open(ruta, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "fecha", "categoria", "descripcion", "monto"])  # incluye id
-                writer.writeheader()  # escribe cabecera
-                for g in gastos:
-                    writer.writerow(g)  # escribe fila por fila
-        elif ext == ".txt":  # txt -> guardamos cada gasto como línea JSON para robustez
-            with open(ruta, "w", encoding="utf-8") as f:
-                for g in gastos:
-                    f.write(json.dumps(g, ensure_ascii=False) + "\n")  # una línea JSON por gasto
-        else:
-            # si la extensión no es reconocida, lanzar error
-            raise ValueError("Extensión no soportada para guardar.")
+        exportar_gastos(gastos, ruta)  # JSON/CSV/TXT/SQLite/binario según la extensión
         return True, None  # éxito
     except Exception as e:
         return False, str(e)  # devuelve error
@@ -193,17 +215,92 @@ def guardar_en_ruta(ruta):  # escribe gastos en la ruta con formato según exten
 # ------------------------------
 # CRUD: crear, editar, eliminar, buscar dinámico y refrescar UI
 # ------------------------------
-def refrescar_tabla(filtro_texto=""):  # refresca la vista de la tabla filtrando por categoría/descripcion
-    global tree  # referencia al Treeview
-    # borra todas las filas actuales
-    for item in tree.get_children():
-        tree.delete(item)
-    # inserta solo los registros que coinciden con el filtro si existe
-    texto = filtro_texto.strip().lower()  # texto de filtro en lower
-    for g in gastos:
-        if not texto or (texto in g["categoria"].lower() or texto in g["descripcion"].lower()):
-            # usa el id como iid del tree para poder encontrar registros de manera estable
-            tree.insert("", tk.END, iid=g["id"], values=(g["fecha"], g["categoria"], g["descripcion"], f"${g['monto']:.2f}"))  # inserta fila
+def valores_fila(g):  # arma los valores que muestra el Treeview para un gasto
+    return (g["fecha"], g["categoria"], g["descripcion"], f"${g['monto']:.2f}")  # fecha, categoría, descripción, monto
+
+def coincide_filtro(g, texto):  # True si el gasto coincide con el texto de búsqueda (ya normalizado) y con el filtro por rango
+    if not cumple_filtro(g, filtro_consulta):  # fuera del rango de fechas o montos, o de otra categoría
+        return False
+    return not texto or texto in normalizar(g["categoria"]) or texto in normalizar(g["descripcion"])  # busca en categoría y descripción
+
+def refrescar_tabla(filtro_texto=None):  # refresca la vista de la tabla filtrando por categoría/descripcion
+    global filtro_actual, filas_visibles, filas_cargadas  # estado de la tabla virtualizada
+    if filtro_texto is not None:  # si llega un filtro nuevo lo guarda; si no, mantiene el actual
+        filtro_actual = normalizar(filtro_texto.strip())  # texto de filtro en minúsculas y sin tildes
+    tree.delete(*tree.get_children())  # borra todas las filas actuales en una sola llamada
+    # guarda solo los ids que coinciden (los resuelve el índice); las filas se insertan de a páginas
+    filas_visibles = indice_busqueda.buscar(filtro_actual, filtro_consulta)
+    filas_cargadas = 0  # todavía no se insertó ninguna
+    cargar_mas_filas()  # inserta la primera página
+
+def cargar_mas_filas():  # inserta en el Treeview la siguiente página de filas
+    global filas_cargadas  # posición de carga
+    hasta = min(filas_cargadas + TAMANO_PAGINA, len(filas_visibles))  # fin de la página
+    for id_gasto in filas_visibles[filas_cargadas:hasta]:
+        g = gastos.obtener(id_gasto)  # datos actuales del gasto (None si se eliminó)
+        iid = str(id_gasto)  # usa el id como iid del tree para poder encontrar registros de manera estable
+        if g is None or not coincide_filtro(g, filtro_actual) or tree.exists(iid):
+            continue  # se eliminó, se editó y ya no coincide, o ya está en la tabla
+        tree.insert("", tk.END, iid=iid, values=valores_fila(g))  # inserta fila
+    filas_cargadas = hasta  # avanza la posición de carga
+
+def programar_busqueda(texto):  # programa la búsqueda para cuando el usuario deje de tipear
+    global busqueda_pendiente  # búsqueda programada
+    if busqueda_pendiente is not None:  # había una búsqueda esperando
+        root.after_cancel(busqueda_pendiente)  # la cancela: quedó vieja
+    busqueda_pendiente = root.after(RETARDO_BUSQUEDA_MS, lambda: ejecutar_busqueda(texto))  # programa la nueva
+
+def aplicar_filtro_consulta(desde, hasta, monto_minimo, monto_maximo, categoria):  # filtra la tabla por rango
+    global filtro_consulta  # filtro aplicado
+    try:
+        filtro = crear_filtro(desde.strip() or None, hasta.strip() or None, monto_minimo.strip() or None,
+                              monto_maximo.strip() or None, None if categoria in ("", "Todas") else categoria)  # valida los campos
+    except ValueError as e:
+        messagebox.showerror("Filtro", str(e))  # muestra el dato inválido
+        return
+    filtro_consulta = filtro  # None si todos los campos están vacíos
+    refrescar_tabla()  # los índices ordenados resuelven el rango; la búsqueda por texto se mantiene
+
+def limpiar_filtro_consulta():  # quita el filtro por rango
+    global filtro_consulta  # filtro aplicado
+    if filtro_consulta is not None:  # había un filtro
+        filtro_consulta = None
+        refrescar_tabla()  # vuelve a mostrar todos los que coinciden con el texto
+
+def ejecutar_busqueda(texto):  # corre la búsqueda programada
+    global busqueda_pendiente  # búsqueda programada
+    busqueda_pendiente = None  # ya no hay nada pendiente
+    if normalizar(texto.strip()) == filtro_actual:  # el filtro no cambió (p. ej. se movió el cursor)
+        return  # no hace falta redibujar
+    refrescar_tabla(texto)  # filtra con el índice y muestra la primera página
+
+def al_desplazar_tabla(ultimo):  # se llama cuando cambia la parte visible del Treeview
+    if float(ultimo) > 0.9 and filas_cargadas < len(filas_visibles):  # cerca del final y quedan filas
+        cargar_mas_filas()  # agrega otra página
+
+def insertar_fila(id_gasto, g):  # agrega a la tabla un gasto recién creado sin redibujar el resto
+    global filas_cargadas  # posición de carga
+    if not coincide_filtro(g, filtro_actual):  # no coincide con la búsqueda actual
+        return  # no se muestra
+    filas_visibles.append(id_gasto)  # lo suma al final de las filas visibles
+    if filas_cargadas == len(filas_visibles) - 1:  # todas las anteriores ya están en el Treeview
+        cargar_mas_filas()  # inserta solo esta fila
+    # si no, se insertará cuando el usuario llegue al final de la tabla
+
+def actualizar_fila(id_gasto, anterior, g):  # refleja la edición de un gasto tocando solo su fila
+    iid = str(id_gasto)  # iid de la fila
+    if not coincide_filtro(g, filtro_actual):  # ya no coincide con la búsqueda
+        quitar_fila(id_gasto)  # la saca de la tabla
+    elif not coincide_filtro(anterior, filtro_actual):  # antes no coincidía y ahora sí
+        insertar_fila(id_gasto, g)  # la agrega al final
+    elif tree.exists(iid):  # ya estaba insertada
+        tree.item(iid, values=valores_fila(g))  # actualiza solo sus valores
+
+def quitar_fila(id_gasto):  # saca de la tabla la fila de un gasto sin redibujar el resto
+    iid = str(id_gasto)  # iid de la fila
+    if tree.exists(iid):  # si estaba insertada
+        tree.delete(iid)  # borra solo esa fila
+    # si todavía no estaba insertada, cargar_mas_filas la saltea al no encontrarla
 
 def crear_gasto_modal():  # abre formulario emergente para crear un gasto
     win = tk.Toplevel(root)  # ventana modal
@@ -243,20 +340,19 @@ def crear_gasto_modal():  # abre formulario emergente para crear un gasto
         # si es nueva categoría, la agrega a la lista
         if categoria_sel not in categorias:
             categorias.append(categoria_sel)  # actualiza lista global
-        # crea dict gasto con id
-        nuevo = {"id": generar_id(), "fecha": fecha, "categoria": categoria_sel, "descripcion": descripcion, "monto": monto}
-        gastos.append(nuevo)  # agrega a la lista principal
-        refrescar_tabla()  # refresca UI
+        # crea dict gasto (el almacén le asigna el id)
+        nuevo = {"fecha": fecha, "categoria": categoria_sel, "descripcion": descripcion, "monto": monto}
+        id_nuevo = gastos.agregar(nuevo)  # agrega al almacén
+        estadistica_agregar(estadisticas, nuevo)  # suma el gasto a las estadísticas
+        insertar_fila(id_nuevo, nuevo)  # agrega solo esta fila a la tabla
         win.destroy()  # cierra modal
     # botones guardar y cancelar
     ttk.Button(win, text="Guardar", command=guardar).grid(row=5, column=0, padx=6, pady=8)  # guardar
     ttk.Button(win, text="Cancelar", command=win.destroy).grid(row=5, column=1, padx=6, pady=8)  # cancelar
 
-def seleccionar_gasto_por_iid(iid):  # helper: devuelve índice en lista 'gastos' a partir del iid (id)
-    for idx, g in enumerate(gastos):
-        if g["id"] == iid:
-            return idx  # devuelve índice si coincide
-    return None  # si no encuentra, devuelve None
+def seleccionar_gasto_por_iid(iid):  # helper: devuelve el id del gasto a partir del iid del Treeview
+    # el almacén mantiene un índice id -> fila, así que la búsqueda es O(1) y no recorre la lista
+    return int(iid) if iid in gastos else None  # None si no existe
 
 def editar_gasto_modal():  # abre modal para editar el gasto seleccionado
     sel = tree.selection()  # ids seleccionados en tree
@@ -264,11 +360,11 @@ def editar_gasto_modal():  # abre modal para editar el gasto seleccionado
         messagebox.showwarning("Editar", "Seleccioná un gasto primero.")  # aviso
         return  # sale
     iid = sel[0]  # toma el primer seleccionado
-    idx = seleccionar_gasto_por_iid(iid)  # obtiene índice interno
-    if idx is None:  # si no se encontró
+    id_gasto = seleccionar_gasto_por_iid(iid)  # obtiene id interno
+    if id_gasto is None:  # si no se encontró
         messagebox.showerror("Editar", "No se pudo localizar el gasto.")  # error
         return  # sale
-    gasto = gastos[idx]  # obtiene gasto actual
+    gasto = gastos[id_gasto]  # obtiene copia del gasto actual
     win = tk.Toplevel(root)  # modal
     win.title("Editar gasto")  # título
     win.transient(root)  # modal
@@ -308,12 +404,15 @@ def editar_gasto_modal():  # abre modal para editar el gasto seleccionado
             return  # sale
         if categoria_new not in categorias:  # si categoria nueva se agrega
             categorias.append(categoria_new)  # agrega
+        anterior = dict(gasto)  # copia de los valores previos para ajustar las estadísticas
         # actualiza gasto
         gasto["fecha"] = fecha_new
         gasto["categoria"] = categoria_new
         gasto["descripcion"] = descripcion_new
         gasto["monto"] = monto_new
-        refrescar_tabla()  # refresca UI
+        gastos.actualizar(id_gasto, gasto)  # guarda los cambios en el almacén
+        estadistica_reemplazar(estadisticas, anterior, gasto)  # quita lo anterior y suma lo nuevo
+        actualizar_fila(id_gasto, anterior, gasto)  # actualiza solo esta fila de la tabla
         win.destroy()  # cierra modal
     # botones aplicar y cancelar
     ttk.Button(win, text="Aplicar cambios", command=aplicar).grid(row=4, column=0, padx=6, pady=8)  # aplicar
@@ -325,96 +424,41 @@ def eliminar_gasto_confirm():  # confirma y elimina el gasto seleccionado
         messagebox.showwarning("Eliminar", "Seleccioná un gasto primero.")  # aviso
         return  # sale
     iid = sel[0]  # primer seleccionado
-    idx = seleccionar_gasto_por_iid(iid)  # índice en lista
-    if idx is None:  # si no encontrado
+    id_gasto = seleccionar_gasto_por_iid(iid)  # id en el almacén
+    if id_gasto is None:  # si no encontrado
         messagebox.showerror("Eliminar", "No se pudo localizar el gasto.")  # error
         return  # sale
     # confirmación
     if not messagebox.askyesno("Confirmar eliminación", "¿Eliminar el gasto seleccionado?"):
         return  # si cancela, sale
-    gastos.pop(idx)  # elimina de la lista
-    refrescar_tabla()  # refresca UI
+    eliminado = gastos.eliminar(id_gasto)  # elimina del almacén
+    estadistica_quitar(estadisticas, eliminado)  # descuenta el gasto de las estadísticas
+    quitar_fila(id_gasto)  # borra solo esta fila de la tabla
 
 # ------------------------------
 # Generador de gastos simulados
 # ------------------------------
 def generar_gastos_simulados_dialog():  # pide cantidad y genera gastos aleatorios
-    cantidad = simpledialog.askinteger("Generar gastos", "¿Cuántos gastos querés generar?", minvalue=1, maxvalue=1000)  # pide entero
+    cantidad = simpledialog.askinteger("Generar gastos", "¿Cuántos gastos querés generar?", minvalue=1, maxvalue=MAXIMO_GENERAR)  # pide entero
     if not cantidad:  # si cancela o 0
         return  # sale
-    hoy = datetime.now()  # fecha actual para variedad
-    for _ in range(cantidad):  # genera la cantidad pedida
-        dias = random.randint(0, 90)  # fecha aleatoria dentro de 90 días atrás
-        fecha = (hoy - timedelta(days=dias)).strftime(FORMATO_FECHA)  # calcula fecha
-        categoria = random.choice(categorias)  # elige categoria aleatoria
-        descripcion = random.choice(["Compra", "Servicio", "Suscripción", "Regalo", "Varios"])  # descripcion aleatoria
-        monto = round(random.uniform(20, 1500), 2)  # monto aleatorio
-        gastos.append({"id": generar_id(), "fecha": fecha, "categoria": categoria, "descripcion": descripcion, "monto": monto})  # agrega gasto
-    refrescar_tabla()  # refresca tabla al final
-    messagebox.showinfo("Generar", f"Se generaron {cantidad} gastos de prueba.")  # informa
+    descripciones = {c: DESCRIPCIONES.get(c, DESCRIPCIONES_SIMULADAS) for c in categorias}  # las de la consola; las genéricas para categorías agregadas
+    def al_terminar(resultado):  # se suman todos juntos, en el hilo de Tkinter
+        incorporar_gastos(*resultado)  # agrega los gastos y refresca la tabla
+        messagebox.showinfo("Generar", f"Se generaron {cantidad} gastos de prueba.")  # informa
+    tarea = TareaSegundoPlano(lambda tarea: generar_almacen(cantidad, FORMATO_FECHA, tarea, descripciones=descripciones,
+                                                            monto_minimo=20, monto_maximo=1500, decimales=2))  # generación vectorizada en otro hilo
+    ejecutar_con_progreso("Generando...", tarea, al_terminar, "Error al generar")
 
 # ------------------------------
 # Gráficos: boxplot, histograma, barras, pie y exportación
 # ------------------------------
 def crear_figura(tipo):  # crea y devuelve una figura matplotlib según tipo
-    fig = plt.figure(figsize=(10, 6))  # crea figura con tamaño
-    # si no hay datos, se dibuja un mensaje simple
-    if not gastos:
-        ax = fig.add_subplot(111)  # agrega eje
-        ax.text(0.5, 0.5, "Sin datos", ha="center", va="center")  # texto
-        return fig  # retorna figura vacía
-    # dependiendo del tipo, se dibuja en subplots
-    if tipo == "boxplot":
-        ax = fig.add_subplot(111)  # único subplot
-        montos = [g["monto"] for g in gastos]  # lista montos
-        ax.boxplot(montos, patch_artist=True, showmeans=True)  # boxplot con medias
-        ax.set_title("Boxplot de montos")  # título
-    elif tipo == "histograma":
-        ax = fig.add_subplot(111)  # único subplot
-        montos = [g["monto"] for g in gastos]  # lista montos
-        ax.hist(montos, bins=12)  # histograma
-        ax.set_title("Histograma de montos")  # título
-    elif tipo == "barras":
-        ax = fig.add_subplot(111)  # único subplot
-        totals = {}  # diccionario categoria->suma
-        for g in gastos:
-            totals[g["categoria"]] = totals.get(g["categoria"], 0) + g["monto"]  # acumula por categoria
-        cats = list(totals.keys())  # etiquetas
-        vals = list(totals.values())  # valores
-        ax.bar(cats, vals)  # barra
-        ax.set_title("Monto total por categoría")  # título
-        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")  # rota etiquetas
-    elif tipo == "pie":
-        ax = fig.add_subplot(111)  # único subplot
-        totals = {}  # acumula por categoria
-        for g in gastos:
-            totals[g["categoria"]] = totals.get(g["categoria"], 0) + g["monto"]  # suma
-        labels = list(totals.keys())  # etiquetas
-        sizes = list(totals.values())  # tamaños
-        ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=140)  # pie chart
-        ax.set_title("Proporción de gasto por categoría")  # título
-    else:
-        # tipo 'todos' -> 2x2 con los 4 gráficos
-        axs = fig.subplots(2,2)  # subplots 2x2
-        montos = [g["monto"] for g in gastos]  # montos
-        # boxplot
-        axs[0,0].boxplot(montos, patch_artist=True, showmeans=True)  # boxplot
-        axs[0,0].set_title("Boxplot de montos")  # título
-        # histograma
-        axs[0,1].hist(montos, bins=12)  # histograma
-        axs[0,1].set_title("Histograma de montos")  # título
-        # barras
-        totals = {}
-        for g in gastos:
-            totals[g["categoria"]] = totals.get(g["categoria"], 0) + g["monto"]
-        axs[1,0].bar(list(totals.keys()), list(totals.values()))  # barra
-        axs[1,0].set_title("Monto total por categoría")  # título
-        plt.setp(axs[1,0].get_xticklabels(), rotation=45, ha="right")  # rotación etiquetas
-        # pie
-        axs[1,1].pie(list(totals.values()), labels=list(totals.keys()), autopct="%1.1f%%", startangle=140)  # pie
-        axs[1,1].set_title("Proporción por categoría")  # título
-    fig.tight_layout()  # ajusta espacios
-    return fig  # devuelve la figura creada
+    fig = plt.figure(figsize=TAMANO_FIGURA)  # figura de pyplot (se puede abrir en ventana nativa)
+    if filtro_consulta is not None:  # con filtro: solo los gastos que lo cumplen (salen de los índices ordenados)
+        seleccion = indice_busqueda.consultas.seleccion(filtro_consulta)  # columnas de los gastos filtrados
+        return dibujar_figura(fig, tipo, seleccion, seleccion.estadisticas())  # estadísticas de la selección
+    return dibujar_figura(fig, tipo, gastos, estadisticas)  # mismo dibujo que los gráficos sin ventana
 
 def abrir_selector_graficos():  # abre menú para seleccionar gráfico individual o todos
     win = tk.Toplevel(root)  # ventana modal
@@ -425,6 +469,8 @@ def abrir_selector_graficos():  # abre menú para seleccionar gráfico individua
     ttk.Button(win, text="Histograma", command=lambda:[win.destroy(), abrir_ventana_grafico("histograma")]).pack(fill="x", padx=10, pady=6)  # botón
     ttk.Button(win, text="Barras", command=lambda:[win.destroy(), abrir_ventana_grafico("barras")]).pack(fill="x", padx=10, pady=6)  # botón
     ttk.Button(win, text="Pie", command=lambda:[win.destroy(), abrir_ventana_grafico("pie")]).pack(fill="x", padx=10, pady=6)  # botón
+    ttk.Button(win, text="Total por mes", command=lambda:[win.destroy(), abrir_ventana_grafico("mensual")]).pack(fill="x", padx=10, pady=6)  # botón (sale de los totales por período)
+    ttk.Button(win, text="Tendencia por categoría", command=lambda:[win.destroy(), abrir_ventana_grafico("tendencia")]).pack(fill="x", padx=10, pady=6)  # botón
     ttk.Separator(win).pack(fill="x", pady=6)  # separador
     ttk.Button(win, text="Ver todos (2x2)", command=lambda:[win.destroy(), abrir_ventana_grafico("todos")]).pack(fill="x", padx=10, pady=6)  # ver todos
     ttk.Button(win, text="Cerrar", command=win.destroy).pack(pady=8)  # cerrar
@@ -499,45 +545,62 @@ def construir_interfaz():  # función que construye y retorna la ventana root
     search_var = tk.StringVar()  # variable vinculada al Entry
     search_entry = ttk.Entry(frame_main, textvariable=search_var)  # campo de búsqueda
     search_entry.pack(fill="x", pady=(0,8))  # empaqueta
-    # cada vez que se suelta una tecla, se actualiza la vista (búsqueda dinámica)
+    # cada vez que se suelta una tecla se programa la búsqueda; si llega otra tecla antes, se cancela
     def on_key_release(event):  # callback
-        refrescar_tabla(search_var.get())  # refresca con el texto actual
+        programar_busqueda(search_var.get())  # busca con el texto actual tras una breve pausa
     search_entry.bind("<KeyRelease>", on_key_release)  # liga el evento
+    # filtro por rango de fechas, de montos y por categoría (también lo usan los gráficos)
+    frame_filtro = ttk.Frame(frame_main)  # barra de filtros
+    frame_filtro.pack(fill="x", pady=(0,8))  # debajo del buscador
+    campos_filtro = {}  # nombre -> variable del campo
+    for nombre, texto, ancho in (("desde", "Desde", 12), ("hasta", "Hasta", 12), ("minimo", "Monto mín", 10), ("maximo", "Monto máx", 10)):
+        ttk.Label(frame_filtro, text=texto).pack(side="left", padx=(0,4))  # etiqueta del campo
+        campos_filtro[nombre] = tk.StringVar()  # vacío = sin límite
+        ttk.Entry(frame_filtro, textvariable=campos_filtro[nombre], width=ancho).pack(side="left", padx=(0,8))  # campo
+    ttk.Label(frame_filtro, text="Categoría").pack(side="left", padx=(0,4))  # etiqueta
+    categoria_var = tk.StringVar(value="Todas")  # categoría elegida
+    combo_filtro = ttk.Combobox(frame_filtro, textvariable=categoria_var, state="readonly", width=16)  # lista desplegable
+    combo_filtro.configure(postcommand=lambda: combo_filtro.configure(values=["Todas"] + categorias))  # categorías al día al desplegar
+    combo_filtro.pack(side="left", padx=(0,8))  # empaqueta
+    def on_aplicar_filtro():  # callback del botón Aplicar
+        aplicar_filtro_consulta(campos_filtro["desde"].get(), campos_filtro["hasta"].get(), campos_filtro["minimo"].get(),
+                                campos_filtro["maximo"].get(), categoria_var.get())
+    def on_limpiar_filtro():  # callback del botón Limpiar: vacía los campos y quita el filtro
+        for variable in campos_filtro.values():
+            variable.set("")
+        categoria_var.set("Todas")
+        limpiar_filtro_consulta()
+    ttk.Button(frame_filtro, text="Aplicar", command=on_aplicar_filtro).pack(side="left", padx=(0,4))  # aplica el filtro
+    ttk.Button(frame_filtro, text="Limpiar", command=on_limpiar_filtro).pack(side="left")  # quita el filtro
     # tabla de gastos (Treeview)
     cols = ("Fecha", "Categoría", "Descripción", "Monto")  # columnas visuales
-    tree = ttk.Treeview(frame_main, columns=cols, show="headings", selectmode="browse")  # Treeview
+    frame_tabla = ttk.Frame(frame_main)  # contenedor de la tabla y su barra de desplazamiento
+    frame_tabla.pack(fill="both", expand=True)  # ocupa el resto del área principal
+    tree = ttk.Treeview(frame_tabla, columns=cols, show="headings", selectmode="browse")  # Treeview
     for c in cols:  # define encabezados
         tree.heading(c, text=c)  # pone encabezados
         tree.column(c, anchor="w")  # alinea a la izquierda
-    tree.pack(fill="both", expand=True)  # empaqueta tabla
+    scroll = ttk.Scrollbar(frame_tabla, orient="vertical", command=tree.yview)  # barra de desplazamiento vertical
+    # al desplazarse, además de mover la barra, se cargan más filas si se llegó cerca del final
+    tree.configure(yscrollcommand=lambda primero, ultimo: (scroll.set(primero, ultimo), al_desplazar_tabla(ultimo)))
+    scroll.pack(side="right", fill="y")  # barra a la derecha
+    tree.pack(side="left", fill="both", expand=True)  # empaqueta tabla
     # inicialmente la tabla está vacía; si el usuario importó al inicio, se rellenará más abajo
     return root  # devuelve la referencia a la ventana construida
 
 # ------------------------------
 # Inicio de la aplicación: importar opcional al iniciar
 # ------------------------------
+def abrir_archivo_inicial():  # al iniciar, el usuario elige un archivo para importar o cancela
+    ruta = filedialog.askopenfilename(title="Importar archivo o abrir base al iniciar (opcional)", filetypes=[("JSON/CSV/TXT/Binario/SQLite","*.json *.csv *.txt *.gbin *.db *.sqlite *.sqlite3"),("All files","*.*")])  # diálogo inicial
+    if ruta:  # si el usuario eligió un archivo
+        abrir_archivo(ruta)  # importa en otro hilo (la tabla se completa al terminar) o abre la base
+
 def iniciar_aplicacion():  # función que controla la secuencia de inicio
     app = construir_interfaz()  # construye la UI y obtiene root
-    # al iniciar, abrimos diálogo para que el usuario elija un archivo para importar o cancele
-    ruta = filedialog.askopenfilename(title="Importar archivo al iniciar (opcional)", filetypes=[("JSON/CSV/TXT","*.json *.csv *.txt"),("All files","*.*")])  # diálogo inicial
-    if ruta:  # si el usuario eligió un archivo
-        try:
-            nuevos = importar_gastos_ruta(ruta)  # intenta importar
-            if nuevos:
-                # actualiza lista principal y categorías
-                gastos.extend(nuevos)  # agrega los importados
-                for c in {g["categoria"] for g in nuevos}:
-                    if c not in categorias:
-                        categorias.append(c)  # agrega categorías nuevas
-                # guarda ruta como archivo_actual
-                global archivo_actual
-                archivo_actual = ruta
-                messagebox.showinfo("Importar", f"Se importaron {len(nuevos)} gastos desde:\n{ruta}")  # confirma
-            else:
-                messagebox.showwarning("Importar", "No se importaron registros válidos.")  # adv si no hay registros
-        except Exception as e:
-            messagebox.showerror("Error al importar", str(e))  # muestra error si falla
     refrescar_tabla()  # refresca la tabla (aunque esté vacía)
+    # el diálogo inicial se abre recién con la ventana ya dibujada y el bucle de eventos andando
+    app.after_idle(abrir_archivo_inicial)
     # inicia mainloop en try/except para manejar KeyboardInterrupt limpiamente
     try:
         app.mainloop()  # ejecuta bucle principal
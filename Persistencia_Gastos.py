@@ -0,0 +1,49 @@
+# Persistencia_Gastos.py
+# Punto único para abrir y guardar gastos según el tipo de archivo:
+#   .json (y otros)        -> AlmacenGastos en memoria, guardado con diario + instantánea + cabecera
+#   .db / .sqlite / .sqlite3 -> AlmacenSQLite, los gastos quedan en la base
+
+# ------------------------------
+# Imports
+# ------------------------------
+from Almacen_SQLite import AlmacenSQLite, BusquedaSQLite, es_base_sqlite  # base SQLite
+from Diario_Gastos import diario_de  # JSON con diario de cambios
+from Busqueda_Gastos import IndiceBusqueda  # búsqueda sobre las columnas en memoria
+
+
+# ------------------------------
+# Bases abiertas
+# ------------------------------
+_bases = {}  # ruta -> AlmacenSQLite abierto (una conexión por base)
+
+
+# ------------------------------
+# Abrir y guardar
+# ------------------------------
+def abrir_gastos(ruta, formato_fecha, ordenar_claves=False):  # devuelve el almacén del archivo
+    """
+    Abre el archivo de gastos con el almacén que le corresponde. Con una base SQLite
+    ya abierta, descarta sus cambios sin confirmar (igual que volver a leer un JSON).
+    Un JSON con cabecera al día se abre enseguida y sus gastos terminan de cargarse en un
+    hilo (ver Almacen_Diferido).
+    Lanza FileNotFoundError si el JSON y su diario no existen; una base nueva se crea vacía.
+    """
+    if es_base_sqlite(ruta):
+        almacen = _bases.get(ruta)
+        if almacen is None:
+            almacen = _bases[ruta] = AlmacenSQLite(ruta, formato_fecha)
+        else:
+            almacen.descartar()  # vuelve a lo último confirmado
+        return almacen
+    return diario_de(ruta, ordenar_claves).abrir(formato_fecha)
+
+
+def busqueda_de(almacen):  # búsqueda por texto y filtros que corresponde al almacén
+    return BusquedaSQLite(almacen) if isinstance(almacen, AlmacenSQLite) else IndiceBusqueda(almacen)
+
+
+def guardar_gastos_en(almacen, ruta, ordenar_claves=False):  # guarda los cambios del almacén en su archivo
+    if isinstance(almacen, AlmacenSQLite):  # base: confirma la transacción
+        almacen.confirmar()
+    else:  # JSON: agrega los cambios al diario
+        diario_de(ruta, ordenar_claves).guardar(almacen)
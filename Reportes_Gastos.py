@@ -0,0 +1,211 @@
+# Reportes_Gastos.py
+# Exportación de reportes por lotes: muchos gráficos (tipo, período, categorías) dibujados en
+# paralelo en un grupo de procesos con el backend Agg, a un PDF de varias páginas o a una
+# carpeta de PNG. Los procesos leen el ledger de un libro binario mapeado (ver Formato_Binario),
+# así no se copia ni se vuelve a cargar en cada uno.
+#
+# Uso:
+#   python Reportes_Gastos.py gastos.json reporte.pdf --tipos barras pie --categorias Comida Hogar \
+#       --periodos 01/01/2024:31/01/2024 01/02/2024:29/02/2024
+#   python Reportes_Gastos.py gastos.gbin carpeta_png --trabajos trabajos.json --procesos 8
+# trabajos.json es una lista de {"tipo", "desde", "hasta", "categorias", "titulo"} (todo opcional
+# salvo el tipo) o de listas [tipo, [desde, hasta], [categorias]].
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # rutas y cantidad de procesadores
+import sys  # código de salida
+import json  # lista de trabajos
+import argparse  # opciones de línea de comandos
+import itertools  # combinaciones de tipos, períodos y categorías
+import tempfile  # libro binario temporal para los procesos
+import multiprocessing  # grupo de procesos
+from matplotlib.backends.backend_pdf import PdfPages  # PDF de varias páginas, sin pyplot
+
+from Fechas_Gastos import FORMATO_FECHA, SIN_FECHA, fecha_a_ordinal, ordinal_a_fecha  # períodos como ordinales
+from Graficos_Gastos import TIPOS, DPI, crear_figura  # dibujo sin ventana
+from Consultas_Gastos import IndiceConsultas, crear_filtro  # selección por período y categorías con índices ordenados
+from Formato_Binario import LibroBinario, escribir_binario, es_libro_binario  # ledger compartido entre procesos
+from Almacen_SQLite import es_base_sqlite  # bases SQLite
+from Persistencia_Gastos import abrir_gastos  # JSON con diario y bases
+from Importacion_Gastos import importar_a_almacen  # CSV y TXT
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+TRABAJOS_POR_ENVIO = 4  # trabajos que recibe cada proceso por vez
+
+
+# ------------------------------
+# Trabajos
+# ------------------------------
+def normalizar_trabajo(trabajo):  # convierte un trabajo en dict {"tipo", "desde", "hasta", "categorias", "titulo"}
+    """
+    Acepta un dict o una tupla (tipo, (desde, hasta), categorias). `desde`/`hasta` son
+    fechas de texto (cualquiera de los formatos aceptados), ordinales o None para no limitar;
+    `categorias` es una lista de nombres o None para todas. Lanza ValueError si el tipo
+    o alguna fecha no son válidos.
+    """
+    if not isinstance(trabajo, dict):
+        tipo, periodo, categorias = (list(trabajo) + [None, None])[:3]
+        desde, hasta = periodo or (None, None)
+        trabajo = {"tipo": tipo, "desde": desde, "hasta": hasta, "categorias": categorias}
+    tipo = trabajo.get("tipo")
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de gráfico desconocido: {tipo!r} (se espera uno de {', '.join(TIPOS)}).")
+    limites = []
+    for campo in ("desde", "hasta"):
+        texto = trabajo.get(campo)
+        if isinstance(texto, int):  # ya normalizado (ordinal)
+            ordinal = texto
+        else:
+            ordinal = None if texto in (None, "") else fecha_a_ordinal(texto)
+        if ordinal == SIN_FECHA:
+            raise ValueError(f"Fecha inválida en '{campo}': {texto!r}.")
+        limites.append(ordinal)
+    categorias = trabajo.get("categorias")
+    if isinstance(categorias, str):
+        categorias = [categorias]
+    return {"tipo": tipo, "desde": limites[0], "hasta": limites[1],
+            "categorias": list(categorias) if categorias else None, "titulo": trabajo.get("titulo")}
+
+
+def combinar_trabajos(tipos, periodos=(None,), categorias=(None,)):  # todos los (tipo, período, categoría)
+    """
+    Arma un trabajo por cada combinación: por ejemplo, los gráficos de cada categoría
+    (centro de costo) en cada mes. `periodos` son pares (desde, hasta) o None; cada
+    elemento de `categorias` es un nombre, una lista de nombres o None (todas).
+    """
+    return [normalizar_trabajo((tipo, periodo, categoria))
+            for periodo, categoria, tipo in itertools.product(periodos, categorias, tipos)]
+
+
+def titulo_trabajo(trabajo, formato_fecha=FORMATO_FECHA):  # texto que identifica al trabajo
+    if trabajo.get("titulo"):
+        return trabajo["titulo"]
+    partes = [trabajo["tipo"], ", ".join(trabajo["categorias"]) if trabajo["categorias"] else "todas las categorías"]
+    if trabajo["desde"] is not None or trabajo["hasta"] is not None:
+        desde = ordinal_a_fecha(trabajo["desde"], formato_fecha) if trabajo["desde"] is not None else "…"
+        hasta = ordinal_a_fecha(trabajo["hasta"], formato_fecha) if trabajo["hasta"] is not None else "…"
+        partes.append(f"{desde} - {hasta}")
+    return " | ".join(partes)
+
+
+# ------------------------------
+# Procesos
+# ------------------------------
+_libro = None  # libro binario abierto en cada proceso del grupo
+_consultas = None  # índices ordenados del libro (se arman con el primer trabajo que los necesita)
+_formato_fecha = FORMATO_FECHA
+
+
+def _iniciar_proceso(ruta_libro, formato_fecha):  # abre el libro una vez por proceso
+    global _libro, _consultas, _formato_fecha
+    _libro = LibroBinario(ruta_libro, formato_fecha)
+    _consultas = IndiceConsultas(_libro)
+    _formato_fecha = formato_fecha
+
+
+def _dibujar(trabajo):  # figura del trabajo, con su título
+    filtro = crear_filtro(trabajo["desde"], trabajo["hasta"], categorias=trabajo["categorias"])
+    seleccion = _consultas.seleccion(filtro)  # O(log n + k) por trabajo en lugar de recorrer el libro
+    fig = crear_figura(trabajo["tipo"], seleccion, seleccion.estadisticas())
+    fig.suptitle(titulo_trabajo(trabajo, _formato_fecha))
+    fig.tight_layout()
+    return fig
+
+
+def _trabajo_png(argumentos):  # dibuja el trabajo y escribe su PNG; devuelve la ruta
+    trabajo, ruta, dpi = argumentos
+    _dibujar(trabajo).savefig(ruta, format="png", dpi=dpi)
+    return ruta
+
+
+def _trabajo_figura(trabajo):  # dibuja el trabajo y devuelve la figura (vuelve al proceso principal para el PDF)
+    return _dibujar(trabajo)
+
+
+# ------------------------------
+# Exportación
+# ------------------------------
+def abrir_ledger(ruta, formato_fecha=FORMATO_FECHA):  # almacén del archivo, en cualquier formato soportado
+    if es_libro_binario(ruta):
+        return LibroBinario(ruta, formato_fecha)
+    if es_base_sqlite(ruta) or os.path.splitext(ruta)[1].lower() == ".json":  # JSON con diario o base
+        almacen = abrir_gastos(ruta, formato_fecha)
+        return almacen.almacen() if hasattr(almacen, "cargado") else almacen  # espera la carga diferida
+    return importar_a_almacen(ruta, formato_fecha)[0]  # CSV y TXT
+
+
+def exportar_lote(gastos, trabajos, salida, procesos=None, formato_fecha=FORMATO_FECHA, dpi=DPI):  # dibuja todos los trabajos
+    """
+    Dibuja los `trabajos` (ver normalizar_trabajo) en `procesos` procesos (por defecto, uno
+    por procesador) y escribe un PDF de varias páginas si `salida` termina en .pdf, o un
+    PNG por trabajo dentro de la carpeta `salida`. `gastos` es la ruta de un ledger o un
+    almacén ya abierto; si no es un libro binario, se escribe uno temporal que los procesos
+    mapean. Devuelve la lista de archivos escritos.
+    """
+    trabajos = [normalizar_trabajo(t) for t in trabajos]
+    if isinstance(gastos, str) and es_libro_binario(gastos):
+        ruta_libro, temporal = gastos, None
+    else:
+        almacen = abrir_ledger(gastos, formato_fecha) if isinstance(gastos, str) else gastos
+        descriptor, temporal = tempfile.mkstemp(suffix=".gbin")
+        os.close(descriptor)
+        escribir_binario(almacen, temporal)
+        ruta_libro = temporal
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(trabajos) or 1))
+    contexto = multiprocessing.get_context("spawn")  # procesos limpios (sin hilos heredados)
+    try:
+        with contexto.Pool(procesos, initializer=_iniciar_proceso, initargs=(ruta_libro, formato_fecha)) as grupo:
+            if salida.lower().endswith(".pdf"):
+                with PdfPages(salida) as pdf:  # las páginas se escriben en orden a medida que llegan
+                    for fig in grupo.imap(_trabajo_figura, trabajos, chunksize=TRABAJOS_POR_ENVIO):
+                        pdf.savefig(fig)
+                return [salida]
+            os.makedirs(salida, exist_ok=True)
+            ancho = len(str(len(trabajos)))
+            envios = [(t, os.path.join(salida, f"{i:0{ancho}d}-{t['tipo']}.png"), dpi) for i, t in enumerate(trabajos, 1)]
+            return list(grupo.imap(_trabajo_png, envios, chunksize=TRABAJOS_POR_ENVIO))
+    finally:
+        if temporal is not None:
+            os.remove(temporal)
+
+
+# ------------------------------
+# Línea de comandos
+# ------------------------------
+def _periodo(texto):  # "desde:hasta" (cualquiera de los dos puede faltar)
+    desde, _, hasta = texto.partition(":")
+    return desde or None, hasta or None
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Exporta muchos gráficos de gastos en paralelo a un PDF o a PNG.")
+    parser.add_argument("ledger", help="archivo de gastos (.json, .csv, .txt, .db o .gbin)")
+    parser.add_argument("salida", help="archivo .pdf (varias páginas) o carpeta para los PNG")
+    parser.add_argument("--trabajos", help="JSON con la lista de trabajos")
+    parser.add_argument("--tipos", nargs="+", default=["todos"], choices=TIPOS, help="gráficos por combinación")
+    parser.add_argument("--periodos", nargs="+", type=_periodo, default=[None], help="períodos desde:hasta")
+    parser.add_argument("--categorias", nargs="+", help="un reporte por cada categoría (por defecto, todas juntas)")
+    parser.add_argument("--procesos", type=int, help="procesos a usar (por defecto, uno por procesador)")
+    parser.add_argument("--dpi", type=int, default=DPI, help="resolución de los PNG")
+    opciones = parser.parse_args(argumentos)
+    try:
+        if opciones.trabajos:
+            with open(opciones.trabajos, "r", encoding="utf-8") as f:
+                trabajos = json.load(f)
+        else:
+            trabajos = combinar_trabajos(opciones.tipos, opciones.periodos, opciones.categorias or [None])
+        escritos = exportar_lote(opciones.ledger, trabajos, opciones.salida, opciones.procesos, dpi=opciones.dpi)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ {len(trabajos)} gráficos exportados en {len(escritos)} archivo(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# Rollups_Gastos.py
+# Totales por período (día, semana, mes) y categoría, guardados dentro de las estadísticas
+# incrementales (acum["periodos"]) y actualizados en cada alta, edición o baja. Los gráficos de
+# tendencia se arman recorriendo los períodos, no los gastos.
+
+# ------------------------------
+# Imports
+# ------------------------------
+from datetime import date  # inicio de mes
+import numpy as np  # armado vectorizado desde columnas
+
+from Fechas_Gastos import SIN_FECHA, fecha_a_ordinal, ordinal_a_fecha  # fechas como números de día
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+PERIODOS = ("dia", "semana", "mes")  # granularidades que se mantienen
+EPOCA = date(1970, 1, 1).toordinal()  # ordinal del día 0 de datetime64
+MAXIMO_CUBETAS_DENSAS = 1 << 24  # (categorías x días) hasta el que se cuenta con bincount en vez de ordenar
+
+
+# ------------------------------
+# Períodos
+# ------------------------------
+def inicio_semana(ordinal):  # ordinal del lunes de la semana (el ordinal 1 fue lunes)
+    return ordinal - (ordinal - 1) % 7
+
+
+def inicio_mes(ordinal):  # ordinal del día 1 del mes
+    return ordinal - date.fromordinal(ordinal).day + 1
+
+
+def inicios(ordinal):  # (día, semana, mes) en que cae la fecha, en el orden de PERIODOS
+    return ordinal, inicio_semana(ordinal), inicio_mes(ordinal)
+
+
+def etiqueta_periodo(inicio, periodo, formato="%d/%m/%Y"):  # texto para el eje de un gráfico
+    if periodo == "mes":
+        return ordinal_a_fecha(inicio, "%m/%Y")
+    return ordinal_a_fecha(inicio, formato)
+
+
+# ------------------------------
+# Acumuladores por período
+# ------------------------------
+def periodos_vacios():  # {"dia": {}, "semana": {}, "mes": {}}; cada cubeta es inicio -> [cantidad, suma]
+    return {periodo: {} for periodo in PERIODOS}
+
+
+def periodos_sumar(periodos, fecha, cantidad, suma):  # suma gastos a las cubetas de su fecha
+    """
+    Suma `cantidad` gastos por un total de `suma` a las cubetas de día, semana y mes de la
+    fecha (texto u ordinal); con valores negativos los resta. Costo O(1). Las fechas que no
+    se pudieron interpretar no entran en ningún período. Una cubeta sin gastos se borra.
+    """
+    ordinal = fecha if isinstance(fecha, int) else fecha_a_ordinal(fecha)
+    if ordinal == SIN_FECHA:
+        return
+    for periodo, inicio in zip(PERIODOS, inicios(ordinal)):
+        cubetas = periodos[periodo]
+        cubeta = cubetas.get(inicio)
+        if cubeta is None:
+            cubeta = cubetas[inicio] = [0, 0.0]
+        cubeta[0] += cantidad
+        cubeta[1] += suma
+        if cubeta[0] <= 0:  # no quedan gastos en el período
+            del cubetas[inicio]
+
+
+def periodos_combinar(destino, origen):  # suma a `destino` las cubetas de `origen` (O(cubetas))
+    for periodo in PERIODOS:
+        cubetas = destino[periodo]
+        for inicio, (cantidad, suma) in origen[periodo].items():
+            cubeta = cubetas.get(inicio)
+            if cubeta is None:
+                cubetas[inicio] = [cantidad, suma]
+            else:
+                cubeta[0] += cantidad
+                cubeta[1] += suma
+
+
+def copiar_periodos(periodos):  # copia independiente (las cubetas son listas)
+    return {periodo: {inicio: list(cubeta) for inicio, cubeta in cubetas.items()} for periodo, cubetas in periodos.items()}
+
+
+def _agrupar(claves, cantidades, sumas):  # suma cantidades y montos por clave (arreglos pequeños)
+    unicas, posicion = np.unique(claves, return_inverse=True)
+    return (unicas, np.bincount(posicion, weights=cantidades, minlength=unicas.size),
+            np.bincount(posicion, weights=sumas, minlength=unicas.size))
+
+
+def periodos_columnas(codigos, montos, fechas, n_categorias):  # cubetas de cada categoría, desde columnas
+    """
+    Devuelve una lista con los períodos de cada código de categoría, calculados sobre las
+    columnas sin recorrer los gastos: primero se cuenta por (categoría, día) y después las
+    semanas y meses se arman sumando los días, que son pocos.
+    """
+    resultado = [periodos_vacios() for _ in range(n_categorias)]
+    validos = fechas != SIN_FECHA
+    if not validos.any():
+        return resultado
+    codigos, montos, fechas = codigos[validos], montos[validos], fechas[validos].astype(np.int64)
+    primero = int(fechas.min())
+    dias = int(fechas.max()) - primero + 1
+    if n_categorias * dias <= MAXIMO_CUBETAS_DENSAS:  # tabla densa (categoría, día): una pasada, sin ordenar
+        clave = codigos.astype(np.int64) * dias + (fechas - primero)
+        cantidades = np.bincount(clave, minlength=n_categorias * dias)
+        sumas = np.bincount(clave, weights=montos, minlength=n_categorias * dias)
+        claves = np.flatnonzero(cantidades)
+        cantidades, sumas = cantidades[claves], sumas[claves]
+    else:  # fechas muy dispersas: se agrupan ordenando
+        claves, cantidades, sumas = _agrupar(codigos.astype(np.int64) * dias + (fechas - primero),
+                                             np.ones(fechas.size), montos)
+    codigo_de, dia = np.divmod(claves, dias)
+    dia = dia + primero
+    semana = dia - (dia - 1) % 7
+    mes = (dia - EPOCA).astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + EPOCA
+    for periodo, inicio in zip(PERIODOS, (dia, semana, mes)):
+        unicas, n, s = _agrupar(codigo_de * (1 << 32) + inicio, cantidades, sumas)  # (categoría, inicio) -> totales
+        for clave, cantidad, suma in zip(unicas.tolist(), n.tolist(), s.tolist()):
+            codigo, inicio_periodo = divmod(clave, 1 << 32)
+            resultado[codigo][periodo][inicio_periodo] = [int(cantidad), suma]
+    return resultado
+
+
+# ------------------------------
+# Consultas (O(cubetas))
+# ------------------------------
+def _valor(cubeta, campo):  # "cantidad", "suma" o "media" de una cubeta
+    cantidad, suma = cubeta
+    if campo == "cantidad":
+        return cantidad
+    if campo == "media":
+        return suma / cantidad
+    return suma
+
+
+def serie_temporal(estadisticas, periodo="mes", categorias=None, campo="suma"):  # totales por período
+    """
+    Devuelve (inicios, valores): los períodos con gastos, ordenados, y el total del campo
+    ("suma", "cantidad" o "media") sumando las categorías pedidas (todas si es None).
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período desconocido: {periodo!r} (se espera uno de {', '.join(PERIODOS)}).")
+    totales = {}  # inicio -> [cantidad, suma]
+    for cat, acum in estadisticas.items():
+        if categorias is not None and cat not in categorias:
+            continue
+        for inicio, (cantidad, suma) in acum["periodos"][periodo].items():
+            cubeta = totales.setdefault(inicio, [0, 0.0])
+            cubeta[0] += cantidad
+            cubeta[1] += suma
+    inicios_ordenados = sorted(totales)
+    return inicios_ordenados, [_valor(totales[i], campo) for i in inicios_ordenados]
+
+
+def tendencia_por_categoria(estadisticas, periodo="mes", campo="suma"):  # una serie por categoría
+    """
+    Devuelve (inicios, series): todos los períodos con algún gasto, ordenados, y para cada
+    categoría la lista de valores alineada con esos períodos (0 donde no tuvo gastos).
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período desconocido: {periodo!r} (se espera uno de {', '.join(PERIODOS)}).")
+    todos = sorted({inicio for acum in estadisticas.values() for inicio in acum["periodos"][periodo]})
+    series = {}
+    for cat, acum in estadisticas.items():
+        cubetas = acum["periodos"][periodo]
+        series[cat] = [_valor(cubetas[i], campo) if i in cubetas else 0 for i in todos]
+    return todos, series
@@ -0,0 +1,413 @@
+# Servidor_Gastos.py
+# API local HTTP/JSON sobre el almacén de gastos, con asyncio (sin dependencias externas). El ledger
+# queda cargado en memoria, las estadísticas se mantienen al día en cada cambio y los cambios se
+# guardan en disco de a tandas (un guardado por intervalo, no uno por pedido). Atiende muchos
+# clientes a la vez con conexiones persistentes (keep-alive).
+#
+# Uso:
+#   python Servidor_Gastos.py gastos.json --puerto 8765
+#
+# Rutas:
+#   GET    /gastos?texto=&desde=&hasta=&mes=&monto_minimo=&monto_maximo=&categorias=a,b&pagina=1&por_pagina=100
+#   GET    /gastos/<id>
+#   POST   /gastos            cuerpo: un gasto o una lista de gastos
+#   PUT    /gastos/<id>       cuerpo: campos a cambiar (PATCH también)
+#   DELETE /gastos/<id>
+#   GET    /resumen?<filtros>                     totales por categoría (los de los gráficos)
+#   GET    /periodos?periodo=mes&campo=suma&<filtros>  totales por día, semana o mes
+#   GET    /estado
+
+# ------------------------------
+# Imports
+# ------------------------------
+import sys  # código de salida
+import json  # cuerpos de pedidos y respuestas
+import signal  # cierre ordenado (guarda lo pendiente)
+import asyncio  # servidor y guardado periódico
+import argparse  # opciones de línea de comandos
+from collections import OrderedDict  # caché de listados
+from urllib.parse import urlsplit, parse_qs  # ruta y parámetros
+
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA  # formato de la consola
+from Almacen_Gastos import AlmacenGastos  # ledger nuevo
+from Persistencia_Gastos import abrir_gastos, busqueda_de, guardar_gastos_en  # JSON con diario y bases
+from Importacion_Gastos import validar_registro  # mismas reglas que al importar
+from Agregacion_Gastos import estadistica_agregar, estadistica_quitar, estadistica_reemplazar, resumen_incremental  # estadísticas al día
+from Rollups_Gastos import PERIODOS, serie_temporal, etiqueta_periodo  # totales por período
+from Consultas_Gastos import crear_filtro, clave_filtro  # filtros por fecha, monto y categoría
+
+
+# ------------------------------
+# Configuración
+# ------------------------------
+HOST = "127.0.0.1"  # solo conexiones locales
+PUERTO = 8765
+INTERVALO_GUARDADO = 1.0  # segundos entre guardados (los cambios de ese lapso van juntos)
+POR_PAGINA = 100  # gastos por página en los listados
+MAXIMO_POR_PAGINA = 1000
+MAXIMO_CUERPO = 16 << 20  # bytes aceptados en el cuerpo de un pedido
+CAPACIDAD_RECORDADOS = 32  # listados y estadísticas filtradas que se recuerdan hasta el próximo cambio
+ESPERA_CONEXION = 30  # segundos sin pedidos antes de cerrar una conexión persistente
+CAMPOS_FILTRO = ("desde", "hasta", "mes", "monto_minimo", "monto_maximo", "categorias")  # parámetros de filtro
+ESTADOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con su código y un mensaje en JSON."""
+
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+# ------------------------------
+# Servicio (sin red)
+# ------------------------------
+class ServicioGastos:
+    """
+    Operaciones de la API sobre un almacén residente en memoria. Cada método recibe los
+    parámetros ya decodificados y devuelve (código, datos). Los cambios quedan pendientes
+    hasta guardar(), que los escribe todos juntos (diario del JSON o transacción de la base).
+    """
+
+    def __init__(self, almacen, ruta):
+        self.almacen = almacen
+        self.ruta = ruta  # archivo donde se guardan los cambios
+        self.busqueda = busqueda_de(almacen)  # índices en memoria o SQL de la base
+        if hasattr(almacen, "estadisticas"):  # estadísticas por categoría y período; la base agrupa con SQL
+            self.estadisticas = almacen.estadisticas()
+        else:  # sobre las columnas
+            self.estadisticas = self.busqueda.consultas.seleccion(None).estadisticas()
+        self.pendientes = 0  # cambios sin guardar
+        self.guardados = 0  # guardados hechos
+        self.error_guardado = None  # error del último guardado, si falló
+        self._recordados = OrderedDict()  # (versión, tipo, texto, filtro) -> ids o estadísticas filtradas
+
+    # ---------- utilidades ----------
+    def _gasto(self, id_gasto):  # gasto con su id, o ErrorHTTP 404
+        gasto = self.almacen.obtener(id_gasto)
+        if gasto is None:
+            raise ErrorHTTP(404, f"No existe el gasto {id_gasto}.")
+        return dict(gasto, id=id_gasto)
+
+    def _validar(self, item):  # gasto normalizado o ErrorHTTP 400
+        gasto = validar_registro(item, self.almacen.formato_fecha) if isinstance(item, dict) else None
+        if gasto is None:
+            raise ErrorHTTP(400, f"Gasto inválido: {item!r}")
+        return gasto
+
+    def _cambio(self, cantidad=1):  # anota cambios pendientes de guardar
+        self.pendientes += cantidad
+
+    def _recordado(self, tipo, texto, filtro, calcular):  # resultado recordado hasta que cambien los datos
+        clave = (self.almacen.version, tipo, texto, clave_filtro(filtro))
+        valor = self._recordados.get(clave)
+        if valor is None:
+            valor = self._recordados[clave] = calcular()
+            while len(self._recordados) > CAPACIDAD_RECORDADOS:
+                self._recordados.popitem(last=False)
+        self._recordados.move_to_end(clave)
+        return valor
+
+    # ---------- lectura ----------
+    def listar(self, texto="", filtro=None, pagina=1, por_pagina=POR_PAGINA):  # una página de los gastos filtrados
+        if pagina < 1 or not 1 <= por_pagina <= MAXIMO_POR_PAGINA:
+            raise ErrorHTTP(400, f"Página inválida (pagina >= 1, por_pagina entre 1 y {MAXIMO_POR_PAGINA}).")
+        ids = self._recordado("ids", texto, filtro, lambda: self.busqueda.buscar(texto, filtro))  # las páginas siguientes no vuelven a filtrar
+        inicio = (pagina - 1) * por_pagina
+        gastos = [self._gasto(i) for i in ids[inicio:inicio + por_pagina]]  # solo la página pedida
+        return 200, {"total": len(ids), "pagina": pagina, "por_pagina": por_pagina, "gastos": gastos}
+
+    def obtener(self, id_gasto):
+        return 200, self._gasto(id_gasto)
+
+    def _estadisticas(self, filtro):  # las incrementales o las de la selección filtrada
+        if filtro is None:
+            return self.estadisticas
+        return self._recordado("estadisticas", "", filtro, lambda: self.busqueda.consultas.seleccion(filtro).estadisticas())
+
+    def resumen(self, filtro=None):  # totales por categoría (los de los gráficos), sin recorrer los gastos
+        resumen = resumen_incremental(self._estadisticas(filtro))
+        return 200, {"cantidad": sum(r["cantidad"] for r in resumen.values()),
+                     "suma": sum(r["suma"] for r in resumen.values()), "categorias": resumen}
+
+    def periodos(self, periodo="mes", campo="suma", filtro=None):  # totales por período
+        if periodo not in PERIODOS or campo not in ("suma", "cantidad", "media"):
+            raise ErrorHTTP(400, f"Período o campo inválido (periodo: {', '.join(PERIODOS)}; campo: suma, cantidad, media).")
+        inicios, valores = serie_temporal(self._estadisticas(filtro), periodo, campo=campo)
+        formato = self.almacen.formato_fecha
+        return 200, {"periodo": periodo, "campo": campo,
+                     "valores": [{"periodo": etiqueta_periodo(i, periodo, formato), "valor": v} for i, v in zip(inicios, valores)]}
+
+    def estado(self):
+        return 200, {"gastos": len(self.almacen), "version": self.almacen.version,
+                     "pendientes": self.pendientes, "guardados": self.guardados, "error_guardado": self.error_guardado}
+
+    # ---------- cambios ----------
+    def agregar(self, cuerpo):  # uno o varios gastos; devuelve sus ids
+        lista = cuerpo if isinstance(cuerpo, list) else [cuerpo]
+        gastos = [self._validar(item) for item in lista]  # se valida todo antes de agregar nada
+        ids = self.almacen.extender(gastos)
+        for gasto in gastos:
+            estadistica_agregar(self.estadisticas, gasto)
+        self._cambio(len(gastos))
+        return 201, {"ids": ids} if isinstance(cuerpo, list) else {"id": ids[0]}
+
+    def actualizar(self, id_gasto, cambios):  # modifica los campos indicados
+        if not isinstance(cambios, dict):
+            raise ErrorHTTP(400, "Se esperaba un objeto con los campos a cambiar.")
+        anterior = self._gasto(id_gasto)
+        del anterior["id"]
+        nuevo = self._validar(dict(anterior, **cambios))
+        self.almacen.actualizar(id_gasto, nuevo)
+        estadistica_reemplazar(self.estadisticas, anterior, nuevo)
+        self._cambio()
+        return 200, self._gasto(id_gasto)
+
+    def eliminar(self, id_gasto):
+        self._gasto(id_gasto)  # 404 si no existe
+        estadistica_quitar(self.estadisticas, self.almacen.eliminar(id_gasto))
+        self._cambio()
+        return 200, {"id": id_gasto}
+
+    def guardar(self):  # escribe los cambios pendientes de una sola vez
+        if self.pendientes:
+            try:
+                guardar_gastos_en(self.almacen, self.ruta)
+            except Exception as e:  # los cambios siguen pendientes; /estado muestra el error
+                self.error_guardado = f"{type(e).__name__}: {e}"
+                raise
+            self.pendientes = 0
+            self.guardados += 1
+            self.error_guardado = None
+
+
+# ------------------------------
+# HTTP
+# ------------------------------
+def _entero(parametros, nombre, defecto):  # parámetro entero de la consulta
+    try:
+        return int(parametros.get(nombre, defecto))
+    except ValueError:
+        raise ErrorHTTP(400, f"'{nombre}' debe ser un número entero.") from None
+
+
+def _id_gasto(texto):  # id numérico de la ruta
+    try:
+        return int(texto)
+    except ValueError:
+        raise ErrorHTTP(404, f"No existe el gasto {texto}.") from None
+
+
+def _filtro(servicio, parametros):  # filtro de Consultas_Gastos con los parámetros de la consulta
+    valores = {campo: parametros.get(campo) for campo in CAMPOS_FILTRO}
+    if valores["categorias"]:
+        valores["categorias"] = [c for c in valores["categorias"].split(",") if c]
+    return crear_filtro(**valores, formato_fecha=servicio.almacen.formato_fecha)  # ValueError -> 400 (con el formato del ledger)
+
+
+def despachar(servicio, metodo, ruta, parametros, cuerpo):  # elige la operación según método y ruta
+    partes = [p for p in ruta.split("/") if p]
+    if partes == ["gastos"]:
+        if metodo == "GET":
+            return servicio.listar(parametros.get("texto", ""), _filtro(servicio, parametros),
+                                   _entero(parametros, "pagina", 1), _entero(parametros, "por_pagina", POR_PAGINA))
+        if metodo == "POST":
+            return servicio.agregar(cuerpo)
+    elif len(partes) == 2 and partes[0] == "gastos":
+        id_gasto = _id_gasto(partes[1])
+        if metodo == "GET":
+            return servicio.obtener(id_gasto)
+        if metodo in ("PUT", "PATCH"):
+            return servicio.actualizar(id_gasto, cuerpo)
+        if metodo == "DELETE":
+            return servicio.eliminar(id_gasto)
+    elif partes in (["resumen"], ["periodos"], ["estado"]):  # solo lectura
+        if metodo == "GET" and partes == ["resumen"]:
+            return servicio.resumen(_filtro(servicio, parametros))
+        if metodo == "GET" and partes == ["periodos"]:
+            return servicio.periodos(parametros.get("periodo", "mes"), parametros.get("campo", "suma"), _filtro(servicio, parametros))
+        if metodo == "GET":
+            return servicio.estado()
+    else:
+        raise ErrorHTTP(404, f"Ruta desconocida: {ruta}")
+    raise ErrorHTTP(405, f"Método {metodo} no permitido en {ruta}")
+
+
+async def _leer_linea(lector):  # una línea del pedido; ErrorHTTP 400 si supera el límite del lector
+    try:
+        return await lector.readline()
+    except ValueError:  # LimitOverrunError, convertido por readline
+        raise ErrorHTTP(400, "Línea de pedido o encabezado demasiado larga.") from None
+
+
+async def _leer_pedido(lector):  # (método, destino, versión, encabezados, cuerpo) o None si se cerró la conexión
+    linea = await _leer_linea(lector)
+    if not linea:
+        return None
+    try:
+        metodo, destino, version = linea.decode("latin-1").split()
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de pedido inválida.") from None
+    encabezados = {}
+    while True:
+        linea = await _leer_linea(lector)
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        encabezados[nombre.strip().lower()] = valor.strip()
+    try:
+        largo = int(encabezados.get("content-length", 0) or 0)
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length inválido.") from None
+    if largo < 0:
+        raise ErrorHTTP(400, "Content-Length inválido.")
+    if largo > MAXIMO_CUERPO:
+        raise ErrorHTTP(413, f"El cuerpo supera {MAXIMO_CUERPO} bytes.")
+    cuerpo = await lector.readexactly(largo) if largo else b""
+    return metodo.upper(), destino, version, encabezados, cuerpo
+
+
+def _respuesta(codigo, datos, mantener):  # bytes de la respuesta HTTP con el cuerpo en JSON
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    cabecera = (f"HTTP/1.1 {codigo} {ESTADOS.get(codigo, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return cabecera.encode("latin-1") + cuerpo
+
+
+class ServidorGastos:
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio: cada conexión se atiende en una corrutina y
+    puede hacer varios pedidos seguidos. Las operaciones sobre el almacén son rápidas y
+    corren en el bucle de eventos, así que nunca se pisan entre sí; el guardado también
+    corre en el bucle, una vez por intervalo y solo si hubo cambios.
+    """
+
+    def __init__(self, servicio, host=HOST, puerto=PUERTO, intervalo=INTERVALO_GUARDADO):
+        self.servicio = servicio
+        self.host, self.puerto, self.intervalo = host, puerto, intervalo
+        self._servidor = None
+        self._guardado = None  # tarea de guardado periódico
+        self._fin = None  # se completa al pedir el cierre
+
+    async def atender(self, lector, escritor):  # una conexión
+        try:
+            while True:
+                try:
+                    pedido = await asyncio.wait_for(_leer_pedido(lector), ESPERA_CONEXION)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ErrorHTTP as e:  # pedido mal formado: se responde y se cierra
+                    escritor.write(_respuesta(e.codigo, {"error": str(e)}, False))
+                    await escritor.drain()
+                    break
+                if pedido is None:
+                    break
+                metodo, destino, version, encabezados, cuerpo = pedido
+                mantener = encabezados.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+                escritor.write(_respuesta(*self.procesar(metodo, destino, cuerpo), mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        finally:
+            escritor.close()
+
+    def procesar(self, metodo, destino, cuerpo):  # (código, datos) de un pedido
+        partes = urlsplit(destino)
+        parametros = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+        try:
+            datos = json.loads(cuerpo) if cuerpo else None
+        except json.JSONDecodeError:
+            return 400, {"error": "El cuerpo no es JSON válido."}
+        try:
+            return despachar(self.servicio, metodo, partes.path, parametros, datos)
+        except ErrorHTTP as e:
+            return e.codigo, {"error": str(e)}
+        except ValueError as e:  # filtros o datos inválidos
+            return 400, {"error": str(e)}
+        except Exception as e:  # un error inesperado no tira abajo el servidor
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def _guardar_periodicamente(self):  # un guardado por intervalo, con todos los cambios juntos
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                self.servicio.guardar()
+            except Exception as e:  # disco lleno, archivo bloqueado...: se reintenta en el próximo intervalo
+                print(f"❌ No se pudo guardar {self.servicio.ruta}: {e}", file=sys.stderr)
+
+    async def iniciar(self):  # abre el puerto y empieza el guardado periódico
+        self._fin = asyncio.get_running_loop().create_future()
+        self._servidor = await asyncio.start_server(self.atender, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]  # puerto real (si se pidió 0)
+        self._guardado = asyncio.create_task(self._guardar_periodicamente())
+
+    async def esperar(self):  # atiende hasta que se pida el cierre; guarda lo pendiente al terminar
+        try:
+            await self._fin
+        finally:
+            self._guardado.cancel()
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self.servicio.guardar()
+
+    async def servir(self):  # iniciar() y esperar()
+        await self.iniciar()
+        await self.esperar()
+
+    def detener(self):  # pide el cierre (desde el bucle de eventos)
+        if self._fin is not None and not self._fin.done():
+            self._fin.set_result(None)
+
+
+# ------------------------------
+# Inicio
+# ------------------------------
+def abrir_servicio(ruta, formato_fecha=FORMATO_FECHA_CONSOLA):  # carga el ledger y arma el servicio
+    try:
+        almacen = abrir_gastos(ruta, formato_fecha)
+    except FileNotFoundError:  # ledger nuevo: se crea con el primer guardado
+        almacen = AlmacenGastos(formato_fecha)
+    if hasattr(almacen, "cargado"):  # carga diferida: el servidor necesita todos los gastos
+        almacen = almacen.almacen()
+    return ServicioGastos(almacen, ruta)
+
+
+async def _principal(opciones):
+    servidor = ServidorGastos(abrir_servicio(opciones.ledger, opciones.formato_fecha),
+                              opciones.host, opciones.puerto, opciones.intervalo)
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, servidor.detener)
+        except (NotImplementedError, RuntimeError):  # Windows: Ctrl+C llega como KeyboardInterrupt
+            pass
+    await servidor.iniciar()
+    print(f"🌐 Sirviendo {opciones.ledger} en http://{servidor.host}:{servidor.puerto} "
+          f"({len(servidor.servicio.almacen)} gastos)", flush=True)
+    await servidor.esperar()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="API local HTTP/JSON sobre un ledger de gastos.")
+    parser.add_argument("ledger", help="ledger .json (con diario) o base .db")
+    parser.add_argument("--host", default=HOST, help="dirección en la que escuchar")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="puerto (0 = uno libre)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_GUARDADO, help="segundos entre guardados")
+    parser.add_argument("--formato-fecha", default=FORMATO_FECHA_CONSOLA, help="formato de las fechas del ledger")
+    opciones = parser.parse_args(argumentos)
+    try:
+        asyncio.run(_principal(opciones))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
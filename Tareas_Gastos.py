@@ -0,0 +1,87 @@
+# Tareas_Gastos.py
+# Tareas en segundo plano (importar, guardar) que informan su avance por una cola,
+# para que la ventana de Tkinter nunca quede bloqueada esperando al disco.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import queue  # cola segura entre hilos para los mensajes de la tarea
+import threading  # hilo de trabajo y evento de cancelación
+
+
+# ------------------------------
+# Errores
+# ------------------------------
+class Cancelado(Exception):
+    """Se lanza dentro de una tarea cuando el usuario pidió cancelarla."""
+
+
+# ------------------------------
+# Tarea en segundo plano
+# ------------------------------
+class TareaSegundoPlano:
+    """
+    Ejecuta funcion(*args, tarea=self) en un hilo aparte.
+    La función informa su avance con tarea.informar(fraccion, texto) y llama a
+    tarea.comprobar() entre pasos para detenerse si se pidió cancelar.
+    Los mensajes quedan en tarea.cola como tuplas (tipo, dato), con tipo
+    'progreso', 'fin', 'error' o 'cancelado'.
+    """
+
+    def __init__(self, funcion, *args):  # prepara la tarea sin iniciarla
+        self.cola = queue.Queue()  # mensajes hacia la interfaz
+        self.cancelado = threading.Event()  # se activa al pedir cancelar
+        self._hilo = threading.Thread(target=self._ejecutar, args=(funcion, args), daemon=True)  # hilo de trabajo
+
+    def iniciar(self):  # arranca el hilo y devuelve la tarea
+        self._hilo.start()
+        return self
+
+    def _ejecutar(self, funcion, args):  # cuerpo del hilo
+        try:
+            resultado = funcion(*args, tarea=self)  # hace el trabajo
+        except Cancelado:
+            self.cola.put(("cancelado", None))  # se detuvo a pedido del usuario
+        except Exception as e:
+            self.cola.put(("error", e))  # falló: se informa el error
+        else:
+            self.cola.put(("fin", resultado))  # terminó bien: se entrega el resultado
+
+    def informar(self, fraccion, texto=""):  # envía el avance (0 a 1) y un texto opcional
+        self.cola.put(("progreso", (fraccion, texto)))
+
+    def comprobar(self):  # lanza Cancelado si se pidió cancelar
+        if self.cancelado.is_set():
+            raise Cancelado()
+
+    def cancelar(self):  # pide que la tarea se detenga en el próximo paso
+        self.cancelado.set()
+
+
+# ------------------------------
+# Seguimiento desde Tkinter
+# ------------------------------
+def seguir_tarea(root, tarea, al_progreso, al_terminar, al_error, al_cancelar, intervalo_ms=50):  # revisa la cola con root.after
+    """
+    Revisa periódicamente la cola de la tarea desde el hilo de Tkinter y llama al callback
+    que corresponda a cada mensaje. Así los widgets solo se tocan desde el hilo principal.
+    """
+    def revisar():  # procesa todos los mensajes pendientes
+        try:
+            while True:
+                tipo, dato = tarea.cola.get_nowait()  # siguiente mensaje
+                if tipo == "progreso":
+                    al_progreso(*dato)  # actualiza la barra
+                elif tipo == "fin":
+                    al_terminar(dato)  # entrega el resultado
+                    return  # deja de revisar
+                elif tipo == "error":
+                    al_error(dato)  # informa el error
+                    return
+                else:  # cancelado
+                    al_cancelar()
+                    return
+        except queue.Empty:
+            pass  # no hay más mensajes por ahora
+        root.after(intervalo_ms, revisar)  # vuelve a revisar más tarde
+    root.after(intervalo_ms, revisar)  # primera revisión
@@ -0,0 +1,42 @@
+# test_Agregacion_Gastos.py
+# Pruebas de las estadísticas incrementales: mínimo y máximo al quitar gastos extremos.
+
+# ------------------------------
+# Imports
+# ------------------------------
+from Agregacion_Gastos import crear_estadisticas, estadistica_quitar, estadisticas_combinar  # estadísticas bajo prueba
+from Cuantiles_Gastos import ERROR_RELATIVO  # error admitido en los extremos acotados
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _gasto(monto, categoria="Comida"):  # gasto mínimo para las estadísticas
+    return {"fecha": "01-01-2026", "categoria": categoria, "monto": monto}
+
+
+# ------------------------------
+# Pruebas
+# ------------------------------
+def test_quitar_extremos():
+    montos = [10.0, 10.0, 25.0, 40.0, 100.0, 300.0, 300.0]
+    estadisticas = crear_estadisticas([_gasto(m) for m in montos])
+    assert set(estadisticas["Comida"]) == {"cantidad", "suma", "suma_cuadrados", "minimo", "maximo", "periodos", "cuantiles"}
+    estadistica_quitar(estadisticas, _gasto(10.0))  # queda otro igual: el mínimo no cambia
+    estadistica_quitar(estadisticas, _gasto(300.0))
+    assert (estadisticas["Comida"]["minimo"], estadisticas["Comida"]["maximo"]) == (10.0, 300.0)
+    estadistica_quitar(estadisticas, _gasto(10.0))  # ahora sí se van los extremos
+    estadistica_quitar(estadisticas, _gasto(300.0))
+    acum = estadisticas["Comida"]
+    assert 25.0 * (1 - 2 * ERROR_RELATIVO) <= acum["minimo"] <= 25.0  # nunca por encima del menor real
+    assert 100.0 <= acum["maximo"] <= 100.0 * (1 + 2 * ERROR_RELATIVO)  # nunca por debajo del mayor real
+    estadistica_quitar(estadisticas, _gasto(999.0))  # monto que no está: no cambia nada
+    assert estadisticas["Comida"]["cantidad"] == 3
+
+
+def test_combinar_sin_montos_distintos():
+    destino = crear_estadisticas([_gasto(1.0 + i / 1000) for i in range(1000)])
+    estadisticas_combinar(destino, crear_estadisticas([_gasto(-5.0), _gasto(7.0, "Salud")]))
+    assert (destino["Comida"]["cantidad"], destino["Comida"]["minimo"], destino["Comida"]["maximo"]) == (1001, -5.0, 1.999)
+    assert len(destino["Comida"]["cuantiles"]) < 100  # cubetas, no un contador por monto
+    assert destino["Salud"]["cantidad"] == 1
@@ -0,0 +1,80 @@
+# test_Almacen_SQLite.py
+# Pruebas del almacén SQLite: búsquedas intercaladas que se leen de a páginas y columnas de a lotes.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import Almacen_SQLite  # para achicar los lotes
+from Almacen_SQLite import AlmacenSQLite, BusquedaSQLite  # almacén y búsqueda bajo prueba
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _base(tmp_path):  # base con 13 libros y 7 cargas de combustible, intercalados
+    almacen = AlmacenSQLite(str(tmp_path / "gastos.db"))
+    for i in range(20):
+        if i % 3 == 2 or i == 19:
+            almacen.agregar({"fecha": "01/01/2026", "categoria": "Transporte", "descripcion": "Combustible", "monto": 10.0 + i})
+        else:
+            almacen.agregar({"fecha": "01/01/2026", "categoria": "Educación", "descripcion": "Libro", "monto": 5.0 + i})
+    return almacen
+
+
+# ------------------------------
+# Pruebas
+# ------------------------------
+def test_busquedas_intercaladas(tmp_path):
+    almacen = _base(tmp_path)
+    busqueda = BusquedaSQLite(almacen)
+    libros = busqueda.buscar("libro")
+    assert len(libros) == 13
+    primera = libros[0:5]
+    combustible = busqueda.buscar("combustible")  # otra búsqueda antes de pedir la página siguiente
+    assert len(combustible) == 7
+    resto = libros[5:13]
+    assert len(primera + resto) == 13
+    assert all(almacen.obtener(i)["descripcion"] == "Libro" for i in primera + resto)
+    assert all(almacen.obtener(i)["descripcion"] == "Combustible" for i in combustible[0:7])
+    almacen.cerrar()
+
+
+def test_busqueda_con_filtro(tmp_path):
+    almacen = _base(tmp_path)
+    ids = BusquedaSQLite(almacen).buscar("educacion", {"desde": None, "hasta": None, "monto_minimo": 10.0,
+                                                       "monto_maximo": None, "categorias": None})
+    assert [almacen.obtener(i)["monto"] >= 10.0 for i in ids[0:len(ids)]] == [True] * len(ids)
+    assert len(ids) == sum(1 for g in almacen.values() if g["categoria"] == "Educación" and g["monto"] >= 10.0)
+    almacen.cerrar()
+
+
+def test_instantanea_sin_confirmar(tmp_path):
+    almacen = _base(tmp_path)
+    almacen.confirmar()
+    almacen.actualizar(1, {"monto": 99.0})
+    almacen.eliminar(3)
+    nuevo = almacen.agregar({"fecha": "02/01/2026", "categoria": "Salud", "descripcion": "Farmacia", "monto": 7.0})
+    copia = almacen.instantanea()
+    assert dict(copia.items()) == dict(almacen.items())  # con los cambios pendientes
+    assert AlmacenSQLite(almacen.ruta, solo_lectura=True).obtener(1)["monto"] == 5.0  # que siguen sin confirmar
+    almacen.confirmar()
+    almacen.agregar({"fecha": "03/01/2026", "categoria": "Salud", "descripcion": "Turno", "monto": 1.0})
+    almacen.confirmar()
+    assert len(list(copia.keys())) == len(copia) == 20  # lo confirmado después no se ve
+    assert copia.obtener(nuevo)["descripcion"] == "Farmacia" and copia.obtener(3) is None
+    assert "Salud" in copia.categorias and len(BusquedaSQLite(copia).buscar("turno")) == 0
+    copia.cerrar()
+    almacen.cerrar()
+
+
+def test_columnas_de_a_lotes(tmp_path, monkeypatch):
+    monkeypatch.setattr(Almacen_SQLite, "FILAS_POR_LOTE", 3)  # varios lotes por categoría
+    almacen = _base(tmp_path)
+    almacen.eliminar(1)
+    codigos, montos, fechas = almacen.columnas()
+    assert len(montos) == len(fechas) == 19
+    esperado = sorted((g["categoria"], g["monto"]) for g in almacen.values())
+    assert sorted((almacen.categorias[c], m) for c, m in zip(codigos, montos)) == esperado
+    codigos, montos, _ = almacen.columnas_donde("monto >= ?", (20.0,))
+    assert sorted((almacen.categorias[c], m) for c, m in zip(codigos, montos)) == [e for e in esperado if e[1] >= 20.0]
+    almacen.cerrar()
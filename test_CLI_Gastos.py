@@ -0,0 +1,41 @@
+# test_CLI_Gastos.py
+# Pruebas de la línea de comandos sobre un ledger JSON y sobre una base SQLite.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import pytest  # corredor de pruebas
+
+from Almacen_Gastos import AlmacenGastos  # gastos de la prueba
+from Exportacion_Gastos import exportar_gastos  # CSV a importar
+from Fechas_Gastos import FORMATO_FECHA_CONSOLA  # formato de la consola
+from Persistencia_Gastos import abrir_gastos  # lectura del ledger resultante
+from CLI_Gastos import main  # línea de comandos bajo prueba
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _ledger(tmp_path, extension):  # ledger con 3 libros y 2 cargas de combustible
+    almacen = AlmacenGastos(FORMATO_FECHA_CONSOLA)
+    for i in range(5):
+        descripcion = "Combustible" if i % 2 else "Libro"
+        almacen.agregar({"fecha": f"0{i + 1}-01-2026", "categoria": "Varios", "descripcion": descripcion, "monto": 10.0 + i})
+    exportar_gastos(almacen, str(tmp_path / "gastos.csv"))
+    ruta = str(tmp_path / ("ledger" + extension))
+    assert main(["importar", ruta, str(tmp_path / "gastos.csv")]) == 0
+    return ruta
+
+
+# ------------------------------
+# Pruebas
+# ------------------------------
+@pytest.mark.parametrize("extension", [".json", ".db"])
+def test_eliminar_por_texto(tmp_path, capsys, extension):
+    ruta = _ledger(tmp_path, extension)
+    assert main(["eliminar", ruta, "--texto", "libro", "--simular"]) == 0
+    assert "Se eliminarían 3 de 5" in capsys.readouterr().out
+    assert main(["eliminar", ruta, "--texto", "libro", "--monto-minimo", "12"]) == 0
+    almacen = abrir_gastos(ruta, FORMATO_FECHA_CONSOLA)
+    restantes = almacen.almacen() if hasattr(almacen, "cargado") else almacen
+    assert sorted(g["monto"] for g in restantes.values()) == [10.0, 11.0, 13.0]
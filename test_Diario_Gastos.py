@@ -0,0 +1,73 @@
+# test_Diario_Gastos.py
+# Pruebas del diario de cambios: texto con tildes en cualquier configuración regional y
+# recorte solo de la última línea cortada.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # tamaño del diario y variables de entorno
+import subprocess  # correr el guardado con otra configuración regional
+import sys  # intérprete actual
+
+import pytest  # corredor de pruebas
+
+from Almacen_Gastos import AlmacenGastos  # almacén que se guarda
+from Diario_Gastos import DiarioGastos, EXTENSION_DIARIO  # diario bajo prueba
+from Fechas_Gastos import FORMATO_FECHA  # formato de las fechas
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+def _guardar_con_diario(ruta, descripcion):  # instantánea con un gasto y una línea de diario con otro
+    almacen = AlmacenGastos(FORMATO_FECHA)
+    almacen.agregar({"fecha": "01/01/2026", "categoria": "Comida", "descripcion": "Pan", "monto": 1.0})
+    DiarioGastos(ruta).guardar(almacen)  # sin instantánea: guardado completo
+    almacen = DiarioGastos(ruta).cargar(FORMATO_FECHA)
+    almacen.agregar({"fecha": "02/01/2026", "categoria": "Comida", "descripcion": descripcion, "monto": 2.5})
+    DiarioGastos(ruta).guardar(almacen)  # este va al diario
+
+
+# ------------------------------
+# Pruebas
+# ------------------------------
+def test_tildes_en_el_diario(tmp_path):
+    ruta = str(tmp_path / "gastos.json")
+    _guardar_con_diario(ruta, "Café y postre, ñandú")
+    tamano = os.path.getsize(ruta + EXTENSION_DIARIO)
+    almacen = DiarioGastos(ruta).cargar(FORMATO_FECHA)
+    assert [g["descripcion"] for g in almacen.values()] == ["Pan", "Café y postre, ñandú"]
+    assert os.path.getsize(ruta + EXTENSION_DIARIO) == tamano  # no se recortó nada
+
+
+def test_tildes_con_configuracion_regional_sin_utf8(tmp_path):
+    # guarda en un proceso cuya codificación por defecto no es UTF-8 (como cp1252 en Windows)
+    ruta = str(tmp_path / "gastos.json")
+    entorno = dict(os.environ, LC_ALL="C", PYTHONCOERCECLOCALE="0", PYTHONUTF8="0",
+                   PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    codigo = "import sys, test_Diario_Gastos as t; t._guardar_con_diario(sys.argv[1], 'Caf\\u00e9 y postre')"  # escape: el -c va en ASCII
+    subprocess.run([sys.executable, "-X", "utf8=0", "-c", codigo, ruta], env=entorno, check=True)
+    almacen = DiarioGastos(ruta).cargar(FORMATO_FECHA)
+    assert [g["descripcion"] for g in almacen.values()] == ["Pan", "Café y postre"]
+
+
+def test_ultima_linea_cortada(tmp_path):
+    ruta = str(tmp_path / "gastos.json")
+    _guardar_con_diario(ruta, "Café")
+    tamano = os.path.getsize(ruta + EXTENSION_DIARIO)
+    with open(ruta + EXTENSION_DIARIO, "ab") as f:
+        f.write('{"id": 3, "gasto": {"descripcion": "Caf'.encode("utf-8")[:-1])  # cortada a mitad de la é
+    almacen = DiarioGastos(ruta).cargar(FORMATO_FECHA)
+    assert len(almacen) == 2
+    assert os.path.getsize(ruta + EXTENSION_DIARIO) == tamano  # se recortó solo la línea cortada
+
+
+def test_linea_danada_en_el_medio(tmp_path):
+    ruta = str(tmp_path / "gastos.json")
+    _guardar_con_diario(ruta, "Café")
+    with open(ruta + EXTENSION_DIARIO, "ab") as f:
+        f.write(b"basura\n" + b'{"id": 4, "baja": true}\n')
+    tamano = os.path.getsize(ruta + EXTENSION_DIARIO)
+    with pytest.raises(ValueError):
+        DiarioGastos(ruta).cargar(FORMATO_FECHA)
+    assert os.path.getsize(ruta + EXTENSION_DIARIO) == tamano  # el diario queda como estaba
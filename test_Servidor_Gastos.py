@@ -0,0 +1,82 @@
+# test_Servidor_Gastos.py
+# Pruebas del servidor HTTP/JSON: guardado periódico que falla y pedidos mal formados.
+
+# ------------------------------
+# Imports
+# ------------------------------
+import os  # fsync que falla una vez
+import asyncio  # servidor y cliente en el mismo bucle
+
+import Diario_Gastos  # para simular un disco que falla
+from Servidor_Gastos import ServidorGastos, abrir_servicio  # servidor bajo prueba
+
+
+# ------------------------------
+# Utilidades
+# ------------------------------
+async def _pedido(servidor, datos):  # envía bytes crudos y devuelve la primera línea de la respuesta
+    lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+    escritor.write(datos)
+    await escritor.drain()
+    linea = await lector.readline()
+    escritor.close()
+    return linea.decode("latin-1").strip()
+
+
+def _gasto(descripcion):  # gasto válido para el servicio
+    return {"fecha": "01-01-2026", "categoria": "Comida", "descripcion": descripcion, "monto": 1.5}
+
+
+# ------------------------------
+# Pruebas
+# ------------------------------
+def test_guardado_periodico_reintenta(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "gastos.json")
+    servicio = abrir_servicio(ruta)
+    servicio.agregar(_gasto("Pan"))
+    servicio.guardar()  # instantánea: los siguientes cambios van al diario
+    fallas = [OSError(28, "No queda espacio en el dispositivo")]
+    fsync = os.fsync
+
+    def fsync_que_falla(descriptor):  # falla la primera vez, como un disco lleno
+        if fallas:
+            raise fallas.pop()
+        fsync(descriptor)
+
+    monkeypatch.setattr(Diario_Gastos.os, "fsync", fsync_que_falla)
+    servicio.agregar(_gasto("Café"))
+
+    async def probar():
+        servidor = ServidorGastos(servicio, puerto=0, intervalo=0.05)
+        await servidor.iniciar()
+        await asyncio.sleep(0.08)  # primer intento: falla
+        estado = servicio.estado()[1]
+        await asyncio.sleep(0.1)  # segundo intento: guarda
+        servidor.detener()
+        await servidor.esperar()
+        return estado
+
+    estado = asyncio.run(probar())
+    assert estado["pendientes"] == 1 and "OSError" in estado["error_guardado"]
+    assert servicio.estado()[1]["error_guardado"] is None and servicio.pendientes == 0
+    assert sorted(g["descripcion"] for g in abrir_servicio(ruta).almacen.values()) == ["Café", "Pan"]
+
+
+def test_encabezados_invalidos(tmp_path):
+    servicio = abrir_servicio(str(tmp_path / "gastos.json"))
+
+    async def probar():
+        servidor = ServidorGastos(servicio, puerto=0)
+        await servidor.iniciar()
+        largo = await _pedido(servidor, b"POST /gastos HTTP/1.1\r\nContent-Length: mucho\r\n\r\n")
+        negativo = await _pedido(servidor, b"POST /gastos HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+        enorme = await _pedido(servidor, b"GET /estado HTTP/1.1\r\nX-Relleno: " + b"a" * 100_000 + b"\r\n\r\n")
+        estado = await _pedido(servidor, b"GET /estado HTTP/1.1\r\nConnection: close\r\n\r\n")
+        servidor.detener()
+        await servidor.esperar()
+        return largo, negativo, enorme, estado
+
+    largo, negativo, enorme, estado = asyncio.run(probar())
+    assert largo.startswith("HTTP/1.1 400") and negativo.startswith("HTTP/1.1 400")
+    assert enorme.startswith("HTTP/1.1 400")
+    assert estado.startswith("HTTP/1.1 200")